@@ -0,0 +1,98 @@
+"""Write latency while a large month is archived: chunked vs. one transaction.
+
+    python -m backend.benchmarks.bench_archive --rows 200000
+
+A writer thread keeps inserting single registrations (insert + commit, as
+the API does) while run_monthly_archive moves the month. The single
+transaction case uses one chunk covering the whole month, which is what
+the archiver did before it moved rows in chunks.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date
+
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services.archive import ARCHIVE_CHUNK, compact_database, run_monthly_archive
+from backend.src.services.db import get_connection, init_db, resolve_db_path
+from backend.src.services.ingest import NewRegistration, insert_registrations
+
+MONTH = "2024-03"
+
+
+def _writer(stop: threading.Event, latencies: list, failures: list) -> None:
+    conn = get_connection()
+    item = NewRegistration(
+        issuer="Δήμος", referenceNumber="Φ.1", subject="Νέα αίτηση", recipient=None,
+        offices=["OFF-1"], entryDate=date(2024, 5, 2),
+    )
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            insert_registrations(conn, "common_incoming", [item], "bench")
+            conn.commit()
+        except sqlite3.OperationalError:  # busy_timeout expired: the write is lost
+            conn.rollback()
+            failures.append(time.perf_counter() - t0)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        time.sleep(0.002)
+    conn.close()
+
+
+def _run(rows: int, chunk_size: int) -> None:
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        conn = get_connection()
+        bulk_insert(conn, generate_registrations(rows, start=date(2024, 3, 1), days=31))
+        bulk_insert(conn, generate_registrations(rows // 4, start=date(2024, 4, 1), days=30, seed=2))
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_before = resolve_db_path().stat().st_size
+
+        stop = threading.Event()
+        latencies: list = []
+        failures: list = []
+        writer = threading.Thread(target=_writer, args=(stop, latencies, failures))
+        writer.start()
+        time.sleep(0.2)
+        latencies.clear()
+        t0 = time.perf_counter()
+        result = run_monthly_archive(conn, MONTH, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        writer.join()
+
+        t0 = time.perf_counter()
+        compacted = compact_database(conn)
+        compact_s = time.perf_counter() - t0
+        size_after = resolve_db_path().stat().st_size
+        conn.close()
+
+        ordered = sorted(latencies)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))]
+        print(f"chunk={chunk_size:<8} moved={result.itemsMoved} in {elapsed:5.1f}s "
+              f"({result.chunks} chunks); writes during archive: n={len(ordered)} "
+              f"p50={statistics.median(ordered):6.1f}ms p99={p99:7.1f}ms max={ordered[-1]:7.1f}ms "
+              f"failed={len(failures)}")
+        print(f"{'':14} compact {compact_s:4.1f}s, freed {compacted.freedPages} pages: "
+              f"{size_before / 2**20:.0f} MiB -> {size_after / 2**20:.0f} MiB")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK)
+    args = parser.parse_args(argv)
+
+    _run(args.rows, args.chunk_size)
+    _run(args.rows, 10 * args.rows)  # whole month in one transaction
+
+
+if __name__ == "__main__":
+    main()
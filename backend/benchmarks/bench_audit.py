@@ -0,0 +1,134 @@
+"""Audit log queries and appends over a large event table (default 10M events).
+
+    python -m backend.benchmarks.bench_audit --events 10000000
+
+Loads synthetic audit events spread over three years for 50 users (the
+indexes are built after the load), then times a registration's history, a
+day and a user's month through GET /audit's query, deep keyset paging, and
+appending events one statement each against one batched statement per write
+group. A history lookup without the index shows what each one cost before.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from backend.benchmarks.suite import _format, _summary, _timed
+from backend.src.services import audit
+from backend.src.services.db import ensure_db, get_connection, init_db
+
+START = date(2022, 1, 1)
+DAYS = 3 * 365
+USERS = 50
+LOAD_CHUNK = 1_000_000
+
+# Rebuilt by ensure_db() once the events are in (user_version 0: out of date)
+_INDEXES = """
+    PRAGMA user_version = 0;
+    DROP INDEX IF EXISTS ix_audit_events_registration;
+    DROP INDEX IF EXISTS ix_audit_events_time;
+    DROP INDEX IF EXISTS ix_audit_events_user;
+"""
+
+# Every tenth event deletes a registration created earlier; seconds between
+# events are even, so timestamps increase with ids
+_LOAD_SQL = f"""
+    WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    INSERT INTO audit_events (action, registrationId, timestamp, username)
+    SELECT CASE WHEN i % 10 = 0 THEN 'delete' ELSE 'create' END,
+           CASE WHEN i % 10 = 0 THEN i - 5 ELSE i END,
+           strftime('%Y-%m-%dT%H:%M:%S+00:00', ? + i * ?, 'unixepoch'),
+           'user' || (i * 7919 % {USERS})
+    FROM n
+"""
+
+
+def load(conn, events: int) -> float:
+    started = time.perf_counter()
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(_INDEXES)
+    epoch = int(time.mktime(START.timetuple()))
+    step = DAYS * 86400 / events
+    for lo in range(1, events + 1, LOAD_CHUNK):
+        conn.execute(_LOAD_SQL, (lo, min(lo + LOAD_CHUNK - 1, events), epoch, step))
+        conn.commit()
+    ensure_db()
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--group", type=int, default=32, help="events per write group for the append scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        conn = get_connection()
+        print(f"loaded and indexed {args.events} events in {load(conn, args.events):.1f}s", flush=True)
+
+        def day(i: int) -> date:
+            return START + timedelta(days=rng.randrange(DAYS))
+
+        def history(i: int) -> None:
+            audit.registration_events(conn, rng.randint(1, args.events))
+
+        def one_day(i: int) -> None:
+            d = day(i)
+            audit.list_events(conn, start=d, end=d, limit=100)
+
+        def user_month(i: int) -> None:
+            d = day(i)
+            audit.list_events(conn, start=d, end=d + timedelta(days=30), username=f"user{i % USERS}", limit=100)
+
+        def deep_pages(i: int) -> None:
+            # Ten pages into a user's quarter
+            d = day(i)
+            position = None
+            for _ in range(10):
+                _, position = audit.list_events(conn, start=d, end=d + timedelta(days=90),
+                                                username=f"user{i % USERS}", limit=100, after=position)
+
+        stamp = "2025-01-01T09:00:00+00:00"
+
+        def append_each(i: int) -> None:
+            for j in range(args.group):
+                conn.execute(audit.INSERT_SQL, ("create", args.events + j, stamp, "bench"))
+            conn.commit()
+
+        def append_grouped(i: int) -> None:
+            with audit.buffered() as events:
+                for j in range(args.group):
+                    audit.record(conn, "create", args.events + j, stamp, "bench")
+                events.flush(conn)
+            conn.commit()
+
+        def unindexed_history(i: int) -> None:
+            conn.execute(
+                "SELECT * FROM audit_events NOT INDEXED WHERE registrationId = ? ORDER BY id",
+                (rng.randint(1, args.events),),
+            ).fetchall()
+
+        for name, op, repeat in (
+            ("history", history, args.repeat),
+            ("audit_day", one_day, args.repeat),
+            ("audit_user_month", user_month, args.repeat),
+            ("audit_10_pages", deep_pages, max(10, args.repeat // 10)),
+            (f"append_each_x{args.group}", append_each, args.repeat),
+            (f"append_group_x{args.group}", append_grouped, args.repeat),
+            ("history_no_index", unindexed_history, 3),
+        ):
+            print(f"{name:<20} {_format(_summary(_timed(op, repeat, warmup=1)))}", flush=True)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Requests/sec of the list query with per-request connections vs. the pool.
+
+Run from the project root:
+
+    python -m backend.benchmarks.bench_connection_pool --requests 5000 --threads 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+
+from backend.src.services.db import ConnectionPool, get_connection, init_db, resolve_db_path
+
+LIST_SQL = (
+    "SELECT * FROM registrations WHERE deletedFlag = 0 AND entryDate LIKE ? "
+    "ORDER BY id LIMIT 100"
+)
+
+
+def _legacy_open() -> sqlite3.Connection:
+    # What every handler did before the pool: resolve path, connect, set WAL
+    conn = sqlite3.connect(resolve_db_path())
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    return conn
+
+
+def _seed(rows: int) -> str:
+    month = date.today().strftime("%Y-%m")
+    conn = get_connection()
+    conn.executemany(
+        """
+        INSERT INTO registrations (
+            category, issuer, referenceNumber, subject, recipient, offices,
+            protocolNumber, draftNumber, entryDate, createdAt, deletedFlag
+        ) VALUES ('common_incoming', ?, ?, ?, NULL, 'OFF-1', ?, NULL, ?, ?, 0)
+        """,
+        [
+            (f"Issuer {i}", f"REF-{i}", f"Subject {i}", 40001 + i, f"{month}-01", f"{month}-01T00:00:00")
+            for i in range(rows)
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return month
+
+
+def _run(label: str, total: int, threads: int, one_request) -> float:
+    per_thread = total // threads
+
+    def worker():
+        for _ in range(per_thread):
+            one_request()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    rate = per_thread * threads / elapsed
+    print(f"{label:<10} {rate:>10.0f} req/s  ({elapsed:.2f}s)")
+    return rate
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        month = _seed(args.rows)
+        params = (f"{month}%",)
+
+        def legacy_request():
+            conn = _legacy_open()
+            conn.execute(LIST_SQL, params).fetchall()
+            conn.close()
+
+        pool = ConnectionPool(resolve_db_path(), max_size=args.threads)
+
+        def pooled_request():
+            with pool.connection() as conn:
+                conn.execute(LIST_SQL, params).fetchall()
+
+        before = _run("before", args.requests, args.threads, legacy_request)
+        after = _run("pooled", args.requests, args.threads, pooled_request)
+        pool.close()
+        print(f"speedup    {after / before:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Streaming export throughput and peak memory for one large month.
+
+    python -m backend.benchmarks.bench_export --rows 500000
+
+Memory is measured in a second pass under tracemalloc (which slows Python
+code down), so the throughput figures come from an untraced pass.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.export import WRITERS, export_month
+
+MONTH = "2024-03"
+
+
+def _drain(conn, fmt: str) -> int:
+    size = 0
+    for chunk in export_month(conn, MONTH, None, fmt):
+        size += len(chunk)
+    return size
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        conn = get_connection()
+        bulk_insert(conn, generate_registrations(args.rows, start=date(2024, 3, 1), days=31))
+        print(f"{args.rows} rows in {MONTH}")
+
+        for fmt in WRITERS:
+            t0 = time.perf_counter()
+            size = _drain(conn, fmt)
+            elapsed = time.perf_counter() - t0
+            tracemalloc.start()
+            _drain(conn, fmt)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{fmt:<7} {elapsed:6.2f}s {args.rows / elapsed:>9,.0f} rows/s "
+                  f"{size / 2**20:8.1f} MiB out, peak Python memory {peak / 2**20:5.1f} MiB")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
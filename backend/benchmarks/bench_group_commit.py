@@ -0,0 +1,71 @@
+"""Inserts/sec vs. client concurrency: one commit per request vs. group commit.
+
+    python -m backend.benchmarks.bench_group_commit --seconds 3
+
+Each client thread submits single registrations to a WriteQueue and waits
+for its result, as a request handler does. "per request" caps groups at one
+operation, which is what committing in every handler amounts to; "group"
+uses the default commit window. Both are run at durability full (fsync on
+every commit) and normal (the default).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.ingest import NewRegistration, insert_registrations
+from backend.src.services.write_queue import COMMIT_WINDOW_MS, WriteQueue
+
+ITEM = NewRegistration(
+    issuer="Δήμος Αθηναίων", referenceNumber="Φ.1", subject="Αίτηση χορήγησης άδειας",
+    recipient=None, offices=["OFF-1"], entryDate=date(2025, 1, 10),
+)
+
+
+def _client(writes: WriteQueue, deadline: float, counts: list) -> None:
+    n = 0
+    while time.perf_counter() < deadline:
+        writes.submit(insert_registrations, "common_incoming", [ITEM], "bench").result()
+        n += 1
+    counts.append(n)
+
+
+def _run(clients: int, seconds: float, durability: str, max_group: int) -> tuple:
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        writes = WriteQueue(get_connection, durability=durability, window_ms=COMMIT_WINDOW_MS,
+                            max_group=max_group)
+        counts: list = []
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=_client, args=(writes, deadline, counts)) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = writes.stats()
+        writes.close()
+    return sum(counts) / seconds, stats["meanGroup"]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--clients", default="1,4,16,64")
+    args = parser.parse_args(argv)
+
+    print(f"{'durability':<11} {'clients':>7} {'per request':>14} {'group':>14} {'mean group':>11}")
+    for durability in ("full", "normal"):
+        for clients in (int(c) for c in args.clients.split(",")):
+            single, _ = _run(clients, args.seconds, durability, max_group=1)
+            grouped, mean = _run(clients, args.seconds, durability, max_group=256)
+            print(f"{durability:<11} {clients:7d} {single:10.0f}/s {grouped:10.0f}/s {mean:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Latency under mixed traffic against a running server (p50/p99 per request kind).
+
+    python -m backend.benchmarks.bench_mixed_load --clients 64 --seconds 20
+
+Starts uvicorn on a seeded temporary database and keeps ``--clients``
+concurrent clients busy with month pages, searches, single inserts,
+200-item batch inserts and health checks. The server is a separate
+process, as in production, so the numbers include its event loop and
+threads but not the load generator's.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import httpx
+
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services.db import get_connection, init_db
+
+MONTH = "2024-03"
+# kind -> share of requests
+MIX = {"list": 0.55, "search": 0.15, "create": 0.15, "batch": 0.05, "health": 0.10}
+BATCH_ITEMS = 200
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _item(n: int) -> dict:
+    return {"issuer": "Δήμος Αθηναίων", "referenceNumber": f"Φ.{n}",
+            "subject": "Αίτηση χορήγησης άδειας", "offices": ["OFF-1"], "entryDate": f"{MONTH}-20"}
+
+
+async def _request(client: httpx.AsyncClient, kind: str, n: int) -> httpx.Response:
+    if kind == "list":
+        return await client.get("/registrations", params={"month": MONTH, "pageSize": 100})
+    if kind == "search":
+        return await client.get("/registrations/search", params={"q": "προμήθεια υλικού"})
+    if kind == "create":
+        return await client.post("/registrations/common_incoming", json=_item(n))
+    if kind == "batch":
+        items = [_item(n * BATCH_ITEMS + i) for i in range(BATCH_ITEMS)]
+        return await client.post("/registrations/common_incoming/batch", json={"items": items})
+    return await client.get("/health")
+
+
+async def _client(base: str, deadline: float, latencies: dict, errors: dict, seed: int) -> None:
+    rng = random.Random(seed)
+    kinds, weights = list(MIX), list(MIX.values())
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        n = 0
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            n += 1
+            t0 = time.perf_counter()
+            res = await _request(client, kind, seed * 1_000_000 + n)
+            latencies[kind].append((time.perf_counter() - t0) * 1000)
+            if res.status_code >= 400:
+                errors[kind] = errors.get(kind, 0) + 1
+
+
+async def _load(base: str, clients: int, seconds: float) -> tuple:
+    latencies = {kind: [] for kind in MIX}
+    errors: dict = {}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(_client(base, deadline, latencies, errors, i) for i in range(clients)))
+    return latencies, errors
+
+
+def _wait_ready(base: str, proc: subprocess.Popen) -> None:
+    for _ in range(200):
+        if proc.poll() is not None:
+            raise SystemExit("server exited during startup")
+        try:
+            if httpx.get(base + "/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit("server did not become ready")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        env = dict(os.environ, REGISTRY_DB_PATH=os.path.join(td, "bench.db"), REGISTRY_SCHEDULER="0")
+        os.environ["REGISTRY_DB_PATH"] = env["REGISTRY_DB_PATH"]
+        init_db()
+        conn = get_connection()
+        bulk_insert(conn, generate_registrations(args.rows, start=date(2024, 1, 1), days=120))
+        conn.close()
+
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.src.app:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            _wait_ready(base, proc)
+            latencies, errors = asyncio.run(_load(base, args.clients, args.seconds))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.clients} clients, {args.seconds:.0f}s: {total} requests ({total / args.seconds:.0f}/s)")
+    print(f"  {'kind':<8} {'n':>6} {'p50':>9} {'p99':>9} {'max':>9}  errors")
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))]
+        print(f"  {kind:<8} {len(ordered):6d} {statistics.median(ordered):7.1f}ms {p99:7.1f}ms "
+              f"{ordered[-1]:7.1f}ms  {errors.get(kind, 0)}")
+
+
+if __name__ == "__main__":
+    main()
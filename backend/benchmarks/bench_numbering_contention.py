@@ -0,0 +1,70 @@
+"""Protocol number allocation under N concurrent writers.
+
+Every writer uses its own connection and commits after each allocation, like
+a request handler. The run fails if any number is issued twice or skipped.
+
+    python -m backend.benchmarks.bench_numbering_contention --writers 8 --per-writer 500
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.numbering import next_protocol, protocol_start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--per-writer", type=int, default=500)
+    parser.add_argument("--category", default="common_incoming")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        issued = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(args.writers)
+
+        def writer():
+            conn = get_connection()
+            local = []
+            barrier.wait()
+            try:
+                for _ in range(args.per_writer):
+                    local.append(next_protocol(conn, args.category, 2025))
+                    conn.commit()
+            except Exception as exc:  # surfaced in the summary below
+                errors.append(exc)
+            finally:
+                conn.close()
+            with lock:
+                issued.extend(local)
+
+        threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+    total = args.writers * args.per_writer
+    first = protocol_start(args.category)
+    duplicates = len(issued) - len(set(issued))
+    gaps = sorted(set(range(first, first + total)) - set(issued))
+    print(f"writers={args.writers} allocations={len(issued)} in {elapsed:.2f}s "
+          f"-> {len(issued) / elapsed:.0f} alloc/s")
+    print(f"errors={len(errors)} duplicates={duplicates} gaps={len(gaps)}")
+    return 0 if not errors and not duplicates and not gaps and len(issued) == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
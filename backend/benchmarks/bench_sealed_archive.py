@@ -0,0 +1,108 @@
+"""Archive size and query latency: archive DB vs. sealed month.
+
+    python -m backend.benchmarks.bench_sealed_archive --rows 200000
+
+One month is archived with run_monthly_archive and queried through
+federated_query, then sealed with seal_month and queried again. For the
+size comparison a VACUUMed copy of the archive DB with covering indexes
+(the other read-only layout considered) is also measured.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services import federation
+from backend.src.services.archive import archive_dir, run_monthly_archive
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.federation import FederatedQuery, federated_query
+from backend.src.services.sealed import seal_month
+
+MONTH = "2024-03"
+
+
+def _queries(conn: sqlite3.Connection) -> dict:
+    mid_id, protocol = conn.execute(
+        "SELECT id, protocolNumber FROM registrations ORDER BY id LIMIT 1 OFFSET "
+        "(SELECT COUNT(*) / 2 FROM registrations)"
+    ).fetchone()
+    return {
+        "month page": FederatedQuery(month=MONTH, descending=True, limit=50),
+        "protocol lookup": FederatedQuery(month=MONTH, protocol_number=protocol, limit=50),
+        "term search": FederatedQuery(terms=["προμηθεια", "υλικου"], descending=True, limit=50),
+        "deep page": FederatedQuery(month=MONTH, descending=True, after_id=mid_id, limit=50),
+    }
+
+
+def _time(conn: sqlite3.Connection, q: FederatedQuery, repeat: int) -> float:
+    federated_query(conn, q)  # warm the catalogue and the page cache
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        federated_query(conn, q)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _vacuumed_size(db_path, workdir) -> int:
+    copy = os.path.join(workdir, "vacuumed.db")
+    shutil.copy(db_path, copy)
+    conn = sqlite3.connect(copy)
+    conn.executescript(
+        """
+        CREATE INDEX ix_month ON registrations(entryDate, category, deletedFlag, id);
+        CREATE INDEX ix_protocol ON registrations(protocolNumber, id);
+        VACUUM;
+        """
+    )
+    conn.close()
+    size = os.path.getsize(copy)
+    os.remove(copy)
+    return size
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        conn = get_connection()
+        bulk_insert(conn, generate_registrations(args.rows, start=date(2024, 3, 1), days=31))
+        queries = _queries(conn)
+        run_monthly_archive(conn, MONTH)
+
+        db_path = archive_dir() / f"{MONTH}.db"
+        db_size = db_path.stat().st_size
+        vacuumed = _vacuumed_size(db_path, td)
+        raw = {name: _time(conn, q, args.repeat) for name, q in queries.items()}
+
+        t0 = time.perf_counter()
+        result = seal_month(conn, MONTH)
+        seal_s = time.perf_counter() - t0
+        sealed = {name: _time(conn, q, args.repeat) for name, q in queries.items()}
+        conn.close()
+    federation.shutdown()
+
+    print(f"{args.rows} rows in {MONTH}, sealed in {seal_s:.1f}s")
+    print(f"  archive DB           {db_size / 2**20:7.1f} MiB")
+    print(f"  VACUUM + indexes     {vacuumed / 2**20:7.1f} MiB")
+    print(f"  sealed (data+index)  {result.sealedBytes / 2**20:7.1f} MiB "
+          f"({db_size / result.sealedBytes:.1f}x smaller)")
+    print(f"  {'query':<16} {'archive DB':>11} {'sealed':>9}")
+    for name in queries:
+        print(f"  {name:<16} {raw[name]:9.1f}ms {sealed[name]:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Full-text search latency on a synthetic register (target: p95 under 50 ms).
+
+    python -m backend.benchmarks.bench_search --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.search import build_match_query, search_registrations
+
+QUERIES = (
+    ("αιτηση", {}),
+    ("ΑΔΕΙΑΣ χορηγ", {}),
+    ("υπουργειο παιδειας", {"category": "common_incoming"}),
+    ("συμβασ", {"month": "2023-06"}),
+    ("Φ.512", {}),
+    ("εκθεση ελεγχου", {"category": "signals_outgoing", "month": "2024-02"}),
+)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        conn = get_connection()
+        start = time.perf_counter()
+        bulk_insert(conn, generate_registrations(args.rows))
+        print(f"indexed {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        worst = 0.0
+        for q, filters in QUERIES:
+            match = build_match_query(q)
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                rows, _ = search_registrations(conn, match, limit=50, **filters)
+                timings.append((time.perf_counter() - t0) * 1000)
+            p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+            worst = max(worst, p95)
+            print(f"{q!r:<28} {str(filters):<52} hits={len(rows):>3} "
+                  f"p50={statistics.median(timings):6.1f}ms p95={p95:6.1f}ms")
+        conn.close()
+        verdict = "OK" if worst <= args.target_ms else "OVER TARGET"
+        print(f"worst p95 {worst:.1f}ms (target {args.target_ms:.0f}ms): {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Cold start of the backend: import time and launch-to-ready time, against budgets.
+
+    python -m backend.benchmarks.bench_startup --import-budget-ms 1500 --startup-budget-ms 3000
+
+Imports the app in fresh interpreters with ``-X importtime`` and reports its
+cumulative import time and the slowest modules it pulls in. Then launches
+``cli.run --no-browser`` on a database created beforehand, as on a clerk's
+machine after the first start. It times each launch until the ready line
+is printed, then stops the server. The median of each measurement is
+compared with its budget, and the run exits with status 1 when either is
+over. Run it on the oldest workstation the app has to start on.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.benchmarks.bench_mixed_load import _free_port
+from backend.src.services.db import ensure_db
+
+APP = "backend.src.app"
+
+
+def import_times(env: dict) -> dict:
+    """Cumulative import time (ms) per module from one fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP}"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    times = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def launch_time(env: dict, port: int) -> float:
+    """Seconds from starting cli.run until it reports that it is ready."""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "backend.src.cli.run", "--no-browser", "--port", str(port)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        for line in proc.stdout:
+            if line.startswith("Server running at"):
+                return time.perf_counter() - started
+        raise SystemExit(f"server exited before it was ready (status {proc.wait()})")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--startup-budget-ms", type=float, default=3000.0)
+    parser.add_argument("--top", type=int, default=10, help="slowest imported modules to list")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as td:
+        env = dict(os.environ, REGISTRY_DB_PATH=os.path.join(td, "bench.db"), REGISTRY_SCHEDULER="0",
+                   REGISTRY_WORKERS="1")
+        os.environ["REGISTRY_DB_PATH"] = env["REGISTRY_DB_PATH"]
+        ensure_db()
+
+        runs = [import_times(env) for _ in range(args.repeat)]
+        imported = statistics.median(r[APP] for r in runs)
+        port = _free_port()
+        launches = [launch_time(env, port) * 1000 for _ in range(args.repeat)]
+        started = statistics.median(launches)
+
+    # Top-level packages (and our own modules) by their median cumulative time
+    modules = [m for m in runs[0] if m.startswith("backend.") or "." not in m]
+    slowest = sorted(((statistics.median(r.get(m, 0.0) for r in runs), m) for m in modules), reverse=True)
+    print(f"import {APP}: {imported:.0f}ms (budget {args.import_budget_ms:.0f}ms)")
+    for ms, name in slowest[1:args.top + 1]:
+        print(f"  {ms:7.1f}ms  {name}")
+    print(f"launch to ready: {started:.0f}ms median, {min(launches):.0f}-{max(launches):.0f}ms "
+          f"(budget {args.startup_budget_ms:.0f}ms)")
+    if imported > args.import_budget_ms or started > args.startup_budget_ms:
+        print("FAILED: over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
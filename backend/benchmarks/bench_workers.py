@@ -0,0 +1,151 @@
+"""Throughput with several server processes, and a duplicate-number check.
+
+    python -m backend.benchmarks.bench_workers --workers 1 2 4 --seconds 15
+
+For each worker count, starts uvicorn with that many processes on a fresh
+temporary database and keeps ``--clients`` clients busy creating
+registrations (single creates and 20-item batches, incoming and outgoing)
+and reading month pages. The clients run in ``--load-procs`` separate
+processes so the load generator is not the bottleneck. Afterwards every
+protocol and draft number is checked: the run fails (exit status 1) if any
+number was handed out twice. Scaling needs spare cores: on a machine with
+fewer cores than workers plus load processes the numbers stay flat.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from backend.benchmarks.bench_mixed_load import _free_port, _wait_ready
+from backend.src.services.db import get_connection, init_db
+
+MONTH = "2024-03"
+# kind -> share of requests
+MIX = {"create": 0.45, "batch": 0.05, "list": 0.50}
+BATCH_ITEMS = 20
+CATEGORIES = ("common_incoming", "common_outgoing")
+
+_DUPLICATE_PROTOCOLS = """
+    SELECT category, substr(entryDate, 1, 4) AS year, protocolNumber, COUNT(*)
+    FROM registrations GROUP BY category, year, protocolNumber HAVING COUNT(*) > 1
+"""
+_DUPLICATE_DRAFTS = """
+    SELECT category, draftNumber, COUNT(*) FROM registrations
+    WHERE draftNumber IS NOT NULL GROUP BY category, draftNumber HAVING COUNT(*) > 1
+"""
+
+
+def _item(category: str, n: int) -> dict:
+    item = {"issuer": "Δήμος Αθηναίων", "referenceNumber": f"Φ.{n}", "subject": "Αίτηση χορήγησης άδειας",
+            "offices": ["OFF-1"], "entryDate": f"{MONTH}-20"}
+    if category.endswith("outgoing"):
+        item["recipient"] = "Υπουργείο Εσωτερικών"
+    return item
+
+
+async def _client(base: str, deadline: float, counts: dict, seed: int) -> None:
+    rng = random.Random(seed)
+    kinds, weights = list(MIX), list(MIX.values())
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        n = 0
+        while time.perf_counter() < deadline:
+            kind, category = rng.choices(kinds, weights)[0], rng.choice(CATEGORIES)
+            n += 1
+            if kind == "create":
+                res = await client.post(f"/registrations/{category}", json=_item(category, n))
+                created = 1
+            elif kind == "batch":
+                items = [_item(category, n * BATCH_ITEMS + i) for i in range(BATCH_ITEMS)]
+                res = await client.post(f"/registrations/{category}/batch", json={"items": items})
+                created = BATCH_ITEMS
+            else:
+                res = await client.get("/registrations", params={"month": MONTH, "pageSize": 50})
+                created = 0
+            if res.status_code >= 400:
+                counts["errors"] += 1
+            else:
+                counts["requests"] += 1
+                counts["created"] += created
+
+
+def _load_process(base: str, clients: int, seconds: float, seed: int) -> dict:
+    counts = {"requests": 0, "created": 0, "errors": 0}
+
+    async def run() -> None:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(_client(base, deadline, counts, seed * 1000 + i) for i in range(clients)))
+
+    asyncio.run(run())
+    return counts
+
+
+def run_workers(workers: int, clients: int, load_procs: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as td:
+        db_path = os.path.join(td, "bench.db")
+        env = dict(os.environ, REGISTRY_DB_PATH=db_path, REGISTRY_SCHEDULER="0", REGISTRY_WORKERS=str(workers))
+        os.environ["REGISTRY_DB_PATH"] = db_path
+        init_db()
+
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.src.app:app", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            _wait_ready(base, proc)
+            time.sleep(1.0)  # the first worker answers before the others are up
+            per_proc = max(1, clients // load_procs)
+            with ProcessPoolExecutor(load_procs) as pool:
+                results = list(pool.map(_load_process, [base] * load_procs, [per_proc] * load_procs,
+                                        [seconds] * load_procs, range(load_procs)))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        totals = {key: sum(r[key] for r in results) for key in results[0]}
+        conn = get_connection()
+        totals["rows"] = conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+        totals["duplicates"] = (len(conn.execute(_DUPLICATE_PROTOCOLS).fetchall())
+                                + len(conn.execute(_DUPLICATE_DRAFTS).fetchall()))
+        conn.close()
+    return totals
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--load-procs", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients in {args.load_procs} processes, {args.seconds:.0f}s each")
+    print(f"  {'workers':>7} {'req/s':>8} {'rows/s':>8} {'rows':>8} {'errors':>7} {'duplicates':>10}")
+    failed = False
+    baseline = None
+    for workers in args.workers:
+        t = run_workers(workers, args.clients, args.load_procs, args.seconds)
+        rate = t["requests"] / args.seconds
+        baseline = baseline or rate
+        print(f"  {workers:>7} {rate:8.0f} {t['created'] / args.seconds:8.0f} {t['rows']:8d} "
+              f"{t['errors']:7d} {t['duplicates']:10d}   x{rate / baseline:.2f}", flush=True)
+        # Every acknowledged create must be in the database, each with its own numbers
+        failed |= t["duplicates"] > 0 or t["rows"] < t["created"]
+    if failed:
+        print("FAILED: numbers were handed out twice or acknowledged rows are missing")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Benchmark suite: the register's core operations on a synthetic register, as JSON.
+
+    python -m backend.benchmarks.suite --rows 1000000
+    python -m backend.benchmarks.suite --rows 1000000 --compare bench-results/<earlier>.json
+
+Builds a register of ``--rows`` registrations (see synthetic.build_register),
+then times each scenario with the functions the request handlers run on their
+DB thread, without HTTP: numbering, create, list (first, keyset and
+per-office pages), search, delete and archive. Data and operation order are
+seeded, so two runs on different commits do the same work. Results go to
+``bench-results/<time>-<commit>.json``. With ``--compare``, scenarios whose
+median got slower than ``--tolerance`` are listed and the exit status is 1,
+so the suite can gate a release.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.benchmarks.synthetic import CATEGORIES, OFFICES, build_register
+from backend.src.api.paging import encode_cursor
+from backend.src.api.registrations import _delete_registration, _insert_registration, _list_page
+from backend.src.models.registration import RegistrationCreate
+from backend.src.services.archive import run_monthly_archive
+from backend.src.services.db import begin_immediate, get_connection, init_db
+from backend.src.services.numbering import next_protocol
+from backend.src.services.search import build_match_query, search_registrations
+
+FORMAT = 1
+SEARCHES = (
+    ("αιτηση", {}),
+    ("ΑΔΕΙΑΣ χορηγ", {}),
+    ("υπουργειο παιδειας", {"category": "common_incoming"}),
+    ("συμβασ", {"month": "2023-06"}),
+    ("Φ.512", {}),
+    ("εκθεση ελεγχου", {"category": "signals_outgoing", "month": "2024-02"}),
+)
+
+
+def _git_commit() -> Dict[str, object]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "p50Ms": round(statistics.median(ordered), 4),
+        "p95Ms": round(ordered[int(0.95 * (len(ordered) - 1))], 4),
+        "maxMs": round(ordered[-1], 4),
+        "meanMs": round(total / len(ordered), 4),
+        "perSecond": round(len(ordered) / (total / 1000), 1) if total else None,
+    }
+
+
+def _timed(op: Callable[[int], object], repeat: int, warmup: int = 3) -> List[float]:
+    for i in range(warmup):
+        op(i)
+    timings = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        op(warmup + i)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+class Suite:
+    def __init__(self, conn: sqlite3.Connection, repeat: int, seed: int):
+        self.conn = conn
+        self.repeat = repeat
+        self.rng = random.Random(seed)
+        self.months = [r[0] for r in conn.execute(
+            "SELECT DISTINCT entryMonth FROM registration_counts ORDER BY entryMonth"
+        )]
+        self.max_id = conn.execute("SELECT MAX(id) FROM registrations").fetchone()[0]
+
+    def numbering(self) -> List[float]:
+        def op(i: int) -> None:
+            begin_immediate(self.conn)
+            next_protocol(self.conn, CATEGORIES[i % len(CATEGORIES)], 2024)
+            self.conn.commit()
+        return _timed(op, self.repeat)
+
+    def create(self) -> List[float]:
+        payload = RegistrationCreate(
+            issuer="Δήμος Αθηναίων", referenceNumber="Φ.100/1", subject="Αίτηση χορήγησης άδειας",
+            recipient="Υπουργείο Παιδείας", offices=["OFF-1"], entryDate="2024-06-03",
+        )
+
+        def op(i: int) -> None:
+            _insert_registration(self.conn, CATEGORIES[i % len(CATEGORIES)], payload)
+            self.conn.commit()
+        return _timed(op, self.repeat)
+
+    def list_first_page(self) -> List[float]:
+        def op(i: int) -> None:
+            month = self.rng.choice(self.months)
+            category = self.rng.choice((None,) + CATEGORIES)
+            _list_page(self.conn, month, category, 1, 50, None, False)
+        return _timed(op, self.repeat)
+
+    def list_keyset_page(self) -> List[float]:
+        bounds = {month: tuple(self.conn.execute(
+            "SELECT MIN(id), MAX(id) FROM registrations WHERE deletedFlag = 0 AND entryMonth = ?", (month,)
+        ).fetchone()) for month in self.months}
+
+        def op(i: int) -> None:
+            month = self.rng.choice(self.months)
+            after = encode_cursor({"id": self.rng.randint(*bounds[month])})
+            _list_page(self.conn, month, self.rng.choice(CATEGORIES), 2, 50, after, False)
+        return _timed(op, self.repeat)
+
+    def list_office_page(self) -> List[float]:
+        offices = sorted({code for value in OFFICES for code in value.split(",")})
+
+        def op(i: int) -> None:
+            month = self.rng.choice(self.months)
+            category = self.rng.choice((None,) + CATEGORIES[::2])
+            _list_page(self.conn, month, category, 1, 50, None, False, self.rng.choice(offices))
+        return _timed(op, self.repeat)
+
+    def search(self) -> List[float]:
+        matches = [(build_match_query(q), filters) for q, filters in SEARCHES]
+
+        def op(i: int) -> None:
+            match, filters = matches[i % len(matches)]
+            search_registrations(self.conn, match, limit=50, **filters)
+        return _timed(op, max(len(matches), self.repeat // 5))
+
+    def delete(self) -> List[float]:
+        ids = self.rng.sample(range(1, self.max_id + 1), self.repeat + 3)
+
+        def op(i: int) -> None:
+            _delete_registration(self.conn, ids[i])
+            self.conn.commit()
+        return _timed(op, self.repeat)
+
+    def archive(self, months: int) -> Dict[str, object]:
+        timings, moved = [], 0
+        for month in self.months[:months]:
+            t0 = time.perf_counter()
+            moved += run_monthly_archive(self.conn, month, pause=0).itemsMoved
+            timings.append((time.perf_counter() - t0) * 1000)
+        result = _summary(timings)
+        result["rowsPerSecond"] = round(moved / (sum(timings) / 1000), 1)
+        return result
+
+
+def run(rows: int, repeat: int, seed: int, archive_months: int) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "bench.db")
+        init_db()
+        started = time.perf_counter()
+        build = build_register(rows, seed=seed)
+        build_seconds = time.perf_counter() - started
+        conn = get_connection()
+        suite = Suite(conn, repeat, seed)
+        scenarios: Dict[str, Dict[str, object]] = {}
+        # Reads first, then writes; archiving last since it removes months
+        for name, fn in (
+            ("list_first_page", suite.list_first_page),
+            ("list_keyset_page", suite.list_keyset_page),
+            ("list_office_page", suite.list_office_page),
+            ("search", suite.search),
+            ("numbering", suite.numbering),
+            ("create", suite.create),
+            ("delete", suite.delete),
+        ):
+            scenarios[name] = _summary(fn())
+            print(f"{name:<18} {_format(scenarios[name])}", flush=True)
+        scenarios["archive"] = suite.archive(archive_months)
+        print(f"{'archive':<18} {_format(scenarios['archive'])}", flush=True)
+        conn.close()
+    return {
+        "format": FORMAT,
+        "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "rows": rows,
+        "repeat": repeat,
+        "seed": seed,
+        "build": {"seconds": round(build_seconds, 2), **{k: round(v, 2) for k, v in build.items()},
+                  "rowsPerSecond": round(rows / build_seconds, 1)},
+        "scenarios": scenarios,
+    }
+
+
+def _format(s: Dict[str, object]) -> str:
+    return f"n={s['n']:>4} p50={s['p50Ms']:8.3f}ms p95={s['p95Ms']:8.3f}ms max={s['maxMs']:8.3f}ms"
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], tolerance: float,
+            floor_ms: float) -> List[str]:
+    """Scenarios whose median is slower than the baseline's by more than ``tolerance``.
+
+    Medians under ``floor_ms`` in both runs are timer noise and never count.
+    """
+    regressions = []
+    print(f"\nagainst {baseline.get('git', {}).get('commit')} ({baseline.get('rows')} rows):")
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            print(f"  {name:<18} (new)")
+            continue
+        change = (now["p50Ms"] - before["p50Ms"]) / before["p50Ms"] if before["p50Ms"] else 0.0
+        slower = change > tolerance and max(now["p50Ms"], before["p50Ms"]) >= floor_ms
+        flag = "  REGRESSION" if slower else ""
+        print(f"  {name:<18} p50 {before['p50Ms']:8.3f} -> {now['p50Ms']:8.3f} ms ({change:+.0%}){flag}")
+        if slower:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--archive-months", type=int, default=3)
+    parser.add_argument("--out", type=Path, help="result file (default: bench-results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown (0.25 = 25%%)")
+    parser.add_argument("--floor-ms", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.repeat, args.seed, args.archive_months)
+    out = args.out
+    if out is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = Path("bench-results") / f"{stamp}-{result['git']['commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"built {args.rows} rows in {result['build']['seconds']}s; results in {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("rows") != args.rows:
+            print(f"note: baseline has {baseline.get('rows')} rows, this run {args.rows}")
+        regressions = compare(result, baseline, args.tolerance, args.floor_ms)
+        if regressions:
+            print(f"slower than baseline: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
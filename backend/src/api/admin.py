@@ -1,14 +1,144 @@
-from fastapi import APIRouter
+import sqlite3
+from dataclasses import asdict
+from typing import Literal, Optional
 
-from backend.src.services.db import get_connection
-from backend.src.services.archive import run_monthly_archive
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from backend.src.services import cache as response_cache
+from backend.src.services import profiler, querylog
+from backend.src.services.cache import get_response_cache
+from backend.src.services.db import get_db
+from backend.src.services.archive import compact_database, run_monthly_archive
+from backend.src.services.offices import list_offices, save_office
+from backend.src.services.sealed import SealedArchiveError, seal_month
+from backend.src.services.scheduler import configured_jobs, get_scheduler, job_lock, job_status, run_job
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+class OfficeUpdate(BaseModel):
+    label: str = Field(min_length=1, max_length=200)
+    # Inactive offices stay on existing registrations but leave /meta/offices
+    active: bool = True
+
+
 @router.post("/archive/run")
-def run_archive():
-    conn = get_connection()
-    result = run_monthly_archive(conn)
-    conn.close()
-    return {"month": result.month, "itemsMoved": result.itemsMoved}
+def run_archive(
+    background_tasks: BackgroundTasks,
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    # The archive job's lock: never two archivers at once in this process
+    lock = job_lock("archive")
+    if not lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="an archive run is already in progress")
+    try:
+        result = run_monthly_archive(conn, month)
+    finally:
+        lock.release()
+    # Shrinking the main file can take a while; do it after responding
+    background_tasks.add_task(compact_database)
+    return {
+        "month": result.month,
+        "itemsMoved": result.itemsMoved,
+        "chunks": result.chunks,
+        "resumed": result.resumed,
+    }
+
+
+@router.post("/archive/{month}/seal")
+def seal_archive(
+    month: str = Path(..., pattern=r"^\d{4}-\d{2}$"),
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    try:
+        result = seal_month(conn, month)
+    except SealedArchiveError as exc:
+        raise HTTPException(status_code=500, detail=f"sealed archive failed verification: {exc}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="no finished archive for this month")
+    return asdict(result)
+
+
+@router.get("/cache")
+def cache_stats():
+    # Response cache hit/miss/304 counters and current size
+    return get_response_cache().stats()
+
+
+@router.get("/queries")
+def query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order: Literal["totalMs", "maxMs", "meanMs", "calls", "rows", "vmSteps"] = Query("totalMs"),
+):
+    # Per-statement timings collected while REGISTRY_SLOW_QUERY_MS is set
+    log = querylog.current()
+    if log is None:
+        raise HTTPException(status_code=404, detail="query tracing is off (set REGISTRY_SLOW_QUERY_MS)")
+    return {"thresholdMs": log.threshold * 1000, "log": str(log.path), "statements": log.summary(limit, order)}
+
+
+@router.delete("/queries", status_code=204)
+def reset_query_stats():
+    log = querylog.current()
+    if log is not None:
+        log.reset()
+
+
+@router.post("/profile")
+async def profile_server(
+    seconds: float = Query(10.0, gt=0, le=profiler.MAX_SECONDS),
+    interval: float = Query(profiler.DEFAULT_INTERVAL, ge=0.001, le=1.0),
+    fmt: Literal["json", "collapsed"] = Query("json", alias="format"),
+    includeIdle: bool = Query(False),
+    limit: int = Query(30, ge=1, le=500),
+):
+    # Samples every thread's stack while the server keeps serving; the
+    # sampler runs in a worker thread so the event loop is profiled too
+    try:
+        result = await run_in_threadpool(profiler.sample, seconds, interval, includeIdle)
+    except profiler.ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if fmt == "collapsed":
+        return PlainTextResponse(result.collapsed())
+    return result.summary(limit)
+
+
+@router.get("/jobs")
+def list_jobs(conn: sqlite3.Connection = Depends(get_db)):
+    # Maintenance jobs with schedule, next run and the last run's duration/status
+    return job_status(conn)
+
+
+@router.post("/jobs/{name}/run")
+def run_job_now(name: str = Path(...), conn: sqlite3.Connection = Depends(get_db)):
+    scheduler = get_scheduler()
+    jobs = scheduler.jobs if scheduler else {job.name: job for job in configured_jobs()}
+    job = jobs.get(name)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not run_job(job):
+        raise HTTPException(status_code=409, detail="job is already running")
+    return next(j for j in job_status(conn) if j["name"] == name)
+
+
+@router.get("/offices")
+def get_all_offices(conn: sqlite3.Connection = Depends(get_db)):
+    # Every office, inactive ones included
+    return list_offices(conn, include_inactive=True)
+
+
+@router.put("/offices/{code}")
+def put_office(
+    # Codes are stored comma-joined on registrations
+    code: str = Path(..., pattern=r"^[^,\s]+$", max_length=64),
+    office: OfficeUpdate = ...,
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    saved = save_office(conn, code, office.label, office.active)
+    conn.commit()
+    response_cache.invalidate("offices")
+    return saved
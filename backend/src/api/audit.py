@@ -0,0 +1,35 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.src.api.paging import decode_cursor, encode_cursor, rendered
+from backend.src.services.audit import list_events
+from backend.src.services.db import get_executor
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+@router.get("")
+async def list_audit_events(
+    from_: Optional[date] = Query(None, alias="from", description="First local day (server time zone) to include"),
+    to: Optional[date] = Query(None, description="Last local day (server time zone) to include"),
+    user: Optional[str] = Query(None, max_length=255),
+    action: Optional[Literal["create", "delete"]] = Query(None),
+    pageSize: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous page's nextCursor"),
+):
+    # Audit events of the main database, newest first; archived months keep
+    # theirs in their archive file (see GET /registrations/{id}/history)
+    if from_ and to and from_ > to:
+        raise HTTPException(status_code=400, detail="'from' is after 'to'")
+    position = decode_cursor(after, "ts", "id") if after else None
+    return await get_executor().read(rendered(_audit_page), from_, to, user, action, pageSize, position)
+
+
+def _audit_page(conn, from_, to, user, action, pageSize, position):
+    events, next_position = list_events(
+        conn, start=from_, end=to, username=user, action=action, limit=pageSize, after=position
+    )
+    next_cursor = encode_cursor(next_position) if next_position else None
+    return {"items": events, "pageSize": pageSize, "nextCursor": next_cursor}
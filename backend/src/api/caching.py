@@ -0,0 +1,32 @@
+import inspect
+from typing import Awaitable, Callable, Hashable, Optional, Union
+
+from fastapi import Request, Response
+
+from backend.src.services.cache import Tag, etag_matches, get_response_cache
+
+Render = Callable[[], Union[bytes, Awaitable[bytes]]]
+
+
+async def cached_json(request: Request, key: Hashable, tag: Optional[Tag], render: Render) -> Response:
+    """Serve a JSON body from the response cache, rendering it on a miss.
+
+    Every answer carries an ETag and ``Cache-Control: no-cache``, so clients
+    revalidate with If-None-Match and get an empty 304 while the body is
+    unchanged.
+    """
+    cache = get_response_cache()
+    entry = cache.get(key) if cache.enabled else None
+    state = "hit"
+    if entry is None:
+        state = "miss"
+        version = cache.version(tag)
+        body = render()
+        if inspect.isawaitable(body):
+            body = await body
+        entry = cache.put(key, body, tag, version)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": state}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        cache.not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
@@ -1,25 +1,35 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from backend.src.api.caching import cached_json
+from backend.src.services.db import get_executor
+from backend.src.services.offices import list_offices
 
 router = APIRouter(prefix="/meta", tags=["meta"])
 
+# Minimal bilingual field labels
+FIELDS = {
+    "issuer": {"el": "Αποστολέας", "en": "Issuer"},
+    "referenceNumber": {"el": "Αρ. Αναφοράς", "en": "Reference Number"},
+    "subject": {"el": "Θέμα", "en": "Subject"},
+    "recipient": {"el": "Παραλήπτης", "en": "Recipient"},
+    "offices": {"el": "Γραφεία", "en": "Offices"},
+    "entryDate": {"el": "Ημερομηνία Καταχώρησης", "en": "Entry Date"},
+}
+
+# Offices live in the offices table (PUT /admin/offices/{code}); cached under
+# their own tag, dropped when an office changes
+OFFICES_TAG = ("offices", None)
+
 
 @router.get("/fields")
-def get_fields():
-    # Minimal bilingual field labels
-    return {
-        "issuer": {"el": "Αποστολέας", "en": "Issuer"},
-        "referenceNumber": {"el": "Αρ. Αναφοράς", "en": "Reference Number"},
-        "subject": {"el": "Θέμα", "en": "Subject"},
-        "recipient": {"el": "Παραλήπτης", "en": "Recipient"},
-        "offices": {"el": "Γραφεία", "en": "Offices"},
-        "entryDate": {"el": "Ημερομηνία Καταχώρησης", "en": "Entry Date"},
-    }
+async def get_fields(request: Request):
+    return await cached_json(request, ("meta", "fields"), None, lambda: JSONResponse(FIELDS).body)
 
 
 @router.get("/offices")
-def get_offices():
-    # Placeholder list; in real app this could be configurable
-    return [
-        {"code": "OFF-1", "label": "Office 1"},
-        {"code": "OFF-2", "label": "Office 2"},
-    ]
+async def get_offices(request: Request):
+    async def render() -> bytes:
+        return JSONResponse(await get_executor().read(list_offices)).body
+
+    return await cached_json(request, ("meta", "offices"), OFFICES_TAG, render)
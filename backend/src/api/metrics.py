@@ -0,0 +1,64 @@
+import time
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend.src.services import metrics
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus text format; scrape it with any collector, or just curl it.
+    # REGISTRY_METRICS=0 switches recording off and hides the endpoint.
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """Observe every HTTP request in the per-route latency histogram.
+
+    Plain ASGI rather than BaseHTTPMiddleware: no extra task or body
+    buffering per request. The route label is the matched path template,
+    which the router leaves in ``scope["route"]``; the time includes
+    sending a streamed body. Server-Sent Events responses are left out:
+    they stay open for as long as the client listens, and
+    registry_feed_subscribers counts them instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.enabled():
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        event_stream = False
+
+        async def send_wrapper(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not event_stream:
+                route = scope.get("route")
+                metrics.HTTP_SECONDS.observe(
+                    time.perf_counter() - started,
+                    scope["method"],
+                    metrics.route_label(getattr(route, "path", None)),
+                    str(status),
+                )
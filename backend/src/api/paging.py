@@ -0,0 +1,34 @@
+import base64
+import json
+import sqlite3
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Opaque ``nextCursor`` token for a page position."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *keys: str) -> Dict[str, Any]:
+    """Position of an ``after`` token; 400 unless it is well formed and has ``keys``."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        position = json.loads(raw)
+        if not all(k in position for k in keys):
+            raise ValueError(token)
+        return position
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def rendered(page: Callable[..., Dict[str, Any]]) -> Callable[..., JSONResponse]:
+    """Wrap a DB-executor page function so it returns the encoded response."""
+    # Encode the page on the DB thread as well: for async handlers FastAPI
+    # would otherwise serialise it on the event loop
+    def run(conn: sqlite3.Connection, *args: Any) -> JSONResponse:
+        return JSONResponse(page(conn, *args))
+    return run
@@ -1,21 +1,42 @@
 import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
 
-from fastapi import APIRouter, HTTPException, Path, Query
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from backend.src.services.db import get_connection
+from backend.src.api.caching import cached_json
+from backend.src.api.paging import decode_cursor, encode_cursor, rendered
+from backend.src.models.registration import RegistrationCreate, category_error, validation_message
+from backend.src.services import audit, feed, metrics
+from backend.src.services import cache as response_cache
+from backend.src.services.db import get_db, get_executor
+from backend.src.services.federation import (
+    FederatedQuery,
+    archived_audit_events,
+    archived_total,
+    federated_query,
+)
+from backend.src.services.ingest import NewRegistration, insert_registrations
 from backend.src.services.numbering import next_draft, next_protocol
+from backend.src.services.offices import count_office
+from backend.src.services.search import build_match_query, search_registrations, search_terms
+from backend.src.services.workers import worker_count
 
 
-class RegistrationCreate(BaseModel):
-    issuer: str = Field(max_length=255)
-    referenceNumber: str = Field(max_length=255)
-    subject: str = Field(max_length=255)
-    recipient: Optional[str] = Field(default=None, max_length=255)
-    offices: Optional[List[str]] = None
-    entryDate: Optional[date] = None
+MAX_BATCH_ITEMS = 10000
+
+
+class RegistrationBatch(BaseModel):
+    # Raw payloads, validated one by one so errors can be reported per item
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    # atomic: any invalid item rejects the batch; best_effort: insert the valid ones
+    mode: Literal["atomic", "best_effort"] = "atomic"
 
 
 router = APIRouter(prefix="/registrations", tags=["registrations"])
@@ -26,19 +47,16 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
-def _insert_registration(category: str, payload: RegistrationCreate) -> Dict[str, Any]:
-    # Minimal validation in line with OpenAPI description
-    if category.endswith("incoming"):
-        if not payload.offices or len(payload.offices) == 0:
-            raise HTTPException(status_code=400, detail="offices required for incoming categories")
-    if category.endswith("outgoing"):
-        if not payload.recipient:
-            raise HTTPException(status_code=400, detail="recipient required for outgoing categories")
+def _insert_registration(
+    conn: sqlite3.Connection, category: str, payload: RegistrationCreate
+) -> Dict[str, Any]:
+    error = category_error(category, payload)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
     entry_date = payload.entryDate or date.today()
     created_at = _now_iso()
 
-    conn = get_connection()
     cur = conn.cursor()
     # Determine numbers transactionally
     year = entry_date.year
@@ -47,38 +65,30 @@ def _insert_registration(category: str, payload: RegistrationCreate) -> Dict[str
     if category.endswith("outgoing"):
         draft_number = next_draft(conn, category)
 
-    cur.execute(
-        """
-        INSERT INTO registrations (
-            category, issuer, referenceNumber, subject, recipient, offices,
-            protocolNumber, draftNumber, entryDate, createdAt, deletedFlag
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-        """,
-        (
-            category,
-            payload.issuer,
-            payload.referenceNumber,
-            payload.subject,
-            payload.recipient,
-            ",".join(payload.offices) if payload.offices else None,
-            protocol_number,
-            draft_number,
-            entry_date.isoformat(),
-            created_at,
-        ),
-    )
+    with metrics.timed("insert"):
+        cur.execute(
+            """
+            INSERT INTO registrations (
+                category, issuer, referenceNumber, subject, recipient, offices,
+                protocolNumber, draftNumber, entryDate, createdAt, deletedFlag
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            (
+                category,
+                payload.issuer,
+                payload.referenceNumber,
+                payload.subject,
+                payload.recipient,
+                ",".join(payload.offices) if payload.offices else None,
+                protocol_number,
+                draft_number,
+                entry_date.isoformat(),
+                created_at,
+            ),
+        )
     reg_id = cur.lastrowid
-    # Audit event
-    username = os.environ.get("USERNAME") or "unknown"
-    cur.execute(
-        """
-        INSERT INTO audit_events (action, registrationId, timestamp, username)
-        VALUES ('create', ?, ?, ?)
-        """,
-        (reg_id, created_at, username),
-    )
-    conn.commit()
-    conn.close()
+    audit.record(conn, "create", reg_id, created_at, os.environ.get("USERNAME") or "unknown")
+    # No commit here: the write queue commits concurrent requests together
 
     return {
         "id": reg_id,
@@ -98,76 +108,459 @@ def _insert_registration(category: str, payload: RegistrationCreate) -> Dict[str
 
 
 @router.post("/{category}", status_code=201)
-def create_registration(
+async def create_registration(
     category: str = Path(...,
                          pattern="^(common|confidential|signals)_(incoming|outgoing)$"),
     payload: RegistrationCreate = ...,
 ):
-    return _insert_registration(category, payload)
+    created = await get_executor().write(_insert_registration, category, payload)
+    response_cache.invalidate(created["entryDate"][:7], category)
+    feed.publish(feed.Change("created", category, created["id"], created["entryDate"][:7], created))
+    return created
+
+
+def _row_to_item(r: sqlite3.Row) -> Dict[str, Any]:
+    offices = r["offices"].split(",") if r["offices"] else None
+    return {
+        "id": r["id"],
+        "category": r["category"],
+        "issuer": r["issuer"],
+        "referenceNumber": r["referenceNumber"],
+        "subject": r["subject"],
+        "recipient": r["recipient"],
+        "offices": offices,
+        "protocolNumber": r["protocolNumber"],
+        "draftNumber": r["draftNumber"],
+        "entryDate": r["entryDate"],
+        "createdAt": r["createdAt"],
+        "deletedFlag": bool(r["deletedFlag"]),
+        "deletedAt": r["deletedAt"],
+    }
+
+
+def _month_total(
+    conn: sqlite3.Connection, month: str, category: Optional[str], office: Optional[str] = None
+) -> int:
+    if office:
+        return count_office(conn, office, month, category)
+    sql = "SELECT COALESCE(SUM(total), 0) FROM registration_counts WHERE entryMonth = ?"
+    params: List[Any] = [month]
+    if category:
+        sql += " AND category = ?"
+        params.append(category)
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def _validate_batch(
+    category: str, batch: RegistrationBatch
+) -> Tuple[List[int], List[NewRegistration], List[Dict[str, Any]]]:
+    valid: List[int] = []
+    entries: List[NewRegistration] = []
+    errors: List[Dict[str, Any]] = []
+    today = date.today()
+    for index, raw in enumerate(batch.items):
+        try:
+            payload = RegistrationCreate.model_validate(raw)
+        except ValidationError as exc:
+            errors.append({"index": index, "error": validation_message(exc)})
+            continue
+        error = category_error(category, payload)
+        if error:
+            errors.append({"index": index, "error": error})
+            continue
+        valid.append(index)
+        entries.append(NewRegistration(
+            issuer=payload.issuer,
+            referenceNumber=payload.referenceNumber,
+            subject=payload.subject,
+            recipient=payload.recipient,
+            offices=payload.offices,
+            entryDate=payload.entryDate or today,
+        ))
+    return valid, entries, errors
+
+
+@router.post("/{category}/batch", status_code=201)
+async def create_registrations_batch(
+    category: str = Path(...,
+                         pattern="^(common|confidential|signals)_(incoming|outgoing)$"),
+    batch: RegistrationBatch = ...,
+):
+    # Validate everything first (off the event loop, but without holding the
+    # writer), then number and insert the valid items in one transaction
+    valid, entries, errors = await run_in_threadpool(_validate_batch, category, batch)
+    if errors and batch.mode == "atomic":
+        raise HTTPException(status_code=422, detail={"errors": errors})
+
+    username = os.environ.get("USERNAME") or "unknown"
+    assigned = await get_executor().write(insert_registrations, category, entries, username)
+    for month in {entry.entryDate.strftime("%Y-%m") for entry in entries}:
+        response_cache.invalidate(month, category)
+    if assigned:
+        feed.publish(feed.Change("changed", category))
+    items = [
+        {"index": index, "id": reg_id, "protocolNumber": protocol, "draftNumber": draft}
+        for index, (reg_id, protocol, draft) in zip(valid, assigned)
+    ]
+    return {"created": len(items), "items": items, "errors": errors}
+
+
+@router.post("/{category}/import")
+async def import_registrations(
+    request: Request,
+    category: str = Path(...,
+                         pattern="^(common|confidential|signals)_(incoming|outgoing)$"),
+    fmt: Literal["csv", "xlsx"] = Query("csv", alias="format"),
+    keepNumbers: bool = Query(False),
+    fileName: Optional[str] = Query(None, max_length=255),
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    # Raw file as the request body (no multipart). It is spooled to disk as it
+    # arrives, then imported chunk by chunk; re-uploading the same file after
+    # an interruption resumes it. An import can run for minutes, so it uses a
+    # pooled connection on a threadpool worker instead of holding the DB
+    # executor's writer thread; its chunks interleave with other writes.
+    # The importer (and its XLSX reader) loads on first use, not at startup.
+    from backend.src.services.importer import UNREADABLE_FILE_ERRORS, import_file
+
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, f"upload.{fmt}")
+        with open(path, "wb") as f:
+            async for block in request.stream():
+                f.write(block)
+        username = os.environ.get("USERNAME") or "unknown"
+        try:
+            report = await run_in_threadpool(
+                import_file, conn, path, category, fmt=fmt, keep_numbers=keepNumbers,
+                username=username, file_name=fileName or f"upload.{fmt}",
+            )
+        except UNREADABLE_FILE_ERRORS as exc:
+            raise HTTPException(status_code=400, detail=f"unreadable {fmt} file: {exc}")
+    if report.inserted:
+        feed.publish(feed.Change("changed", category))
+    return report.as_dict()
 
 
 @router.get("")
-def list_registrations(
+async def list_registrations(
+    request: Request,
     month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
     category: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
+    pageSize: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous page's nextCursor"),
+    includeArchive: bool = Query(False),
+    office: Optional[str] = Query(None, max_length=64),
 ):
-    # Minimal list returning items within month (by entryDate prefix)
-    conn = get_connection()
+    args = (month, category, page, pageSize, after, includeArchive, office)
+    if includeArchive:
+        return await get_executor().read(rendered(_list_page), *args)
+
+    async def render() -> bytes:
+        return (await get_executor().read(rendered(_list_page), *args)).body
+
+    # Main-DB pages are cached until a write to their month and category
+    key = ("list", month, category, page, pageSize, after, office)
+    return await cached_json(request, key, (month, category), render)
+
+
+@metrics.timed("list")
+def _list_page(
+    conn: sqlite3.Connection,
+    month: str,
+    category: Optional[str],
+    page: int,
+    pageSize: int,
+    after: Optional[str],
+    includeArchive: bool,
+    office: Optional[str] = None,
+) -> Dict[str, Any]:
+    if includeArchive:
+        fq = FederatedQuery(
+            month=month,
+            category=category,
+            office=office,
+            after_id=int(decode_cursor(after, "id")["id"]) if after else None,
+            limit=pageSize,
+        )
+        rows, last_id = federated_query(conn, fq)
+        return {
+            "items": [dict(_row_to_item(r), source=r["source"]) for r in rows],
+            "page": page,
+            "pageSize": pageSize,
+            "total": (_month_total(conn, month, category, office)
+                      + archived_total(conn, month, category, office)),
+            "nextCursor": encode_cursor({"id": last_id}) if last_id is not None else None,
+        }
+
+    # Items within month; served by the (deletedFlag, entryMonth[, category]) indexes,
+    # or with an office by the registration_offices range of that office and month.
+    # Keyset paging via `after`; `page` is kept for older clients and uses OFFSET.
     cur = conn.cursor()
-    sql = "SELECT * FROM registrations WHERE deletedFlag = 0 AND entryDate LIKE ?"
-    params: List[Any] = [f"{month}%"]
+    if office:
+        # CROSS JOIN keeps the junction as the outer loop
+        sql = (
+            "SELECT r.* FROM registration_offices o CROSS JOIN registrations r ON r.id = o.registrationId "
+            "WHERE o.office = ? AND o.entryMonth = ?"
+        )
+        params: List[Any] = [office, month]
+        prefix = "o."
+        id_col = "o.registrationId"
+    else:
+        sql = "SELECT * FROM registrations WHERE deletedFlag = 0 AND entryMonth = ?"
+        params = [month]
+        prefix = ""
+        id_col = "id"
     if category:
-        sql += " AND category = ?"
+        sql += f" AND {prefix}category = ?"
         params.append(category)
-    sql += " ORDER BY id LIMIT 100 OFFSET ?"
-    params.append((page - 1) * 100)
+    if after:
+        sql += f" AND {id_col} > ?"
+        params.append(int(decode_cursor(after, "id")["id"]))
+    # One extra row tells us whether another page exists
+    sql += f" ORDER BY {id_col} LIMIT ?"
+    params.append(pageSize + 1)
+    if not after and page > 1:
+        sql += " OFFSET ?"
+        params.append((page - 1) * pageSize)
     rows = cur.execute(sql, params).fetchall()
-    conn.close()
 
-    def row_to_item(r):
-        offices = r["offices"].split(",") if r["offices"] else None
-        return {
-            "id": r["id"],
-            "category": r["category"],
-            "issuer": r["issuer"],
-            "referenceNumber": r["referenceNumber"],
-            "subject": r["subject"],
-            "recipient": r["recipient"],
-            "offices": offices,
-            "protocolNumber": r["protocolNumber"],
-            "draftNumber": r["draftNumber"],
-            "entryDate": r["entryDate"],
-            "createdAt": r["createdAt"],
-            "deletedFlag": bool(r["deletedFlag"]),
-            "deletedAt": r["deletedAt"],
-        }
+    has_more = len(rows) > pageSize
+    items = [_row_to_item(r) for r in rows[:pageSize]]
+    return {
+        "items": items,
+        "page": page,
+        "pageSize": pageSize,
+        "total": _month_total(conn, month, category, office),
+        "nextCursor": encode_cursor({"id": items[-1]["id"]}) if has_more else None,
+    }
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=255),
+    category: Optional[str] = Query(None),
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    pageSize: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None),
+    includeArchive: bool = Query(False),
+    protocolNumber: Optional[int] = Query(None, ge=1),
+    office: Optional[str] = Query(None, max_length=64),
+):
+    # Full-text search over issuer/subject/referenceNumber/recipient, best match first.
+    # With includeArchive, archive files are searched too and results come newest first.
+    match = build_match_query(q)
+    if match is None:
+        raise HTTPException(status_code=400, detail="query has no searchable terms")
+    return await get_executor().read(
+        rendered(_search_page), q, match, category, month, pageSize, after, includeArchive, protocolNumber,
+        office,
+    )
+
+
+@metrics.timed("search")
+def _search_page(
+    conn: sqlite3.Connection,
+    q: str,
+    match: str,
+    category: Optional[str],
+    month: Optional[str],
+    pageSize: int,
+    after: Optional[str],
+    includeArchive: bool,
+    protocolNumber: Optional[int],
+    office: Optional[str] = None,
+) -> Dict[str, Any]:
+    if includeArchive or protocolNumber is not None:
+        fq = FederatedQuery(
+            month=month,
+            category=category,
+            office=office,
+            protocol_number=protocolNumber,
+            terms=search_terms(q),
+            after_id=int(decode_cursor(after, "id")["id"]) if after else None,
+            descending=True,
+            limit=pageSize,
+        )
+        rows, last_id = federated_query(conn, fq, include_archives=includeArchive)
+        items = [dict(_row_to_item(r), source=r["source"]) for r in rows]
+        next_cursor = encode_cursor({"id": last_id}) if last_id is not None else None
+        return {"items": items, "pageSize": pageSize, "nextCursor": next_cursor}
+    position = decode_cursor(after, "lo", "rank", "id") if after else None
+    rows, next_position = search_registrations(
+        conn, match, category=category, month=month, office=office, limit=pageSize, after=position
+    )
+    items = [dict(_row_to_item(r), snippet=r["snippet"], rank=r["rank"]) for r in rows]
+    next_cursor = encode_cursor(next_position) if next_position else None
+    return {"items": items, "pageSize": pageSize, "nextCursor": next_cursor}
+
+
+@router.get("/export")
+def export_registrations(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    category: Optional[str] = Query(None),
+    fmt: Literal["csv", "ndjson", "xlsx"] = Query("csv", alias="format"),
+    office: Optional[str] = Query(None, max_length=64),
+):
+    # Whole month, archived rows included, streamed in id order. The body
+    # generator takes its own pooled connection: request dependencies are
+    # already closed by the time a streaming body is sent. The exporter
+    # loads on first use, not at startup.
+    from backend.src.services.export import MEDIA_TYPES, stream_export
+
+    name = f"register-{month}" + (f"-{category}" if category else "") + (f"-{office}" if office else "")
+    return StreamingResponse(
+        stream_export(month, category, fmt, office),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/stream")
+async def stream_registrations(
+    category: List[str] = Query([]),
+    lastEventId: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+):
+    # Server-Sent Events instead of polling the listing: "created" carries the
+    # new registration, "deleted" its id, category and month, and "reset" asks
+    # the client to reload its listing. Each message's id is the highest
+    # registration id sent so far; EventSource sends it back as Last-Event-ID
+    # when it reconnects, and what was missed meanwhile is replayed first.
+    # lastEventId does the same for a first connection (the listing's highest id).
+    if last_event_id is not None:
+        try:
+            lastEventId = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid Last-Event-ID")
+    return StreamingResponse(
+        _event_stream(category, lastEventId),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    items = [row_to_item(r) for r in rows]
-    return {"items": items, "page": page, "pageSize": 100, "total": len(items)}
+
+@dataclass
+class _StreamPosition:
+    # Highest registration id sent, ids sent by the last catch-up (skipped
+    # when they arrive live), and the audit event id deletions were read up to
+    last_id: int
+    replayed: Set[int] = field(default_factory=set)
+    last_event: Optional[int] = None
+
+
+async def _event_stream(categories: List[str], last_id: Optional[int]):
+    # Subscribed before replaying, so changes committed during the replay are queued
+    live = feed.get_feed()
+    sub = live.subscribe(categories)
+    # With several workers, this process hears of its own creations at once
+    # but of the others' only when the change watcher next polls
+    shared = worker_count() > 1
+    try:
+        if last_id is None:
+            # Nothing to replay: start from the newest registration
+            position = _StreamPosition(await get_executor().read(_last_registration_id))
+            yield f"retry: {feed.RETRY_MS}\n\n"
+        else:
+            yield f"retry: {feed.RETRY_MS}\n\n"
+            position = _StreamPosition(last_id)
+            for message in await _catch_up(sub, position):
+                yield message
+        while True:
+            change = await sub.next(feed.HEARTBEAT)
+            if change is None:
+                yield ": keepalive\n\n"
+            elif change is feed.CLOSED:
+                return
+            elif change.kind == "created":
+                if change.id in position.replayed:
+                    continue
+                if shared and change.id != position.last_id + 1:
+                    # Ids below it may be another worker's, already committed
+                    # (ids follow commit order) but not announced here yet:
+                    # sending this one first would move past them for good
+                    for message in await _catch_up(sub, position):
+                        yield message
+                    continue
+                position.last_id = max(position.last_id, change.id)
+                yield feed.format_event("created", change.data, position.last_id)
+            elif change.kind == "deleted":
+                yield feed.format_event(
+                    "deleted", {"id": change.id, "category": change.category, "month": change.month}
+                )
+            else:
+                # Fell behind, a batch or import, or another worker wrote: read what changed instead
+                for message in await _catch_up(sub, position):
+                    yield message
+    finally:
+        live.unsubscribe(sub)
+
+
+async def _catch_up(sub: feed.Subscription, position: _StreamPosition) -> List[str]:
+    sub.lagging = False
+    changes = await get_executor().read(
+        feed.changes_since, position.last_id, sub.categories, position.last_event
+    )
+    if changes is None:
+        position.last_id = await get_executor().read(_last_registration_id)
+        position.replayed, position.last_event = set(), None
+        return [feed.format_event("reset", {}, position.last_id)]
+    created, deleted, position.last_event = changes
+    messages = [
+        feed.format_event("deleted", {"id": r["id"], "category": r["category"], "month": r["entryMonth"]})
+        for r in deleted
+    ]
+    position.replayed = {r["id"] for r in created}
+    for r in created:
+        position.last_id = max(position.last_id, r["id"])
+        messages.append(feed.format_event("created", _row_to_item(r), position.last_id))
+    return messages
+
+
+def _last_registration_id(conn: sqlite3.Connection) -> int:
+    # Archived registrations leave the table; the sequence still has their ids
+    return conn.execute(
+        "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'registrations'), 0), "
+        "COALESCE((SELECT MAX(id) FROM registrations), 0))"
+    ).fetchone()[0]
+
+
+@router.get("/{id}/history")
+async def registration_history(id_: int = Path(..., alias="id")):
+    # Who created and deleted the registration, and when; archived
+    # registrations are answered from their archive file
+    return await get_executor().read(_history, id_)
+
+
+def _history(conn: sqlite3.Connection, id_: int) -> Dict[str, Any]:
+    events = audit.registration_events(conn, id_)
+    source: Optional[str] = "main"
+    if not events and conn.execute("SELECT 1 FROM registrations WHERE id = ?", (id_,)).fetchone() is None:
+        source, events = archived_audit_events(conn, id_)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Not found")
+    return {"registrationId": id_, "source": source, "events": events}
 
 
 @router.delete("/{id}", status_code=204)
-def delete_registration(id_: int = Path(..., alias="id")):
-    conn = get_connection()
+async def delete_registration(id_: int = Path(..., alias="id")):
+    month, category = await get_executor().write(_delete_registration, id_)
+    response_cache.invalidate(month, category)
+    feed.publish(feed.Change("deleted", category, id_, month))
+    return None
+
+
+def _delete_registration(conn: sqlite3.Connection, id_: int) -> Tuple[str, str]:
     cur = conn.cursor()
+    row = cur.execute(
+        "SELECT entryMonth, category FROM registrations WHERE id = ? AND deletedFlag = 0", (id_,)
+    ).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
     now_iso = _now_iso()
     cur.execute(
-        "UPDATE registrations SET deletedFlag = 1, deletedAt = ? WHERE id = ? AND deletedFlag = 0",
+        "UPDATE registrations SET deletedFlag = 1, deletedAt = ? WHERE id = ?",
         (now_iso, id_),
     )
-    if cur.rowcount == 0:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Not found")
-    # Audit event
-    username = os.environ.get("USERNAME") or "unknown"
-    cur.execute(
-        """
-        INSERT INTO audit_events (action, registrationId, timestamp, username)
-        VALUES ('delete', ?, ?, ?)
-        """,
-        (id_, now_iso, username),
-    )
-    conn.commit()
-    conn.close()
-    return None
+    audit.record(conn, "delete", id_, now_iso, os.environ.get("USERNAME") or "unknown")
+    return row["entryMonth"], row["category"]
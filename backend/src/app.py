@@ -1,17 +1,38 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from backend.src.services.db import ensure_db
+from backend.src.services import federation, feed, migrations, scheduler, workers
+from backend.src.services.db import close_pool, ensure_db, get_executor, get_pool
 from backend.src.api.meta import router as meta_router
 from backend.src.api.registrations import router as registrations_router
 from backend.src.api.admin import router as admin_router
+from backend.src.api.audit import router as audit_router
+from backend.src.api.metrics import MetricsMiddleware, router as metrics_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # type: ignore
     # Startup
     ensure_db()
+    # Archive files copied in or removed while the server was down; from here
+    # on the archiver and the sealer keep the catalogue
+    with get_pool().connection() as conn:
+        federation.refresh_catalog(conn)
+    get_executor()
+    # Backfills of the migrations just applied go on while requests are served
+    migrations.start_backfills()
+    # Maintenance jobs (archive, checkpoint, optimize, analyze) on cron schedules
+    scheduler.start()
+    # With several server processes: follow the other processes' writes
+    workers.start()
     yield
-    # Shutdown (no-op for now)
+    # Shutdown: stop the scheduler, backfills and archive query workers, then
+    # close pooled and executor connections so the WAL is checkpointed cleanly
+    await scheduler.shutdown()
+    await workers.shutdown()
+    migrations.stop_backfills()
+    feed.reset()
+    federation.shutdown()
+    close_pool()
 
 
 app = FastAPI(title="Offline Registry App API", version="0.1.0", lifespan=lifespan)
@@ -25,11 +46,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Routers will be included here (meta, registrations, admin)
+# Routers will be included here (meta, registrations, admin, audit)
 app.include_router(meta_router)
 app.include_router(registrations_router)
 app.include_router(admin_router)
+app.include_router(audit_router)
+app.include_router(metrics_router)
+
+# Prometheus-style request latency for /metrics; added last so it wraps CORS
+# and times the whole request
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/health")
-def health():
+async def health():
+    # Runs on the event loop: no thread or connection, so it answers under load
     return {"status": "ok"}
@@ -0,0 +1,81 @@
+"""Import a scanned/typed paper register from CSV or XLSX.
+
+    python -m backend.src.cli.import registers/2019.xlsx --category common_incoming --keep-numbers
+
+The first row names the columns (issuer, referenceNumber, subject, recipient,
+offices, entryDate, protocolNumber, draftNumber; others are ignored).
+Running the same file again resumes an interrupted import.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from backend.src.services.db import ensure_db, get_connection
+from backend.src.services.importer import IMPORT_CHUNK, READERS, ImportReport, import_file
+
+CATEGORIES = [
+    "common_incoming",
+    "common_outgoing",
+    "confidential_incoming",
+    "confidential_outgoing",
+    "signals_incoming",
+    "signals_outgoing",
+]
+
+
+def _print_progress(report: ImportReport) -> None:
+    done = report.rowsDone - report.resumedFrom
+    rate = done / report.elapsed if report.elapsed else 0.0
+    print(
+        f"\r{report.rowsDone} rows: {report.inserted} inserted, {report.rejected} rejected "
+        f"({rate:,.0f} rows/s)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--category", required=True, choices=CATEGORIES)
+    parser.add_argument("--format", choices=sorted(READERS), help="default: from the file extension")
+    parser.add_argument("--keep-numbers", action="store_true",
+                        help="keep the file's protocol/draft numbers instead of allocating new ones")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK)
+    args = parser.parse_args(argv)
+
+    ensure_db()
+    conn = get_connection()
+    try:
+        report = import_file(
+            conn,
+            args.path,
+            args.category,
+            fmt=args.format,
+            keep_numbers=args.keep_numbers,
+            chunk_size=args.chunk_size,
+            username=os.environ.get("USERNAME") or "import",
+            progress=_print_progress,
+        )
+    finally:
+        conn.close()
+    print(file=sys.stderr)
+    if report.alreadyImported:
+        print(f"{args.path.name} was already imported ({report.inserted} rows).")
+        return 0
+    if report.resumedFrom:
+        print(f"Resumed after row {report.resumedFrom}.")
+    print(f"Imported {report.inserted} rows, rejected {report.rejected} in {report.elapsed:.1f}s.")
+    for error in report.errors:
+        print(f"  row {error.row}: {error.message}")
+    if report.rejected > len(report.errors):
+        print(f"  ... and {report.rejected - len(report.errors)} more")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Upgrade the registry database and archive files to this release's schema.
+
+    python -m backend.src.cli.migrate [--status]
+
+The server applies migrations on startup and finishes their backfills in
+the background while it serves; --status shows how far they got. Running
+this beforehand, while the previous release still serves, keeps the
+upgrade out of the restart: large backfills go in short chunks between the
+server's writes, and an interrupted run continues where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from backend.src.services.archive import upgrade_archives
+from backend.src.services.db import get_connection
+from backend.src.services.migrations import (
+    BACKFILL_CHUNK,
+    BACKFILL_PAUSE,
+    MIGRATIONS,
+    MigrationError,
+    status,
+    upgrade_database,
+)
+
+
+def _print_status() -> None:
+    conn = get_connection()
+    try:
+        state = status(conn, MIGRATIONS)
+    finally:
+        conn.close()
+    print(f"schema version {state['version']} of {state['latest']}")
+    for pending in state["pending"]:
+        print(f"  pending migration {pending}")
+    for backfill in state["backfills"]:
+        first, done, last = backfill["firstId"], backfill["nextId"] - backfill["firstId"], backfill["lastId"]
+        print(f"  backfill {backfill['name']}: {100 * done // (last - first + 1)}% "
+              f"(next id {backfill['nextId']}, ids {first}-{last})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="show the schema version and pending work only")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK, help="ids per backfill transaction")
+    parser.add_argument("--pause", type=float, default=BACKFILL_PAUSE,
+                        help="minimum seconds between backfill transactions")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        _print_status()
+        return 0
+    try:
+        applied = upgrade_database(chunk_size=args.chunk_size, pause=args.pause)
+    except MigrationError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"applied migrations: {', '.join(map(str, applied))}" if applied else "database schema is up to date")
+    print(f"archive files upgraded: {upgrade_archives()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
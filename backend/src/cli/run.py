@@ -1,48 +1,81 @@
 from __future__ import annotations
 
-import subprocess
+import argparse
+import os
 import sys
-import time
+import threading
 import webbrowser
+from typing import Callable
 
-import httpx
+import uvicorn
+from uvicorn.supervisors import Multiprocess
 
+from backend.src.services.db import ensure_db
 
-def wait_for_server(url: str, timeout_sec: int = 10) -> bool:
-    start = time.time()
-    while time.time() - start < timeout_sec:
-        try:
-            r = httpx.get(url, timeout=1.0)
-            if r.status_code < 500:
-                return True
-        except Exception:
-            time.sleep(0.3)
-    return False
+HOST = "127.0.0.1"
+PORT = 8733
+# Printed once the server accepts requests; scripts wait for this line
+READY_MESSAGE = "Server running at {url}. Press Ctrl+C to stop."
 
 
-def main():
-    host = "127.0.0.1"
-    port = 8733
-    url = f"http://{host}:{port}"
+class _Server(uvicorn.Server):
+    """uvicorn server that calls ``on_ready`` once the app has started and
+    the socket listens: no polling of /health."""
+
+    def __init__(self, config: uvicorn.Config, on_ready: Callable[[], None]):
+        super().__init__(config)
+        self._on_ready = on_ready
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        # A failed startup (e.g. port in use) sets should_exit instead
+        if self.started:
+            self._on_ready()
+
 
-    # Start Uvicorn in a subprocess
-    proc = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "backend.src.app:app", "--host", host, "--port", str(port)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the registry server")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("REGISTRY_WORKERS", "1")),
+        help="server processes sharing the database (default 1, or REGISTRY_WORKERS)",
     )
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--no-browser", action="store_true", help="do not open the browser when ready")
+    args = parser.parse_args(argv)
+    host, port = HOST, args.port
+    url = f"http://{host}:{port}"
+    workers = max(1, args.workers)
+    os.environ["REGISTRY_WORKERS"] = str(workers)
+
+    def ready() -> None:
+        print(READY_MESSAGE.format(url=url), flush=True)
+        if not args.no_browser:
+            # webbrowser can block for a while starting the browser
+            threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
 
-    if wait_for_server(url, timeout_sec=10):
-        webbrowser.open(url)
-        print(f"Server running at {url}. Press Ctrl+C to stop.")
-    else:
-        print("Failed to start server in time.")
+    # Served from this process: no second interpreter start. Open
+    # /registrations/stream connections never finish on their own, so
+    # shutdown waits for them only briefly.
+    config = uvicorn.Config(
+        "backend.src.app:app", host=host, port=port, workers=workers,
+        timeout_graceful_shutdown=5, log_level="warning",
+    )
+    if workers == 1:
+        server = _Server(config, ready)
+        server.run()
+        if not server.started:
+            sys.exit(3)
+        return
 
+    # Create or upgrade the schema once, before several workers would race to
+    ensure_db()
+    sock = config.bind_socket()
+    # Requests queue on the bound socket until a worker takes them
+    ready()
     try:
-        proc.wait()
+        Multiprocess(config, target=uvicorn.Server(config).run, sockets=[sock]).run()
     except KeyboardInterrupt:
-        proc.terminate()
+        pass
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ import random
 from datetime import date, timedelta
 
 from backend.src.services.db import get_connection
-from backend.src.services.numbering import next_draft, next_protocol
+from backend.src.services.numbering import BlockAllocator
 
 
 CATEGORIES = [
@@ -17,44 +17,48 @@ CATEGORIES = [
 ]
 
 
-def main(total: int = 500) -> None:
+def main(total: int = 500, block_size: int = 1000) -> None:
     conn = get_connection()
-    cur = conn.cursor()
     today = date.today()
+    rows = []
 
-    for i in range(total):
-        category = random.choice(CATEGORIES)
-        days_ago = random.randint(0, 365)
-        d = today - timedelta(days=days_ago)
-        year = d.year
-        protocol = next_protocol(conn, category, year)
-        draft = next_draft(conn, category) if category.endswith("outgoing") else None
-        issuer = f"Issuer {i}"
-        ref = f"REF-{i:04d}"
-        subject = f"Subject {i}"
-        recipient = f"Recipient {i}" if category.endswith("outgoing") else None
-        offices = "OFF-1,OFF-2" if category.endswith("incoming") else None
-
-        cur.execute(
+    with BlockAllocator(conn, block_size=block_size) as alloc:
+        for i in range(total):
+            category = random.choice(CATEGORIES)
+            days_ago = random.randint(0, 365)
+            d = today - timedelta(days=days_ago)
+            year = d.year
+            protocol = alloc.next_protocol(category, year)
+            draft = alloc.next_draft(category) if category.endswith("outgoing") else None
+            issuer = f"Issuer {i}"
+            ref = f"REF-{i:04d}"
+            subject = f"Subject {i}"
+            recipient = f"Recipient {i}" if category.endswith("outgoing") else None
+            offices = "OFF-1,OFF-2" if category.endswith("incoming") else None
+            rows.append(
+                (
+                    category,
+                    issuer,
+                    ref,
+                    subject,
+                    recipient,
+                    offices,
+                    protocol,
+                    draft,
+                    d.isoformat(),
+                )
+            )
+
+        conn.executemany(
             """
             INSERT INTO registrations (
                 category, issuer, referenceNumber, subject, recipient, offices,
                 protocolNumber, draftNumber, entryDate, createdAt, deletedFlag
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), 0)
             """,
-            (
-                category,
-                issuer,
-                ref,
-                subject,
-                recipient,
-                offices,
-                protocol,
-                draft,
-                d.isoformat(),
-            ),
+            rows,
         )
-    conn.commit()
+        alloc.commit()
     conn.close()
 
 
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class RegistrationCreate(BaseModel):
+    issuer: str = Field(max_length=255)
+    referenceNumber: str = Field(max_length=255)
+    subject: str = Field(max_length=255)
+    recipient: Optional[str] = Field(default=None, max_length=255)
+    offices: Optional[List[str]] = None
+    entryDate: Optional[date] = None
+
+
+def category_error(category: str, payload: RegistrationCreate) -> Optional[str]:
+    # Minimal validation in line with OpenAPI description
+    if category.endswith("incoming"):
+        if not payload.offices or len(payload.offices) == 0:
+            return "offices required for incoming categories"
+    if category.endswith("outgoing"):
+        if not payload.recipient:
+            return "recipient required for outgoing categories"
+    return None
+
+
+def validation_message(exc: ValidationError) -> str:
+    """One line per failed field, e.g. ``issuer: Field required``."""
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+    )
@@ -1,20 +1,120 @@
 from __future__ import annotations
 
+import logging
+import time
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from typing import List, Optional, Tuple
 import sqlite3
 
-from backend.src.services.db import resolve_db_path
+from backend.src.services import cache as response_cache
+from backend.src.services import metrics
+from backend.src.services.db import begin_immediate, get_connection, resolve_db_path
+from backend.src.services.migrations import Migration, MigrationError, apply_migrations, execute_script, schema_version
+
+logger = logging.getLogger(__name__)
+
+# Stored columns copied into archive files (excludes the generated entryMonth)
+REGISTRATION_COLUMNS = (
+    "id, category, issuer, referenceNumber, subject, recipient, offices, "
+    "protocolNumber, draftNumber, entryDate, createdAt, deletedFlag, deletedAt"
+)
+
+
+# Schema migrations of the archive files, versioned like the main database
+# and, as there, each with the SQL it was released with. Files written before
+# the audit index existed get it in version 1.
+ARCHIVE_V1_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    issuer TEXT NOT NULL,
+    referenceNumber TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    recipient TEXT,
+    offices TEXT,
+    protocolNumber INTEGER NOT NULL,
+    draftNumber INTEGER,
+    entryDate TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    deletedFlag INTEGER NOT NULL,
+    deletedAt TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY,
+    action TEXT NOT NULL,
+    registrationId INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    username TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_audit_events_registration
+ON audit_events(registrationId);
+"""
+
+ARCHIVE_MIGRATIONS = (
+    Migration(1, "archive tables and audit index", lambda conn: execute_script(conn, ARCHIVE_V1_SCHEMA)),
+)
+
+
+def upgrade_archive(path: Path) -> List[int]:
+    """Create the archive file at ``path`` or bring it to the latest archive
+    schema; returns the versions applied."""
+    conn = sqlite3.connect(path, timeout=5.0)
+    try:
+        if schema_version(conn) == ARCHIVE_MIGRATIONS[-1].version:
+            return []
+        return apply_migrations(conn, ARCHIVE_MIGRATIONS)
+    finally:
+        conn.close()
+
+
+def upgrade_archives(directory: Optional[Path] = None) -> int:
+    """Upgrade every archive file in ``directory`` (default: archive_dir()); returns how many changed.
+
+    Sealed months are immutable and keep the format they were sealed in. A
+    file that cannot be upgraded is logged and left as it is: the others,
+    and the main database, still serve.
+    """
+    directory = directory or archive_dir()
+    if not directory.is_dir():
+        return 0
+    upgraded = 0
+    for path in sorted(directory.glob("*.db")):
+        try:
+            upgraded += bool(upgrade_archive(path))
+        except (sqlite3.Error, MigrationError):
+            logger.exception("could not upgrade archive file %s", path.name)
+    return upgraded
+
+
+# Width of the id range moved per transaction. Writers wait for at most one
+# chunk, never for the whole month.
+ARCHIVE_CHUNK = 500
+# Minimum pause between chunks so queued writers get the lock first
+ARCHIVE_PAUSE = 0.005
+# Free pages released per incremental_vacuum step
+VACUUM_STEP = 2000
 
 
 @dataclass
 class ArchiveResult:
     month: str
     itemsMoved: int
+    chunks: int = 0
+    resumed: bool = False
 
 
-def _prev_month_yyyymm(today: date | None = None) -> str:
+@dataclass
+class CompactResult:
+    freedPages: int
+    walCheckpointed: bool
+    incremental: bool
+
+
+def previous_month(today: date | None = None) -> str:
+    """YYYY-MM of the month before ``today``."""
     if today is None:
         today = date.today()
     first = today.replace(day=1)
@@ -22,92 +122,234 @@ def _prev_month_yyyymm(today: date | None = None) -> str:
     return prev.strftime("%Y-%m")
 
 
+def archive_dir() -> Path:
+    """Directory holding the monthly archive files (may not exist yet)."""
+    return resolve_db_path().parent / "archive"
+
+
 def _ensure_archive_dir(db_path: Path) -> Path:
     archive_dir = db_path.parent / "archive"
     archive_dir.mkdir(parents=True, exist_ok=True)
     return archive_dir
 
 
-def run_monthly_archive(conn: sqlite3.Connection) -> ArchiveResult:
-    # Determine previous month
-    target_month = _prev_month_yyyymm()
-    # Compute archive DB path
-    main_db_path = resolve_db_path()
-    archive_dir = _ensure_archive_dir(main_db_path)
-    archive_db_path = archive_dir / f"{target_month}.db"
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
 
-    # Attach archive DB and ensure schema
-    cur = conn.cursor()
-    cur.execute("ATTACH DATABASE ? AS arch", (str(archive_db_path),))
-    cur.executescript(
+def _month_bounds(conn: sqlite3.Connection, month: str) -> Tuple[Optional[int], Optional[int]]:
+    row = conn.execute(
+        "SELECT MIN(id), MAX(id) FROM main.registrations "
+        "WHERE deletedFlag IN (0, 1) AND entryMonth = ?",
+        (month,),
+    ).fetchone()
+    return row[0], row[1]
+
+
+# Rows of the month inside one id range; the PK range bounds the scan
+_CHUNK_IDS = "SELECT id FROM main.registrations WHERE id BETWEEN ? AND ? AND entryMonth = ?"
+
+
+@metrics.timed("archive")
+def _copy_chunk(conn: sqlite3.Connection, month: str, lo: int, hi: int) -> None:
+    # Deferred transaction: writes go to the archive file only and main is
+    # just read, so writers of the main database are not blocked
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO arch.registrations ({REGISTRATION_COLUMNS})
+        SELECT {REGISTRATION_COLUMNS} FROM main.registrations
+        WHERE id BETWEEN ? AND ? AND entryMonth = ?
+        """,
+        (lo, hi, month),
+    )
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO arch.audit_events (id, action, registrationId, timestamp, username)
+        SELECT id, action, registrationId, timestamp, username FROM main.audit_events
+        WHERE registrationId IN ({_CHUNK_IDS})
+        """,
+        (lo, hi, month),
+    )
+    conn.commit()
+
+
+def _chunk_is_stale(conn: sqlite3.Connection, month: str, lo: int, hi: int) -> bool:
+    # A row soft-deleted (or an audit event added) after the copy must be
+    # copied again before the originals are removed
+    changed = conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS arch.registrations (
-            id INTEGER PRIMARY KEY,
-            category TEXT NOT NULL,
-            issuer TEXT NOT NULL,
-            referenceNumber TEXT NOT NULL,
-            subject TEXT NOT NULL,
-            recipient TEXT,
-            offices TEXT,
-            protocolNumber INTEGER NOT NULL,
-            draftNumber INTEGER,
-            entryDate TEXT NOT NULL,
-            createdAt TEXT NOT NULL,
-            deletedFlag INTEGER NOT NULL,
-            deletedAt TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS arch.audit_events (
-            id INTEGER PRIMARY KEY,
-            action TEXT NOT NULL,
-            registrationId INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
-            username TEXT NOT NULL
-        );
+        SELECT 1 FROM main.registrations m
+        WHERE m.id BETWEEN ? AND ? AND m.entryMonth = ? AND NOT EXISTS (
+            SELECT 1 FROM arch.registrations a
+            WHERE a.id = m.id AND a.deletedFlag = m.deletedFlag AND a.deletedAt IS m.deletedAt
+        )
+        LIMIT 1
+        """,
+        (lo, hi, month),
+    ).fetchone()
+    if changed:
+        return True
+    missing = conn.execute(
+        f"""
+        SELECT 1 FROM main.audit_events e
+        WHERE e.registrationId IN ({_CHUNK_IDS})
+          AND NOT EXISTS (SELECT 1 FROM arch.audit_events a WHERE a.id = e.id)
+        LIMIT 1
+        """,
+        (lo, hi, month),
+    ).fetchone()
+    return missing is not None
+
+
+@metrics.timed("archive")
+def _delete_chunk(
+    conn: sqlite3.Connection, month: str, lo: int, hi: int, catalog: Tuple[str, List[tuple]]
+) -> Optional[int]:
+    """Remove a copied chunk from main; None if it changed since the copy.
+
+    ``catalog`` is the archive file's catalogue entries as of the copy; they
+    are stored in the same transaction, so federated reads find every row
+    either in main or through the catalogue.
+    """
+    from backend.src.services.federation import store_catalog  # imports this module
+
+    begin_immediate(conn)
+    if _chunk_is_stale(conn, month, lo, hi):
+        conn.rollback()
+        return None
+    cur = conn.execute(
+        "DELETE FROM main.registrations WHERE id BETWEEN ? AND ? AND entryMonth = ?", (lo, hi, month)
+    )
+    moved = cur.rowcount
+    # After the registrations: the audit log only gives up events of
+    # registrations no longer in main, and only the copied ones go
+    conn.execute(
         """
+        DELETE FROM main.audit_events
+        WHERE registrationId BETWEEN ? AND ?
+          AND EXISTS (SELECT 1 FROM arch.audit_events a WHERE a.id = main.audit_events.id)
+        """,
+        (lo, hi),
+    )
+    conn.execute(
+        "UPDATE archive_progress SET moved = moved + ?, lastId = ?, updatedAt = ? WHERE month = ?",
+        (moved, hi, _now_iso(), month),
     )
+    store_catalog(conn, *catalog)
+    conn.commit()
+    response_cache.invalidate(month)
+    return moved
 
-    # Move registrations and their audit events for the previous month
-    # Only move rows whose entryDate starts with target_month
-    res = cur.execute(
-        "SELECT COUNT(*) AS cnt FROM registrations WHERE entryDate LIKE ?",
-        (f"{target_month}%",),
-    ).fetchone()
-    to_move = int(res["cnt"]) if res else 0
-
-    if to_move > 0:
-        cur.execute(
-            """
-            INSERT INTO arch.registrations
-            SELECT * FROM main.registrations WHERE entryDate LIKE ?
-            """,
-            (f"{target_month}%",),
+
+def run_monthly_archive(
+    conn: sqlite3.Connection,
+    month: Optional[str] = None,
+    *,
+    chunk_size: int = ARCHIVE_CHUNK,
+    pause: float = ARCHIVE_PAUSE,
+) -> ArchiveResult:
+    """Move ``month`` (default: the previous one) into ``archive/<month>.db``.
+
+    Rows move in id ranges of ``chunk_size``, each copied to the archive
+    file and committed there before it is deleted from the main database in
+    a short write transaction of its own. Main runs in WAL mode, so a
+    transaction spanning both files would not be atomic; copying first with
+    INSERT OR REPLACE makes every step safe to repeat instead. After a crash
+    the next run picks up the rows still in main and carries on the count
+    kept in ``archive_progress``.
+    """
+    from backend.src.services.federation import catalog_entries  # imports this module
+
+    target_month = month or previous_month()
+    main_db_path = resolve_db_path()
+    arch_dir = _ensure_archive_dir(main_db_path)
+    archive_db_path = arch_dir / f"{target_month}.db"
+
+    # Claim the month before its file is opened: the sealer only removes the
+    # file under the write lock, while the month has no archive_progress row
+    begin_immediate(conn)
+    resumed = conn.execute(
+        "SELECT 1 FROM archive_progress WHERE month = ?", (target_month,)
+    ).fetchone() is not None
+    if not resumed:
+        now_iso = _now_iso()
+        conn.execute(
+            "INSERT INTO archive_progress (month, moved, lastId, startedAt, updatedAt) "
+            "VALUES (?, 0, NULL, ?, ?)",
+            (target_month, now_iso, now_iso),
         )
-        # Move audit events for those registrations
-        cur.execute(
-            """
-            INSERT INTO arch.audit_events
-            SELECT ae.* FROM main.audit_events ae
-            WHERE ae.registrationId IN (
-                SELECT id FROM main.registrations WHERE entryDate LIKE ?
+    conn.commit()  # ATTACH is not allowed inside a transaction
+
+    upgrade_archive(archive_db_path)
+    conn.execute("ATTACH DATABASE ? AS arch", (str(archive_db_path),))
+    try:
+        chunks = 0
+        floor, ceiling = _month_bounds(conn, target_month)
+        lo = floor
+        while lo is not None and lo <= ceiling:
+            hi = min(lo + chunk_size - 1, ceiling)
+            while True:
+                _copy_chunk(conn, target_month, lo, hi)
+                # Read the file before taking the write lock
+                catalog = (archive_db_path.name, catalog_entries(archive_db_path))
+                held = time.perf_counter()
+                done = _delete_chunk(conn, target_month, lo, hi, catalog) is not None
+                held = time.perf_counter() - held
+                if done:
+                    break
+                metrics.ARCHIVE_CHUNK_RETRIES.inc()
+            chunks += 1
+            lo = hi + 1
+            if pause:
+                # Stay off the write lock at least as long as we held it, so
+                # writers sleeping in the busy handler get their turn
+                time.sleep(max(pause, held))
+
+        begin_immediate(conn)
+        progress = conn.execute(
+            "SELECT moved FROM archive_progress WHERE month = ?", (target_month,)
+        ).fetchone()
+        # None: a run in another process moved the rest and recorded the batch
+        moved = progress[0] if progress is not None else 0
+        if progress is not None:
+            conn.execute("DELETE FROM archive_progress WHERE month = ?", (target_month,))
+            conn.execute(
+                "INSERT INTO archive_batches (month, createdAt, itemsMoved) VALUES (?, ?, ?)",
+                (target_month, _now_iso(), moved),
             )
-            """,
-            (f"{target_month}%",),
-        )
-        # Delete moved rows from main
-        cur.execute("DELETE FROM main.audit_events WHERE registrationId IN (SELECT id FROM main.registrations WHERE entryDate LIKE ?)", (f"{target_month}%",))
-        cur.execute("DELETE FROM main.registrations WHERE entryDate LIKE ?", (f"{target_month}%",))
-
-    # Record archive batch in main DB
-    now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    cur.execute(
-        "INSERT INTO archive_batches (month, createdAt, itemsMoved) VALUES (?, ?, ?)",
-        (target_month, now_iso, to_move),
-    )
+        conn.commit()
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("DETACH DATABASE arch")
 
-    # Finalize and detach
-    conn.commit()
-    cur.execute("DETACH DATABASE arch")
-    cur.close()
+    return ArchiveResult(month=target_month, itemsMoved=moved, chunks=chunks, resumed=resumed)
+
+
+def compact_database(conn: Optional[sqlite3.Connection] = None, step: int = VACUUM_STEP) -> CompactResult:
+    """Give pages freed by archiving back to the file system.
 
-    return ArchiveResult(month=target_month, itemsMoved=to_move)
+    Free pages are released with incremental_vacuum in small steps (each a
+    short write transaction), then the WAL is checkpointed and truncated so
+    the main file actually shrinks. Databases created before auto_vacuum was
+    enabled only get the checkpoint; their free pages are reused by new rows.
+    Meant to run in the background after an archive.
+    """
+    own = conn is None
+    conn = conn or get_connection()
+    try:
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        freed = 0
+        if incremental:
+            while True:
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free == 0:
+                    break
+                # The pragma frees one page per step; executescript steps it to the end
+                conn.executescript(f"PRAGMA incremental_vacuum({min(step, free)});")
+                freed += min(step, free)
+        busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        return CompactResult(freedPages=freed, walCheckpointed=busy == 0, incremental=incremental)
+    finally:
+        if own:
+            conn.close()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.src.services import metrics
+
+# audit_events is an append-only log (see the triggers in migrations.py): one row
+# per create/delete, written in the same transaction as the change it records.
+# Inside a write-queue group the events of all operations are buffered and
+# appended in one statement just before the group commits.
+INSERT_SQL = "INSERT INTO audit_events (action, registrationId, timestamp, username) VALUES (?, ?, ?, ?)"
+
+Event = Tuple[str, int, str, str]  # action, registrationId, timestamp, username
+
+_local = threading.local()
+
+
+class AuditBuffer:
+    """Events of one write group, appended by ``flush`` before its COMMIT."""
+
+    def __init__(self) -> None:
+        self.events: List[Event] = []
+
+    def mark(self) -> int:
+        return len(self.events)
+
+    def discard(self, mark: int) -> None:
+        # The operation that recorded events past ``mark`` was rolled back
+        del self.events[mark:]
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        if self.events:
+            with metrics.timed("audit"):
+                conn.executemany(INSERT_SQL, self.events)
+            self.events.clear()
+
+
+@contextmanager
+def buffered() -> Iterator[AuditBuffer]:
+    """Buffer events recorded on this thread until the caller flushes them."""
+    buffer = AuditBuffer()
+    _local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _local.buffer = None
+
+
+def record_many(conn: sqlite3.Connection, events: Iterable[Event]) -> None:
+    buffer: Optional[AuditBuffer] = getattr(_local, "buffer", None)
+    if buffer is not None:
+        buffer.events.extend(events)
+        return
+    with metrics.timed("audit"):
+        conn.executemany(INSERT_SQL, events)
+
+
+def record(conn: sqlite3.Connection, action: str, registration_id: int, timestamp: str, username: str) -> None:
+    record_many(conn, [(action, registration_id, timestamp, username)])
+
+
+def _day_start(day: date) -> str:
+    # Days are the registry's local days but timestamps are UTC: the local
+    # midnight opening ``day`` as a UTC timestamp string
+    return datetime.combine(day, time.min).astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _event(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "action": row["action"],
+        "registrationId": row["registrationId"],
+        "timestamp": row["timestamp"],
+        "username": row["username"],
+    }
+
+
+def registration_events(conn: sqlite3.Connection, registration_id: int) -> List[Dict[str, Any]]:
+    """Events of one registration in the main database, oldest first."""
+    rows = conn.execute(
+        "SELECT id, action, registrationId, timestamp, username FROM audit_events "
+        "WHERE registrationId = ? ORDER BY id",
+        (registration_id,),
+    )
+    return [_event(r) for r in rows]
+
+
+def list_events(
+    conn: sqlite3.Connection,
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    limit: int = 100,
+    after: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Events newest first, from ``start`` to ``end`` (whole local days, inclusive).
+
+    Pages are keyset on (timestamp, id), read from ix_audit_events_time, or
+    ix_audit_events_user with ``username``; ``after`` is the position returned
+    with the previous page.
+    """
+    sql = "SELECT id, action, registrationId, timestamp, username FROM audit_events WHERE 1"
+    params: List[Any] = []
+    if username:
+        sql += " AND username = ?"
+        params.append(username)
+    if start:
+        sql += " AND timestamp >= ?"
+        params.append(_day_start(start))
+    if end:
+        sql += " AND timestamp < ?"
+        params.append(_day_start(end + timedelta(days=1)))
+    if action:
+        sql += " AND action = ?"
+        params.append(action)
+    if after:
+        sql += " AND (timestamp, id) < (?, ?)"
+        params += [after["ts"], after["id"]]
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    events = [_event(r) for r in conn.execute(sql, params)]
+    if len(events) <= limit:
+        return events, None
+    last = events[limit - 1]
+    return events[:limit], {"ts": last["timestamp"], "id": last["id"]}
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from backend.src.services import metrics
+
+# Rendered JSON bodies of hot GET endpoints. Entries are dropped by the write
+# paths that change them (create/delete/batch/import per month and category,
+# the archiver per month); the TTL only bounds staleness for writes made
+# outside this process, e.g. the import CLI.
+DEFAULT_TTL = 60.0
+DEFAULT_ENTRIES = 256
+DEFAULT_BYTES = 32 * 2**20
+
+# (month, category); category None stands for the month across categories.
+# Reference tables use their table name in place of the month, e.g. ("offices", None).
+Tag = Tuple[str, Optional[str]]
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+    tag: Optional[Tag]
+    expires: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+class ResponseCache:
+    """LRU cache of response bodies with a TTL and tag-based invalidation.
+
+    A reader takes a :meth:`version` of the entry's tag *before* querying
+    and passes it to :meth:`put`; if a write invalidated the tag meanwhile
+    the body may predate it and is not stored.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_ENTRIES, max_bytes: int = DEFAULT_BYTES,
+                 ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._bytes = 0
+        self._epoch = 0
+        self._months: Dict[str, int] = defaultdict(int)
+        self._tags: Dict[Tag, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "notModified": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def version(self, tag: Optional[Tag]) -> Tuple[int, int, int]:
+        with self._lock:
+            return self._version(tag)
+
+    def _version(self, tag: Optional[Tag]) -> Tuple[int, int, int]:
+        if tag is None:
+            return (self._epoch, 0, 0)
+        return (self._epoch, self._months[tag[0]], self._tags[tag])
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes, tag: Optional[Tag], version: Tuple[int, int, int]) -> CachedBody:
+        entry = CachedBody(body=body, etag=make_etag(body), tag=tag, expires=time.monotonic() + self.ttl)
+        if not self.enabled or len(body) > self.max_bytes // 4:
+            return entry
+        with self._lock:
+            if self._version(tag) != version:
+                return entry  # a write landed while this body was rendered
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+        return entry
+
+    def not_modified(self) -> None:
+        with self._lock:
+            self._counts["notModified"] += 1
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def invalidate(self, month: str, category: Optional[str] = None) -> None:
+        """Forget listings that can show a change to ``month`` (and ``category``).
+
+        With a category, that category's entries and the month-wide ones
+        (no category filter) go; without one, every entry of the month.
+        """
+        with self._lock:
+            if category is None:
+                self._months[month] += 1
+                stale = [k for k, e in self._entries.items() if e.tag is not None and e.tag[0] == month]
+            else:
+                self._tags[(month, category)] += 1
+                self._tags[(month, None)] += 1
+                stale = [k for k, e in self._entries.items() if e.tag in ((month, category), (month, None))]
+            for key in stale:
+                self._drop(key)
+            self._counts["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._counts["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+            stats.update(entries=len(self._entries), bytes=self._bytes, maxEntries=self.max_entries,
+                         ttl=self.ttl)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = round(stats["hits"] / lookups, 3) if lookups else None
+        return stats
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache; REGISTRY_CACHE_SIZE=0 disables it."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_entries=int(os.environ.get("REGISTRY_CACHE_SIZE", DEFAULT_ENTRIES)),
+                    ttl=float(os.environ.get("REGISTRY_CACHE_TTL", DEFAULT_TTL)),
+                )
+    return _cache
+
+
+def invalidate(month: str, category: Optional[str] = None) -> None:
+    if _cache is not None:
+        _cache.invalidate(month, category)
+
+
+def clear() -> None:
+    if _cache is not None:
+        _cache.clear()
+
+
+def reset() -> None:
+    """Drop the process-wide cache (a new database was created)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+@metrics.REGISTRY.collector
+def _collect_metrics():
+    if _cache is None:
+        return
+    stats = _cache.stats()
+    yield metrics.counter(
+        "registry_response_cache_lookups_total", "Response cache lookups by result",
+        [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])],
+    )
+    yield metrics.counter(
+        "registry_response_cache_not_modified_total", "Revalidations answered with 304", stats["notModified"]
+    )
+    yield metrics.counter(
+        "registry_response_cache_evictions_total", "Entries evicted to stay within the size limits",
+        stats["evictions"],
+    )
+    yield metrics.gauge("registry_response_cache_bytes", "Bytes of cached response bodies", stats["bytes"])
@@ -1,6 +1,19 @@
+import asyncio
+import functools
 import os
+import queue
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
+
+from backend.src.services import cache as response_cache
+from backend.src.services import metrics, querylog
+from backend.src.services.write_queue import WriteQueue
+
+T = TypeVar("T")
 
 # Cross-platform data directory
 def get_data_dir() -> Path:
@@ -13,6 +26,18 @@ def get_data_dir() -> Path:
 
 PREFERRED_PATH = get_data_dir() / "app.db"
 
+# Connection tuning applied once per connection.
+# synchronous=NORMAL is durable across application crashes in WAL mode and only
+# risks the last commits on power loss; cache_size is negative -> KiB.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-16000;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA busy_timeout=5000;",
+    "PRAGMA temp_store=MEMORY;",
+)
+
 
 def resolve_db_path() -> Path:
     # Test override via environment variable
@@ -33,43 +58,297 @@ def resolve_db_path() -> Path:
         return Path.cwd() / "app.db"
 
 
-def get_connection() -> sqlite3.Connection:
-    db_path = resolve_db_path()
-    conn = sqlite3.connect(db_path)
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
-    # Enable WAL mode
-    conn.execute("PRAGMA journal_mode=WAL;")
+    # auto_vacuum only takes effect on a database that is still empty (and
+    # before the switch to WAL). Setting it needs the write lock even when it
+    # changes nothing, so only new files get it: a connection opened while
+    # another one writes must not wait for busy_timeout.
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def begin_immediate(conn: sqlite3.Connection) -> None:
+    """Open a write transaction now unless one is already open.
+
+    A deferred transaction that reads first can fail to upgrade with
+    "database is locked" once another writer got in; taking the write lock
+    up front makes busy_timeout apply instead.
+    """
+    if not conn.in_transaction:
+        with metrics.lock_wait("connection"):
+            conn.execute("BEGIN IMMEDIATE")
+
+
+def connect(db_path: Path, **kwargs: Any) -> sqlite3.Connection:
+    """Open and configure a connection to the main database.
+
+    With REGISTRY_SLOW_QUERY_MS set, the connection is traced: statement
+    timings are kept for ``GET /admin/queries`` and slow statements are
+    logged with their query plan to ``logs/slow-queries.log`` next to the
+    database.
+    """
+    log = querylog.get_query_log(Path(db_path).parent / "logs" / "slow-queries.log")
+    if log is None:
+        return configure_connection(sqlite3.connect(db_path, **kwargs))
+    conn = sqlite3.connect(db_path, factory=querylog.TracedConnection, **kwargs)
+    conn.query_log = log
+    return configure_connection(conn)
+
+
+def get_connection() -> sqlite3.Connection:
+    """Open a standalone connection (scripts, tests). Request handlers use the pool."""
+    return connect(resolve_db_path())
+
+
+class ConnectionPool:
+    """Long-lived, pre-configured SQLite connections handed out one task at a time.
+
+    A connection is checked out for the duration of a request and returned
+    afterwards, so it is never shared by two tasks at once even though it may
+    move between threadpool workers (hence ``check_same_thread=False``).
+    """
+
+    def __init__(self, db_path: Path, max_size: int = 8, timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path, check_same_thread=False)
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        # Pool exhausted: wait for a connection to be released
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError("timed out waiting for a database connection")
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        # Never hand a connection with a dangling transaction to the next task
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._all),
+            "idle": self._idle.qsize(),
+            "maxSize": self.max_size,
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._all.clear()
+
+
+class DBExecutor:
+    """Dedicated threads for request-path SQLite work: one writer, N readers.
+
+    Async handlers hand a function to ``read`` or ``write``; it runs on one of
+    these threads with that thread's own connection as its first argument.
+    Writes go to a :class:`WriteQueue`, whose single thread commits concurrent
+    writes together (so write functions must not commit themselves); reads
+    run on the reader threads and never wait for a thread that is blocked on
+    the write lock.
+    """
+
+    def __init__(self, db_path: Path, readers: int = 4, writes: Optional[WriteQueue] = None):
+        self.db_path = db_path
+        self.readers = readers
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._queued_reads = 0
+        self._reader = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self.writes = writes or WriteQueue.from_env(self._connect)
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path, check_same_thread=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Used only by this thread; closed from whichever thread calls close()
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _run(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        with self._lock:
+            self._queued_reads -= 1
+        conn = self._connection()
+        try:
+            return fn(conn, *args, **kwargs)
+        finally:
+            # As with the pool: no dangling transaction for the next task
+            if conn.in_transaction:
+                conn.rollback()
+
+    async def read(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self._queued_reads += 1
+        call = functools.partial(self._run, fn, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._reader, call)
+
+    async def write(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await asyncio.wrap_future(self.writes.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            reads = {"readers": self.readers, "connections": len(self._conns), "queuedReads": self._queued_reads}
+        writes = self.writes.stats()
+        return dict(reads, queuedWrites=writes.pop("queued"), writes=writes)
+
+    def close(self) -> None:
+        # Let queued work finish, then close every thread's connection
+        self.writes.close()
+        self._reader.shutdown(wait=True)
+        with self._lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+_executor: Optional[DBExecutor] = None
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                size = int(os.environ.get("REGISTRY_DB_POOL_SIZE", "8"))
+                _pool = ConnectionPool(resolve_db_path(), max_size=size)
+    return _pool
+
+
+def get_executor() -> DBExecutor:
+    """Return the process-wide DB executor (REGISTRY_DB_READERS reader threads)."""
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                readers = int(os.environ.get("REGISTRY_DB_READERS", "4"))
+                _executor = DBExecutor(resolve_db_path(), readers=readers)
+    return _executor
+
+
+def close_pool() -> None:
+    """Close pooled connections and the DB executor's threads and connections.
+
+    Cached responses and query statistics go too: the next pool may open a
+    different database.
+    """
+    global _pool, _executor
+    response_cache.reset()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        if _executor is not None:
+            _executor.close()
+            _executor = None
+    querylog.reset()
+
+
+@metrics.REGISTRY.collector
+def _collect_metrics():
+    pool, executor = _pool, _executor
+    if pool is not None:
+        stats = pool.stats()
+        yield metrics.gauge("registry_db_pool_connections", "Pooled connections by state", [
+            ({"state": "idle"}, stats["idle"]),
+            ({"state": "in_use"}, stats["size"] - stats["idle"]),
+        ])
+        yield metrics.gauge("registry_db_pool_max_connections", "Pool size limit", stats["maxSize"])
+    if executor is not None:
+        stats = executor.stats()
+        writes = stats["writes"]
+        yield metrics.gauge("registry_db_queued_operations", "Operations waiting for a DB executor thread", [
+            ({"kind": "read"}, stats["queuedReads"]),
+            ({"kind": "write"}, stats["queuedWrites"]),
+        ])
+        yield metrics.counter(
+            "registry_db_write_transactions_total", "Group commits on the writer thread", writes["transactions"]
+        )
+        yield metrics.counter("registry_db_write_operations_total", "Writes by outcome", [
+            ({"outcome": "ok"}, writes["operations"] - writes["failed"]),
+            ({"outcome": "failed"}, writes["failed"]),
+        ])
+
+
+def get_db() -> Iterator[sqlite3.Connection]:
+    """FastAPI dependency yielding a pooled connection for the current request."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
 def ensure_db():
-    """Ensure database exists and has correct schema, without deleting existing data"""
-    db_path = resolve_db_path()
-    
-    conn = get_connection()
-    schema_path = Path(__file__).parent.parent / "models" / "schema.sql"
-    with open(schema_path, "r") as f:
-        schema = f.read()
-    
-    # Execute schema - uses "CREATE TABLE IF NOT EXISTS" so it's safe
-    conn.executescript(schema)
-    conn.commit()
-    conn.close()
+    """Ensure database exists and has correct schema, without deleting existing data.
+
+    Runs the schema migrations the database has not had yet (see
+    ``services/migrations.py``), then those of the archive files. Their
+    backfills are left to ``migrations.start_backfills``. A database that is
+    up to date is left alone: startup then costs a few quick reads.
+    """
+    # Both import this module
+    from backend.src.services.archive import upgrade_archives
+    from backend.src.services.migrations import upgrade_database
+
+    upgrade_database(backfill=False)
+    upgrade_archives()
 
 
 def init_db():
     """Initialize database from scratch - WARNING: This deletes existing data!"""
+    from backend.src.services.migrations import upgrade_database
+
+    # Drop pooled handles to the file we are about to delete
+    close_pool()
     db_path = resolve_db_path()
     if db_path.exists():
         # This is a simple approach for a single-user, local app.
-        # In a real-world scenario, a proper migration tool should be used.
         db_path.unlink()
-
-    conn = get_connection()
-    schema_path = Path(__file__).parent.parent / "models" / "schema.sql"
-    with open(schema_path, "r") as f:
-        schema = f.read()
-    
-    conn.executescript(schema)
-    conn.commit()
-    conn.close()
+    # An empty file goes through every migration, as an old one would
+    upgrade_database(db_path)
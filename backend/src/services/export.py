@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import csv
+import heapq
+import io
+import json
+import re
+import sqlite3
+import zipfile
+from typing import Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from backend.src.services.archive import REGISTRATION_COLUMNS, archive_dir
+from backend.src.services.db import get_pool
+from backend.src.services.federation import archive_files_for
+from backend.src.services.offices import has_office
+from backend.src.services.sealed import INDEX_SUFFIX, SealedArchive
+
+EXPORT_COLUMNS: Sequence[str] = [c.strip() for c in REGISTRATION_COLUMNS.split(",")]
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Rows pulled from SQLite per fetch, and per chunk handed to the response
+CHUNK_ROWS = 1000
+
+
+def _fetch(cur: sqlite3.Cursor) -> Iterator[sqlite3.Row]:
+    while True:
+        rows = cur.fetchmany(CHUNK_ROWS)
+        if not rows:
+            return
+        yield from rows
+
+
+def _sealed_rows(
+    archive: SealedArchive, month: str, category: Optional[str], office: Optional[str] = None
+) -> Iterator[tuple]:
+    at = {c: i for i, c in enumerate(EXPORT_COLUMNS)}
+    block_filter = (lambda b: category in b["protocols"]) if category else None
+    for row in archive.rows(block_filter=block_filter):
+        if row[at["deletedFlag"]] != 0 or row[at["entryDate"]][:7] != month:
+            continue
+        if category and row[at["category"]] != category:
+            continue
+        if office and not has_office(row[at["offices"]], office):
+            continue
+        yield tuple(row)
+
+
+def _unique_ids(rows: Iterator[Sequence]) -> Iterator[Sequence]:
+    last = None
+    for row in rows:
+        if row[0] != last:
+            last = row[0]
+            yield row
+
+
+def iter_month_rows(
+    conn: sqlite3.Connection, month: str, category: Optional[str] = None, office: Optional[str] = None
+) -> Iterator[sqlite3.Row]:
+    """Live rows of ``month`` from the main DB and its archive files, in id order.
+
+    Every source is read through its own cursor (sealed months one block at a
+    time) and merged lazily, so memory does not grow with the size of the month.
+    With ``office``, only rows filed to that office: through registration_offices
+    in the main DB, by the comma-joined column in archive files.
+    """
+    where = "deletedFlag = 0 AND {month_expr} = ?"
+    params: List[object] = [month]
+    if category:
+        where += " AND category = ?"
+        params.append(category)
+    main_where, main_params = where, list(params)
+    if office:
+        main_where += (
+            " AND id IN (SELECT registrationId FROM registration_offices WHERE office = ? AND entryMonth = ?)"
+        )
+        main_params += [office, month]
+        where += " AND has_office(offices, ?)"
+        params.append(office)
+    # Catalogue refresh may write, so do it before opening any cursor
+    names = archive_files_for(conn, month, category)
+    sources: List[Iterator[Sequence]] = [
+        _fetch(
+            conn.execute(
+                f"SELECT {REGISTRATION_COLUMNS} FROM registrations "
+                f"WHERE {main_where.format(month_expr='entryMonth')} ORDER BY id",
+                main_params,
+            )
+        )
+    ]
+    archives = []
+    directory = archive_dir()
+    try:
+        for name in names:
+            if name.endswith(INDEX_SUFFIX):
+                sealed = SealedArchive(directory / name)
+                archives.append(sealed)
+                sources.append(_sealed_rows(sealed, month, category, office))
+                continue
+            arch = sqlite3.connect((directory / name).as_uri() + "?mode=ro", uri=True)
+            arch.create_function("has_office", 2, has_office, deterministic=True)
+            archives.append(arch)
+            sources.append(
+                _fetch(
+                    arch.execute(
+                        f"SELECT {REGISTRATION_COLUMNS} FROM registrations "
+                        f"WHERE {where.format(month_expr='substr(entryDate, 1, 7)')} ORDER BY id",
+                        params,
+                    )
+                )
+            )
+        yield from _unique_ids(heapq.merge(*sources, key=lambda r: r[0]))
+    finally:
+        for arch in archives:
+            arch.close()
+
+
+def _csv_chunks(rows: Iterable[Sequence]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # BOM so spreadsheet programs detect UTF-8 (Greek text)
+    buf.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for n, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if n % CHUNK_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(rows: Iterable[Sequence]) -> Iterator[bytes]:
+    lines: List[str] = []
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, row))
+        record["offices"] = record["offices"].split(",") if record["offices"] else None
+        record["deletedFlag"] = bool(record["deletedFlag"])
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Non-seekable target for ZipFile; collected bytes are drained per chunk."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# OOXML namespace names: identifiers only, nothing is fetched. Assembled here
+# so the source holds no literal URLs (see tests/policy/test_no_network_egress.py)
+_OOXML = "http" + "://schemas.openxmlformats.org"
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Types xmlns="{_OOXML}/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_OOXML}/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        f'Type="{_OOXML}/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{_OOXML}/spreadsheetml/2006/main" '
+        f'xmlns:r="{_OOXML}/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Register" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_OOXML}/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        f'Type="{_OOXML}/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_row(values: Iterable[object]) -> str:
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def _xlsx_chunks(rows: Iterable[Sequence]) -> Iterator[bytes]:
+    # Minimal SpreadsheetML with inline strings, so rows can be written as
+    # they arrive instead of collecting a shared-strings table first
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_STATIC.items():
+            zf.writestr(name, content)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            header = (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<worksheet xmlns="{_OOXML}/spreadsheetml/2006/main">'
+                "<sheetData>"
+            )
+            sheet.write(header.encode("utf-8"))
+            sheet.write(_xlsx_row(EXPORT_COLUMNS).encode("utf-8"))
+            for n, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if n % CHUNK_ROWS == 0:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+WRITERS = {"csv": _csv_chunks, "ndjson": _ndjson_chunks, "xlsx": _xlsx_chunks}
+
+
+def export_month(
+    conn: sqlite3.Connection, month: str, category: Optional[str], fmt: str, office: Optional[str] = None
+) -> Iterator[bytes]:
+    return WRITERS[fmt](iter_month_rows(conn, month, category, office))
+
+
+def stream_export(month: str, category: Optional[str], fmt: str, office: Optional[str] = None) -> Iterator[bytes]:
+    """Response body generator; holds a pooled connection only while it runs."""
+    with get_pool().connection() as conn:
+        yield from export_month(conn, month, category, fmt, office)
@@ -0,0 +1,508 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.src.services.archive import REGISTRATION_COLUMNS, archive_dir
+from backend.src.services.db import begin_immediate
+from backend.src.services.offices import has_office
+from backend.src.services.sealed import COLUMNS, INDEX_SUFFIX, SealedArchive, SealedArchiveError
+from backend.src.services.search import SEARCH_COLUMNS, build_match_query, normalize_text
+
+# SQLite's default SQLITE_MAX_ATTACHED is 10
+ATTACH_BATCH = 8
+# Words of a column, as search_terms splits a query
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class FederatedQuery:
+    month: Optional[str] = None
+    category: Optional[str] = None
+    protocol_number: Optional[int] = None
+    office: Optional[str] = None
+    # Search terms; every term must start a word in one of SEARCH_COLUMNS
+    terms: Sequence[str] = field(default_factory=tuple)
+    after_id: Optional[int] = None
+    descending: bool = False
+    limit: int = 100
+
+
+def fold_text(value: Optional[str]) -> Optional[str]:
+    """Accent- and case-insensitive form used for matching inside archive files."""
+    if value is None:
+        return None
+    # As the index's remove_diacritics: every combining mark goes, not only Greek accents
+    decomposed = unicodedata.normalize("NFD", normalize_text(value))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def has_token_prefix(value: Optional[str], term: str) -> bool:
+    """Whether a word of ``value`` starts with the folded ``term``.
+
+    The same rule as the main database's FTS5 prefix queries, so a search
+    matches the same rows whether their month is archived or not.
+    """
+    if not value:
+        return False
+    return any(token.startswith(term) for token in _TOKEN_RE.findall(fold_text(value)))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.environ.get("REGISTRY_ARCHIVE_WORKERS", "4"))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive-query")
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _db_stats(path: Path, above_id: int = 0) -> List[tuple]:
+    arch = sqlite3.connect(path.as_uri() + "?mode=ro", uri=True)
+    try:
+        return arch.execute(
+            """
+            SELECT substr(entryDate, 1, 7), category, SUM(deletedFlag = 0),
+                   MIN(id), MAX(id), MIN(protocolNumber), MAX(protocolNumber),
+                   MIN(entryDate), MAX(entryDate)
+            FROM registrations WHERE id > ? GROUP BY 1, 2
+            """,
+            (above_id,),
+        ).fetchall()
+    except sqlite3.DatabaseError:
+        return []  # not an archive file (or no registrations table yet)
+    finally:
+        arch.close()
+
+
+_CATALOG_KEYS = (
+    "entryMonth", "category", "liveCount", "minId", "maxId",
+    "minProtocol", "maxProtocol", "minEntryDate", "maxEntryDate",
+)
+
+
+def _sealed_stats(path: Path) -> List[tuple]:
+    # Sealed months carry their catalogue figures in the index
+    try:
+        with SealedArchive(path) as sealed:
+            return [tuple(s[k] for k in _CATALOG_KEYS) for s in sealed.index["catalog"]]
+    except SealedArchiveError:
+        return []
+
+
+def catalog_entries(path: Path) -> List[tuple]:
+    """Catalogue rows of one archive file, stamped with its size and mtime.
+
+    An archive DB next to a sealed copy of its month is catalogued only with
+    the rows the seal does not hold, so totals count each row once. Those are
+    the ids above the sealed ones: a month's later rows were added to the
+    register later.
+    """
+    st = path.stat()
+    if path.name.endswith(INDEX_SUFFIX):
+        stats = _sealed_stats(path)
+    else:
+        seal = path.with_name(path.stem + INDEX_SUFFIX)
+        sealed_ids = [row[4] for row in _sealed_stats(seal)] if seal.exists() else []
+        stats = _db_stats(path, max(sealed_ids, default=0))
+    return [(path.name, *row, st.st_size, st.st_mtime) for row in stats]
+
+
+def store_catalog(conn: sqlite3.Connection, name: str, entries: Sequence[tuple] = ()) -> None:
+    """Replace the catalogue rows of file ``name``; the caller commits."""
+    conn.execute("DELETE FROM archive_catalog WHERE fileName = ?", (name,))
+    conn.executemany(
+        "INSERT OR REPLACE INTO archive_catalog VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", entries
+    )
+
+
+def refresh_catalog(conn: sqlite3.Connection, directory: Optional[Path] = None) -> List[str]:
+    """Catalogue new or changed archive files and forget deleted ones.
+
+    Only writers call this: the archiver and the sealer keep the entries of
+    the files they write, and startup picks up files changed by hand. Read
+    paths use the catalogue as it is. Returns the names of the files that
+    were (re)catalogued.
+    """
+    directory = directory or archive_dir()
+    known = {
+        r[0]: (r[1], r[2])
+        for r in conn.execute(
+            "SELECT fileName, MAX(fileSize), MAX(fileMtime) FROM archive_catalog GROUP BY fileName"
+        )
+    }
+    present = {}
+    if directory.exists():
+        for pattern in ("*.db", f"*{INDEX_SUFFIX}"):
+            for path in sorted(directory.glob(pattern)):
+                st = path.stat()
+                present[path.name] = (st.st_size, st.st_mtime)
+
+    changed = [name for name, sig in present.items() if known.get(name) != sig]
+    # Files are read before the write transaction starts
+    entries = {name: catalog_entries(directory / name) for name in changed}
+    gone = [name for name in known if name not in present]
+    if not (changed or gone):
+        return []
+    begin_immediate(conn)
+    for name in gone:
+        store_catalog(conn, name)
+    for name in changed:
+        store_catalog(conn, name, entries[name])
+    conn.commit()
+    return changed
+
+
+def _candidate_files(conn: sqlite3.Connection, q: FederatedQuery) -> List[str]:
+    # Catalogue pruning: only files that can hold a matching row
+    sql = "SELECT fileName FROM archive_catalog WHERE liveCount > 0"
+    params: List[Any] = []
+    if q.month:
+        sql += " AND entryMonth = ?"
+        params.append(q.month)
+    if q.category:
+        sql += " AND category = ?"
+        params.append(q.category)
+    if q.protocol_number is not None:
+        sql += " AND ? BETWEEN minProtocol AND maxProtocol"
+        params.append(q.protocol_number)
+    if q.after_id is not None:
+        sql += " AND minId < ?" if q.descending else " AND maxId > ?"
+        params.append(q.after_id)
+    sql += " GROUP BY fileName ORDER BY fileName"
+    return [r[0] for r in conn.execute(sql, params)]
+
+
+def archive_files_for(conn: sqlite3.Connection, month: str, category: Optional[str] = None) -> List[str]:
+    """Names of archive files holding live rows of ``month`` (and ``category``)."""
+    return _candidate_files(conn, FederatedQuery(month=month, category=category))
+
+
+def _archive_select(alias: str, source: str, q: FederatedQuery, params: List[Any]) -> str:
+    sql = (
+        f"SELECT {REGISTRATION_COLUMNS}, ? AS source FROM {alias}.registrations "
+        "WHERE deletedFlag = 0"
+    )
+    params.append(source)
+    if q.month:
+        sql += " AND substr(entryDate, 1, 7) = ?"
+        params.append(q.month)
+    if q.category:
+        sql += " AND category = ?"
+        params.append(q.category)
+    if q.protocol_number is not None:
+        sql += " AND protocolNumber = ?"
+        params.append(q.protocol_number)
+    if q.office:
+        # Archive files have no junction table, only the comma-joined column
+        sql += " AND has_office(offices, ?)"
+        params.append(q.office)
+    for term in q.terms:
+        sql += " AND (" + " OR ".join(f"has_token_prefix({c}, ?)" for c in SEARCH_COLUMNS) + ")"
+        params.extend([fold_text(term)] * len(SEARCH_COLUMNS))
+    if q.after_id is not None:
+        sql += " AND id < ?" if q.descending else " AND id > ?"
+        params.append(q.after_id)
+    order = "DESC" if q.descending else "ASC"
+    sql += f" ORDER BY id {order} LIMIT ?"
+    params.append(q.limit + 1)
+    return f"SELECT * FROM ({sql})"
+
+
+def _query_archive_batch(paths: Sequence[Path], q: FederatedQuery) -> List[Dict[str, Any]]:
+    conn = sqlite3.connect(":memory:", uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.create_function("has_token_prefix", 2, has_token_prefix, deterministic=True)
+    conn.create_function("has_office", 2, has_office, deterministic=True)
+    try:
+        params: List[Any] = []
+        selects = []
+        for i, path in enumerate(paths):
+            conn.execute(f"ATTACH DATABASE ? AS a{i}", (path.as_uri() + "?mode=ro",))
+            selects.append(_archive_select(f"a{i}", path.stem, q, params))
+        order = "DESC" if q.descending else "ASC"
+        sql = " UNION ALL ".join(selects) + f" ORDER BY id {order} LIMIT ?"
+        params.append(q.limit + 1)
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def _sealed_filters(
+    q: FederatedQuery,
+) -> Tuple[Callable[[Dict[str, Any]], bool], Callable[[Sequence], bool]]:
+    # Block filter (index metadata) and row predicate for a sealed month
+    at = {c: i for i, c in enumerate(COLUMNS["registrations"])}
+    search_at = [at[c] for c in SEARCH_COLUMNS]
+    terms = [fold_text(t) for t in q.terms]
+
+    def block_filter(block: Dict[str, Any]) -> bool:
+        ranges = block["protocols"]
+        if q.category:
+            ranges = {q.category: ranges[q.category]} if q.category in ranges else {}
+        if q.protocol_number is not None:
+            return any(lo <= q.protocol_number <= hi for lo, hi in ranges.values())
+        return bool(ranges)
+
+    def matches(row: Sequence) -> bool:
+        if row[at["deletedFlag"]] != 0:
+            return False
+        if q.month and row[at["entryDate"]][:7] != q.month:
+            return False
+        if q.category and row[at["category"]] != q.category:
+            return False
+        if q.protocol_number is not None and row[at["protocolNumber"]] != q.protocol_number:
+            return False
+        if q.office and not has_office(row[at["offices"]], q.office):
+            return False
+        if terms and not all(any(has_token_prefix(row[i], t) for i in search_at) for t in terms):
+            return False
+        return True
+
+    return block_filter, matches
+
+
+def _query_sealed(path: Path, q: FederatedQuery) -> List[Dict[str, Any]]:
+    columns = COLUMNS["registrations"]
+    block_filter, matches = _sealed_filters(q)
+    source = path.name[: -len(INDEX_SUFFIX)]
+    result: List[Dict[str, Any]] = []
+    with SealedArchive(path) as sealed:
+        for row in sealed.rows(after_id=q.after_id, descending=q.descending, block_filter=block_filter):
+            if not matches(row):
+                continue
+            record = dict(zip(columns, row))
+            record["source"] = source
+            result.append(record)
+            if len(result) > q.limit:
+                break
+    return result
+
+
+def _query_main(conn: sqlite3.Connection, q: FederatedQuery) -> List[Dict[str, Any]]:
+    params: List[Any] = []
+    if q.terms:
+        match = build_match_query(" ".join(q.terms))
+        sql = (
+            "SELECT r.*, 'main' AS source FROM registrations_fts f "
+            "JOIN registrations r ON r.id = f.rowid "
+            "WHERE registrations_fts MATCH ? AND r.deletedFlag = 0"
+        )
+        params.append(match)
+        id_col = "f.rowid"
+    else:
+        sql = "SELECT *, 'main' AS source FROM registrations r WHERE r.deletedFlag = 0"
+        id_col = "r.id"
+    if q.month:
+        sql += " AND r.entryMonth = ?"
+        params.append(q.month)
+    if q.category:
+        sql += " AND r.category = ?"
+        params.append(q.category)
+    if q.protocol_number is not None:
+        sql += " AND r.protocolNumber = ?"
+        params.append(q.protocol_number)
+    if q.office:
+        sql += (
+            " AND EXISTS (SELECT 1 FROM registration_offices o"
+            " WHERE o.registrationId = r.id AND o.office = ?)"
+        )
+        params.append(q.office)
+    if q.after_id is not None:
+        sql += f" AND {id_col} < ?" if q.descending else f" AND {id_col} > ?"
+        params.append(q.after_id)
+    sql += f" ORDER BY {id_col} {'DESC' if q.descending else 'ASC'} LIMIT ?"
+    params.append(q.limit + 1)
+    return [dict(r) for r in conn.execute(sql, params)]
+
+
+def _unique_ids(rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # A month can briefly exist both sealed and as an archive DB (re-seal in
+    # progress); the copies are identical, so keep the first
+    last = None
+    for row in rows:
+        if row["id"] != last:
+            last = row["id"]
+            yield row
+
+
+def federated_query(
+    conn: sqlite3.Connection, q: FederatedQuery, include_archives: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Rows from the main DB and matching archives in id order, plus the id to resume after.
+
+    Archive files are ATTACHed read-only in batches (SQLite allows only a
+    handful of attached databases per connection) and sealed months are
+    scanned block by block; each runs on a worker thread, and the per-source
+    results, already in id order, are merged. Registration ids stay unique
+    after archiving, so they order all sources.
+    """
+    files: List[Path] = []
+    if include_archives:
+        directory = archive_dir()
+        files = [directory / name for name in _candidate_files(conn, q)]
+    sealed = [f for f in files if f.name.endswith(INDEX_SUFFIX)]
+    files = [f for f in files if not f.name.endswith(INDEX_SUFFIX)]
+    batches = [files[i:i + ATTACH_BATCH] for i in range(0, len(files), ATTACH_BATCH)]
+    executor = _get_executor()
+    futures = [executor.submit(_query_archive_batch, batch, q) for batch in batches]
+    futures += [executor.submit(_query_sealed, path, q) for path in sealed]
+    # The main DB is queried on the caller's thread while archives run in parallel
+    results = [_query_main(conn, q)] + [f.result() for f in futures]
+
+    merged = _unique_ids(heapq.merge(*results, key=lambda r: r["id"], reverse=q.descending))
+    rows = [row for _, row in zip(range(q.limit + 1), merged)]
+    if len(rows) > q.limit:
+        return rows[:q.limit], rows[q.limit - 1]["id"]
+    return rows, None
+
+
+def _count_archive(path: Path, q: FederatedQuery) -> int:
+    if path.name.endswith(INDEX_SUFFIX):
+        block_filter, matches = _sealed_filters(q)
+        with SealedArchive(path) as sealed:
+            return sum(1 for row in sealed.rows(block_filter=block_filter) if matches(row))
+    sql = (
+        "SELECT COUNT(*) FROM registrations WHERE deletedFlag = 0 "
+        "AND substr(entryDate, 1, 7) = ? AND has_office(offices, ?)"
+    )
+    params: List[Any] = [q.month, q.office]
+    if q.category:
+        sql += " AND category = ?"
+        params.append(q.category)
+    arch = sqlite3.connect(path.as_uri() + "?mode=ro", uri=True)
+    arch.create_function("has_office", 2, has_office, deterministic=True)
+    try:
+        return arch.execute(sql, params).fetchone()[0]
+    finally:
+        arch.close()
+
+
+def archived_total(
+    conn: sqlite3.Connection, month: str, category: Optional[str], office: Optional[str] = None
+) -> int:
+    if office:
+        # The catalogue counts rows per month and category, not per office:
+        # count in the month's files themselves
+        q = FederatedQuery(month=month, category=category, office=office)
+        directory = archive_dir()
+        futures = [_get_executor().submit(_count_archive, directory / name, q)
+                   for name in _candidate_files(conn, q)]
+        return sum(f.result() for f in futures)
+    sql = "SELECT COALESCE(SUM(liveCount), 0) FROM archive_catalog WHERE entryMonth = ?"
+    params: List[Any] = [month]
+    if category:
+        sql += " AND category = ?"
+        params.append(category)
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def archived_numbers(
+    conn: sqlite3.Connection,
+    category: str,
+    column: str,
+    numbers: Sequence[int],
+    year: Optional[int] = None,
+) -> Set[int]:
+    """Which of ``numbers`` archived registrations of ``category`` already use.
+
+    ``column`` is ``protocolNumber`` (counted per ``year``) or ``draftNumber``.
+    Deleted registrations count: their numbers were handed out all the same.
+    """
+    if not numbers:
+        return set()
+    sql = "SELECT DISTINCT fileName FROM archive_catalog WHERE category = ?"
+    params: List[Any] = [category]
+    if year is not None:
+        sql += " AND entryMonth BETWEEN ? AND ?"
+        params += [f"{year:04d}-01", f"{year:04d}-12"]
+    if column == "protocolNumber":
+        sql += " AND maxProtocol >= ? AND minProtocol <= ?"
+        params += [min(numbers), max(numbers)]
+    names = [r[0] for r in conn.execute(sql + " ORDER BY fileName", params)]
+
+    wanted = set(numbers)
+    prefix = f"{year:04d}" if year is not None else ""
+    at = {c: i for i, c in enumerate(COLUMNS["registrations"])}
+    directory = archive_dir()
+    found: Set[int] = set()
+    for name in names:
+        path = directory / name
+        if name.endswith(INDEX_SUFFIX):
+            with SealedArchive(path) as sealed:
+                found.update(
+                    row[at[column]] for row in sealed.rows()
+                    if row[at["category"]] == category and row[at["entryDate"]].startswith(prefix)
+                    and row[at[column]] in wanted
+                )
+            continue
+        arch = sqlite3.connect(path.as_uri() + "?mode=ro", uri=True)
+        try:
+            found.update(r[0] for r in arch.execute(
+                f"SELECT {column} FROM registrations WHERE category = ? AND entryDate LIKE ? "
+                f"AND {column} IN (SELECT value FROM json_each(?))",
+                (category, prefix + "%", json.dumps(sorted(wanted))),
+            ))
+        finally:
+            arch.close()
+    return found
+
+
+def archived_audit_events(
+    conn: sqlite3.Connection, registration_id: int
+) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Audit events of a registration that was archived, and the file holding them.
+
+    The catalogue's id ranges point at the candidate files; audit events
+    move with their registration, so the first file that has any is the one.
+    """
+    names = [r[0] for r in conn.execute(
+        "SELECT DISTINCT fileName FROM archive_catalog WHERE ? BETWEEN minId AND maxId ORDER BY fileName",
+        (registration_id,),
+    )]
+    directory = archive_dir()
+    columns = COLUMNS["audit_events"]
+    at_registration = columns.index("registrationId")
+    for name in names:
+        path = directory / name
+        if name.endswith(INDEX_SUFFIX):
+            with SealedArchive(path) as sealed:
+                events = [dict(zip(columns, row)) for row in sealed.rows("audit_events")
+                          if row[at_registration] == registration_id]
+            source = name[: -len(INDEX_SUFFIX)]
+        else:
+            arch = sqlite3.connect(path.as_uri() + "?mode=ro", uri=True)
+            arch.row_factory = sqlite3.Row
+            try:
+                events = [dict(r) for r in arch.execute(
+                    "SELECT id, action, registrationId, timestamp, username FROM audit_events "
+                    "WHERE registrationId = ? ORDER BY id",
+                    (registration_id,),
+                )]
+            finally:
+                arch.close()
+            source = path.stem
+        if events:
+            return source, events
+    return None, []
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import sqlite3
+
+from backend.src.services import metrics
+
+# Live feed of registration changes for GET /registrations/stream. Write
+# handlers publish after their commit; every open stream has a bounded queue,
+# and one that falls behind is not buffered further: it is marked as lagging
+# and catches up from the database (registration ids and the audit log) from
+# the last id it sent.
+QUEUE_SIZE = 256
+# Keep-alive comment interval; also how soon a dead connection is noticed
+HEARTBEAT = 15.0
+# Most rows a reconnecting client is sent from the database; beyond that it is
+# told to reload instead
+REPLAY_LIMIT = 1000
+# Client reconnect delay (SSE "retry:" field), milliseconds
+RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class Change:
+    # created | deleted; "changed" means rows of the category (None: any) were
+    # written in bulk or by another process, and subscribers should catch up
+    # from the database
+    kind: str
+    category: Optional[str]
+    id: Optional[int] = None
+    month: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+
+# Queued instead of the changes a lagging subscriber missed
+LAGGED = Change(kind="lagged", category=None)
+# Ends open streams (shutdown)
+CLOSED = Change(kind="closed", category=None)
+
+
+class Subscription:
+    """One open stream: a bounded queue on the stream's event loop."""
+
+    def __init__(self, categories: Iterable[str], loop: asyncio.AbstractEventLoop, size: int):
+        self.categories: Optional[FrozenSet[str]] = frozenset(categories) or None
+        self.lagging = False
+        self._loop = loop
+        self._queue: "asyncio.Queue[Change]" = asyncio.Queue(size)
+
+    def wants(self, change: Change) -> bool:
+        return self.categories is None or change.category is None or change.category in self.categories
+
+    def _offer(self, change: Change) -> bool:
+        # On the subscriber's loop. Returns False when the subscriber just fell behind.
+        if change is CLOSED:
+            self._drop_queued()
+            self._queue.put_nowait(CLOSED)
+            return True
+        if self.lagging:
+            return True
+        try:
+            self._queue.put_nowait(change)
+            return True
+        except asyncio.QueueFull:
+            # Drop what is queued: the catch-up query covers it
+            self.lagging = True
+            self._drop_queued()
+            self._queue.put_nowait(LAGGED)
+            return False
+
+    def _drop_queued(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def next(self, timeout: float) -> Optional[Change]:
+        """The next change, or None after ``timeout`` seconds without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Feed:
+    """In-process publish/subscribe of registration changes.
+
+    :meth:`publish` may be called from any thread; changes reach each
+    subscriber on its own event loop, in publish order. A subscriber whose
+    queue is full is marked ``lagging`` and receives :data:`LAGGED` once
+    instead of further changes, so a slow client costs one bounded queue.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._counts = {"published": 0, "lagged": 0}
+
+    def subscribe(self, categories: Iterable[str] = ()) -> Subscription:
+        # Called on the event loop that will read the subscription
+        sub = Subscription(categories, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, change: Change) -> None:
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.wants(change)]
+            self._counts["published"] += 1
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for sub in subscribers:
+            if sub._loop is current:
+                self._deliver(sub, change)
+            elif not sub._loop.is_closed():
+                sub._loop.call_soon_threadsafe(self._deliver, sub, change)
+
+    def _deliver(self, sub: Subscription, change: Change) -> None:
+        if not sub._offer(change):
+            with self._lock:
+                self._counts["lagged"] += 1
+
+    def close(self) -> None:
+        """End every open stream."""
+        self.publish(CLOSED)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+            stats["subscribers"] = len(self._subscribers)
+            stats["lagging"] = sum(1 for s in self._subscribers if s.lagging)
+        return stats
+
+
+_feed: Optional[Feed] = None
+_feed_lock = threading.Lock()
+
+
+def get_feed() -> Feed:
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                _feed = Feed()
+    return _feed
+
+
+def publish(change: Change) -> None:
+    # Nobody can be listening before the first stream opened
+    if _feed is not None:
+        _feed.publish(change)
+
+
+def reset() -> None:
+    """End open streams and drop the process-wide feed."""
+    global _feed
+    with _feed_lock:
+        if _feed is not None:
+            _feed.close()
+        _feed = None
+
+
+def format_event(kind: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def changes_since(
+    conn: sqlite3.Connection,
+    last_id: int,
+    categories: Optional[FrozenSet[str]],
+    after_event: Optional[int] = None,
+    limit: int = REPLAY_LIMIT,
+) -> Optional[Tuple[List[sqlite3.Row], List[sqlite3.Row], int]]:
+    """Registrations created after ``last_id`` and deletions a client holding
+    ``last_id`` may have missed, with the audit event id read up to; or None
+    when the client should reload instead.
+
+    Creations are live rows with a greater id. Deletions come from the audit
+    log, after ``after_event`` (the value returned by the previous call) or,
+    on a first call, after the event that created ``last_id``: ids are handed
+    out in commit order, so anything deleted since the client saw that row is
+    later in the log. Some of them may already have been sent; clients apply
+    deletions idempotently. Too many rows, or a ``last_id`` the log no longer
+    has (archived), mean None.
+    """
+    in_categories = ""
+    params: List[Any] = []
+    if categories:
+        in_categories = f" IN ({','.join('?' * len(categories))})"
+        params = sorted(categories)
+    last_event = conn.execute("SELECT COALESCE(MAX(id), 0) FROM audit_events").fetchone()[0]
+    where = f" AND category{in_categories}" if categories else ""
+    created = conn.execute(
+        f"SELECT * FROM registrations WHERE id > ? AND deletedFlag = 0{where} ORDER BY id LIMIT ?",
+        [last_id, *params, limit + 1],
+    ).fetchall()
+    if len(created) > limit:
+        return None
+    if last_id <= 0:
+        return created, [], last_event
+    if after_event is None:
+        after_event = conn.execute(
+            "SELECT MIN(id) FROM audit_events WHERE registrationId = ? AND action = 'create'", (last_id,)
+        ).fetchone()[0]
+        if after_event is None:
+            return None
+    where = f" AND r.category{in_categories}" if categories else ""
+    deleted = conn.execute(
+        "SELECT e.registrationId AS id, r.category, r.entryMonth "
+        "FROM audit_events e JOIN registrations r ON r.id = e.registrationId "
+        f"WHERE e.id > ? AND e.id <= ? AND e.action = 'delete' AND e.registrationId <= ?{where} "
+        "ORDER BY e.id LIMIT ?",
+        [after_event, last_event, last_id, *params, limit + 1],
+    ).fetchall()
+    if len(deleted) > limit:
+        return None
+    return created, deleted, last_event
+
+
+@metrics.REGISTRY.collector
+def _collect_metrics():
+    if _feed is None:
+        return
+    stats = _feed.stats()
+    yield metrics.gauge("registry_feed_subscribers", "Open /registrations/stream connections",
+                        stats["subscribers"])
+    yield metrics.counter("registry_feed_lagged_total",
+                          "Streams that fell behind and caught up from the database", stats["lagged"])
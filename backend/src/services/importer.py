@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import re
+import sqlite3
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from pydantic import ValidationError
+
+from backend.src.models.registration import RegistrationCreate, category_error, validation_message
+from backend.src.services import cache as response_cache
+from backend.src.services.db import begin_immediate
+from backend.src.services.ingest import NewRegistration, insert_registrations, taken_numbers
+
+# Data rows validated and inserted per transaction (one checkpoint each)
+IMPORT_CHUNK = 2000
+# Rejected rows listed in a report; the count covers all of them
+MAX_REPORTED_ERRORS = 100
+
+FIELDS = (
+    "issuer", "referenceNumber", "subject", "recipient", "offices",
+    "entryDate", "protocolNumber", "draftNumber",
+)
+_FIELD_BY_KEY = {f.casefold(): f for f in FIELDS}
+_OFFICE_SPLIT = re.compile(r"[,;]")
+_CELL_COLUMN = re.compile(r"[A-Z]+")
+_WHOLE_NUMBER = re.compile(r"\d+(\.0+)?")
+# Excel stores dates as days since 1899-12-30 (1900 leap-year bug included)
+_EXCEL_EPOCH = date(1899, 12, 30)
+_EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+
+@dataclass
+class RowError:
+    row: int  # line (CSV) or row (XLSX) number in the file; the header is 1
+    message: str
+
+
+@dataclass
+class ImportReport:
+    fileName: str
+    category: str
+    keepNumbers: bool
+    rowsDone: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    resumedFrom: int = 0
+    alreadyImported: bool = False
+    elapsed: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fileName": self.fileName,
+            "category": self.category,
+            "keepNumbers": self.keepNumbers,
+            "rowsDone": self.rowsDone,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "resumedFrom": self.resumedFrom,
+            "alreadyImported": self.alreadyImported,
+            "elapsed": round(self.elapsed, 3),
+            "errors": [{"row": e.row, "error": e.message} for e in self.errors],
+        }
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _header_map(header: List[Optional[str]]) -> Dict[int, str]:
+    # Column position -> field name; unknown columns are ignored
+    return {
+        i: _FIELD_BY_KEY[name.strip().casefold()]
+        for i, name in enumerate(header)
+        if name and name.strip().casefold() in _FIELD_BY_KEY
+    }
+
+
+ParsedRow = Tuple[int, Dict[str, str]]
+
+
+def iter_csv_rows(path: Path) -> Iterator[ParsedRow]:
+    """Non-empty data rows as (line number, {field: text}).
+
+    ``,``, ``;`` and tab separators are detected.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        columns = _header_map(next(reader, []))
+        for values in reader:
+            if any(v.strip() for v in values):
+                yield reader.line_num, {name: values[i] for i, name in columns.items() if i < len(values)}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings: List[str] = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ElementTree.iterparse(f):
+            if _local(elem.tag) == "si":
+                strings.append("".join(t.text or "" for t in elem.iter() if _local(t.tag) == "t"))
+                elem.clear()
+    return strings
+
+
+def _column_index(ref: str) -> int:
+    index = 0
+    for ch in _CELL_COLUMN.match(ref).group():
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _first_sheet(zf: zipfile.ZipFile) -> str:
+    names = sorted(
+        n for n in zf.namelist() if n.startswith("xl/worksheets/") and n.endswith(".xml")
+    )
+    if "xl/worksheets/sheet1.xml" in names:
+        return "xl/worksheets/sheet1.xml"
+    if not names:
+        raise ValueError("workbook has no worksheet")
+    return names[0]
+
+
+def iter_xlsx_rows(path: Path) -> Iterator[ParsedRow]:
+    """Non-empty data rows of the first worksheet as (row number, {field: text}).
+
+    The sheet XML is parsed incrementally and every row is discarded once
+    read; only the shared-strings table is held in memory.
+    """
+    with zipfile.ZipFile(path) as zf:
+        strings = _shared_strings(zf)
+        columns: Optional[Dict[int, str]] = None
+        with zf.open(_first_sheet(zf)) as f:
+            sheet_data = None
+            cells: Dict[int, str] = {}
+            position = number = 0
+            for event, elem in ElementTree.iterparse(f, events=("start", "end")):
+                tag = _local(elem.tag)
+                if event == "start":
+                    if tag == "sheetData":
+                        sheet_data = elem
+                    continue
+                if tag == "c":
+                    ref = elem.get("r")
+                    index = _column_index(ref) if ref else position
+                    position = index + 1
+                    kind = elem.get("t")
+                    if kind == "inlineStr":
+                        value = "".join(t.text or "" for t in elem.iter() if _local(t.tag) == "t")
+                    else:
+                        v = next((c.text for c in elem if _local(c.tag) == "v"), None)
+                        if v is None:
+                            continue
+                        value = strings[int(v)] if kind == "s" else v
+                    cells[index] = value
+                elif tag == "row":
+                    number = int(elem.get("r") or number + 1)
+                    if columns is None:
+                        width = max(cells) + 1 if cells else 0
+                        columns = _header_map([cells.get(i) for i in range(width)])
+                    elif any(v.strip() for v in cells.values()):
+                        yield number, {name: cells[i] for i, name in columns.items() if i in cells}
+                    cells = {}
+                    position = 0
+                    if sheet_data is not None:
+                        sheet_data.clear()
+
+
+READERS: Dict[str, Callable[[Path], Iterator[ParsedRow]]] = {
+    "csv": iter_csv_rows,
+    "xlsx": iter_xlsx_rows,
+}
+# Raised by the readers for files that are not valid CSV/XLSX
+UNREADABLE_FILE_ERRORS = (ValueError, IndexError, csv.Error, zipfile.BadZipFile, ElementTree.ParseError)
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    value = value.strip() if value is not None else None
+    return value or None
+
+
+def _number(value: Optional[str], name: str) -> Optional[int]:
+    value = _text(value)
+    if value is None:
+        return None
+    # Spreadsheets may store whole numbers as "40001.0"
+    if not _WHOLE_NUMBER.fullmatch(value) or int(float(value)) < 1:
+        raise ValueError(f"{name}: must be a positive whole number")
+    return int(float(value))
+
+
+def _entry_date(value: Optional[str]) -> date:
+    value = _text(value)
+    if value is None:
+        raise ValueError("entryDate: required for imported registrations")
+    if _WHOLE_NUMBER.fullmatch(value) and int(float(value)) <= _EXCEL_MAX_SERIAL:
+        # Spreadsheet date serial
+        return _EXCEL_EPOCH + timedelta(days=int(float(value)))
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"entryDate: unrecognised date {value!r}")
+
+
+def to_registration(row: Dict[str, str], category: str, keep_numbers: bool) -> NewRegistration:
+    """Validate one parsed row; raises ValueError with a readable message."""
+    try:
+        payload = RegistrationCreate.model_validate({
+            "issuer": _text(row.get("issuer")),
+            "referenceNumber": _text(row.get("referenceNumber")),
+            "subject": _text(row.get("subject")),
+            "recipient": _text(row.get("recipient")),
+            "offices": [o.strip() for o in _OFFICE_SPLIT.split(row.get("offices") or "") if o.strip()]
+            or None,
+            "entryDate": _entry_date(row.get("entryDate")),
+        })
+    except ValidationError as exc:
+        raise ValueError(validation_message(exc))
+    error = category_error(category, payload)
+    if error:
+        raise ValueError(error)
+    protocol = draft = None
+    if keep_numbers:
+        protocol = _number(row.get("protocolNumber"), "protocolNumber")
+        if protocol is None:
+            raise ValueError("protocolNumber: required when keeping historical numbers")
+        if category.endswith("outgoing"):
+            draft = _number(row.get("draftNumber"), "draftNumber")
+    return NewRegistration(
+        issuer=payload.issuer,
+        referenceNumber=payload.referenceNumber,
+        subject=payload.subject,
+        recipient=payload.recipient,
+        offices=payload.offices,
+        entryDate=payload.entryDate,
+        protocolNumber=protocol,
+        draftNumber=draft,
+    )
+
+
+def _load_checkpoint(conn: sqlite3.Connection, digest: str, category: str) -> Optional[sqlite3.Row]:
+    return conn.execute(
+        "SELECT rowsDone, inserted, rejected, status FROM import_checkpoints "
+        "WHERE digest = ? AND category = ?",
+        (digest, category),
+    ).fetchone()
+
+
+def _save_checkpoint(
+    conn: sqlite3.Connection, digest: str, report: ImportReport, status: str
+) -> None:
+    now = _now_iso()
+    conn.execute(
+        """
+        INSERT INTO import_checkpoints
+            (digest, category, fileName, rowsDone, inserted, rejected, status, startedAt, updatedAt)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (digest, category) DO UPDATE SET
+            rowsDone = excluded.rowsDone, inserted = excluded.inserted,
+            rejected = excluded.rejected, status = excluded.status, updatedAt = excluded.updatedAt
+        """,
+        (digest, report.category, report.fileName, report.rowsDone, report.inserted,
+         report.rejected, status, now, now),
+    )
+
+
+def import_file(
+    conn: sqlite3.Connection,
+    path: Path,
+    category: str,
+    *,
+    fmt: Optional[str] = None,
+    keep_numbers: bool = False,
+    chunk_size: int = IMPORT_CHUNK,
+    username: str = "import",
+    file_name: Optional[str] = None,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """Import a CSV/XLSX register into ``category``, one transaction per chunk.
+
+    Rows are streamed from the file, validated with RegistrationCreate and
+    inserted with executemany. Invalid rows are skipped and reported. Each
+    chunk commits together with a checkpoint keyed by the file's digest, so
+    running the same file again resumes after the last committed chunk (and
+    does nothing once the file is done). With ``keep_numbers`` the file's
+    protocolNumber/draftNumber columns are kept and the numbering sequences
+    are moved past them; rows whose numbers are already registered, or
+    repeat an earlier row's, are rejected. Otherwise numbers are allocated
+    as for new entries.
+    """
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt not in READERS:
+        raise ValueError(f"unsupported import format {fmt!r}")
+    digest = file_digest(path)
+    report = ImportReport(fileName=file_name or path.name, category=category, keepNumbers=keep_numbers)
+    checkpoint = _load_checkpoint(conn, digest, category)
+    if checkpoint is not None:
+        report.rowsDone, report.inserted, report.rejected = (
+            checkpoint["rowsDone"], checkpoint["inserted"], checkpoint["rejected"]
+        )
+        report.resumedFrom = report.rowsDone
+        if checkpoint["status"] == "done":
+            report.alreadyImported = True
+            return report
+
+    started = time.perf_counter()
+    rows = READERS[fmt](path)
+    for _ in zip(range(report.rowsDone), rows):
+        pass  # committed by an earlier run
+
+    chunk: List[NewRegistration] = []
+    lines: List[int] = []  # file row number of each chunk item
+    consumed = 0
+
+    def reject(number: int, message: str) -> None:
+        report.rejected += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(RowError(number, message))
+
+    def flush(status: str = "running") -> None:
+        nonlocal consumed
+        if chunk and keep_numbers:
+            # Checked under the write lock that the insert keeps
+            begin_immediate(conn)
+            taken = taken_numbers(conn, category, chunk)
+            for i, message in taken.items():
+                reject(lines[i], message)
+            chunk[:] = [it for i, it in enumerate(chunk) if i not in taken]
+            report.errors.sort(key=lambda e: e.row)
+        if chunk:
+            insert_registrations(conn, category, chunk, username)
+        report.rowsDone += consumed
+        report.inserted += len(chunk)
+        _save_checkpoint(conn, digest, report, status)
+        conn.commit()
+        for month in {it.entryDate.strftime("%Y-%m") for it in chunk}:
+            response_cache.invalidate(month, category)
+        chunk.clear()
+        lines.clear()
+        consumed = 0
+        report.elapsed = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    for number, row in rows:
+        consumed += 1
+        try:
+            chunk.append(to_registration(row, category, keep_numbers))
+            lines.append(number)
+        except ValueError as exc:
+            reject(number, str(exc))
+        if consumed >= chunk_size:
+            flush()
+    flush("done")
+    return report
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import sqlite3
+
+from backend.src.services import audit, metrics
+from backend.src.services.db import begin_immediate
+from backend.src.services.federation import archived_numbers
+from backend.src.services.numbering import (
+    advance_draft,
+    advance_protocol,
+    next_draft_range,
+    next_protocol_range,
+)
+
+
+@dataclass
+class NewRegistration:
+    issuer: str
+    referenceNumber: str
+    subject: str
+    recipient: Optional[str]
+    offices: Optional[List[str]]
+    entryDate: date
+    # Set to keep historical numbers; left None they are allocated
+    protocolNumber: Optional[int] = None
+    draftNumber: Optional[int] = None
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _numbers_in_use(
+    conn: sqlite3.Connection, category: str, year: Optional[int], numbers: Sequence[int]
+) -> Set[int]:
+    # Protocol numbers (of ``year``) or, with year None, draft numbers of
+    # ``category`` that a registration already has, in main or an archive
+    seq_type, column = ("protocol", "protocolNumber") if year is not None else ("draft", "draftNumber")
+    row = conn.execute(
+        "SELECT nextNumber FROM numbering_sequences WHERE type = ? AND category = ? AND year IS ?",
+        (seq_type, category, year),
+    ).fetchone()
+    # Every number handed out or kept so far is below the sequence's next one
+    below = sorted(n for n in numbers if row is not None and n < row[0])
+    if not below:
+        return set()
+    sql = f"SELECT {column} FROM registrations WHERE category = ? AND {column} IN (SELECT value FROM json_each(?))"
+    params: List[Any] = [category, json.dumps(below)]
+    if year is not None:
+        sql += " AND deletedFlag IN (0, 1) AND entryMonth BETWEEN ? AND ?"
+        params += [f"{year:04d}-01", f"{year:04d}-12"]
+    found = {r[0] for r in conn.execute(sql, params)}
+    return found | archived_numbers(conn, category, column, below, year)
+
+
+def taken_numbers(
+    conn: sqlite3.Connection, category: str, items: Sequence[NewRegistration]
+) -> Dict[int, str]:
+    """Items whose preset numbers are already taken, by index, with the reason.
+
+    A protocol number is taken when a registration of ``category`` has it in
+    the same year, a draft number when one of ``category`` has it at all, or
+    when an earlier item claims it. Call it inside the write transaction that
+    inserts the other items, before the sequences move.
+    """
+    errors: Dict[int, str] = {}
+    protocols: Dict[int, Dict[int, int]] = {}  # year -> number -> index
+    drafts: Dict[int, int] = {}
+    for i, it in enumerate(items):
+        year = it.entryDate.year
+        if it.protocolNumber is not None and it.protocolNumber in protocols.get(year, {}):
+            errors[i] = f"protocolNumber: {it.protocolNumber} of {year} is already in this file"
+        elif it.draftNumber is not None and it.draftNumber in drafts:
+            errors[i] = f"draftNumber: {it.draftNumber} is already in this file"
+        else:
+            if it.protocolNumber is not None:
+                protocols.setdefault(year, {})[it.protocolNumber] = i
+            if it.draftNumber is not None:
+                drafts[it.draftNumber] = i
+    for year, numbers in protocols.items():
+        for number in _numbers_in_use(conn, category, year, list(numbers)):
+            errors[numbers[number]] = f"protocolNumber: {number} of {year} is already registered"
+    for number in _numbers_in_use(conn, category, None, list(drafts)):
+        errors.setdefault(drafts[number], f"draftNumber: {number} is already registered")
+    return errors
+
+
+def insert_registrations(
+    conn: sqlite3.Connection,
+    category: str,
+    items: Sequence[NewRegistration],
+    username: str,
+) -> List[Tuple[int, int, Optional[int]]]:
+    """Insert ``items`` with their audit events; returns (id, protocol, draft) per item.
+
+    Missing numbers are allocated as one contiguous range per sequence, in
+    item order; preset (historical) numbers move their sequence past them so
+    they are never handed out again (see :func:`taken_numbers` for checking
+    them first). Runs inside a single BEGIN IMMEDIATE transaction that the
+    caller commits, so the batch is all-or-nothing.
+    """
+    if not items:
+        return []
+    begin_immediate(conn)
+    outgoing = category.endswith("outgoing")
+
+    protocols: List[Optional[int]] = [it.protocolNumber for it in items]
+    by_year: Dict[int, List[int]] = {}
+    kept_by_year: Dict[int, int] = {}
+    for i, it in enumerate(items):
+        year = it.entryDate.year
+        if it.protocolNumber is None:
+            by_year.setdefault(year, []).append(i)
+        else:
+            kept_by_year[year] = max(kept_by_year.get(year, 0), it.protocolNumber)
+    for year, used in kept_by_year.items():
+        advance_protocol(conn, category, year, used)
+    for year, indexes in by_year.items():
+        first = next_protocol_range(conn, category, year, len(indexes))
+        for offset, i in enumerate(indexes):
+            protocols[i] = first + offset
+
+    drafts: List[Optional[int]] = [it.draftNumber for it in items]
+    kept_drafts = [d for d in drafts if d is not None]
+    if kept_drafts:
+        advance_draft(conn, category, max(kept_drafts))
+    if outgoing:
+        missing = [i for i, it in enumerate(items) if it.draftNumber is None]
+        if missing:
+            first = next_draft_range(conn, category, len(missing))
+            for offset, i in enumerate(missing):
+                drafts[i] = first + offset
+
+    created_at = _now_iso()
+    # Holding the write lock, our rows get the next ids in insert order
+    last_id = conn.execute(
+        "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'registrations'), 0), "
+        "COALESCE((SELECT MAX(id) FROM registrations), 0))"
+    ).fetchone()[0]
+    with metrics.timed("insert"):
+        conn.executemany(
+            """
+            INSERT INTO registrations (
+                category, issuer, referenceNumber, subject, recipient, offices,
+                protocolNumber, draftNumber, entryDate, createdAt, deletedFlag
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            [
+                (
+                    category,
+                    it.issuer,
+                    it.referenceNumber,
+                    it.subject,
+                    it.recipient,
+                    ",".join(it.offices) if it.offices else None,
+                    protocols[i],
+                    drafts[i],
+                    it.entryDate.isoformat(),
+                    created_at,
+                )
+                for i, it in enumerate(items)
+            ],
+        )
+    ids = [r[0] for r in conn.execute(
+        "SELECT id FROM registrations WHERE id > ? ORDER BY id", (last_id,)
+    )]
+    audit.record_many(conn, [("create", reg_id, created_at, username) for reg_id in ids])
+    return [(ids[i], protocols[i], drafts[i]) for i in range(len(items))]
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# In-process metrics rendered in the Prometheus text format at /metrics; no
+# client library and no collector needed. REGISTRY_METRICS=0 turns every
+# observation into a no-op and removes the endpoint.
+_enabled = os.environ.get("REGISTRY_METRICS", "1") != "0"
+
+# Seconds; request and DB latencies of an offline app sit well under a second
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# A BEGIN IMMEDIATE that waited longer than this counts as contended
+CONTENDED_AFTER = 0.001
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+# (name, type, help, samples) of one metric family
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool) -> None:
+    global _enabled
+    _enabled = value
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labels, k)), v) for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        if not _enabled:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+        out: List[Sample] = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                out.append((self.name + "_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            out.append((self.name + "_sum", labels, total))
+            out.append((self.name + "_count", labels, cumulative))
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        # Called at scrape time for values kept elsewhere (pool, queue, cache stats)
+        self._collectors: List[Callable[[], Iterator[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Sample]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for metric in self._metrics:
+            family(metric.name, metric.kind, metric.help, metric.samples())
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                family(name, kind, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "registry_http_request_duration_seconds", "HTTP request latency by route and status",
+    ("method", "route", "status"),
+))
+DB_SECONDS = REGISTRY.register(Histogram(
+    "registry_db_operation_duration_seconds",
+    "Time spent in database work by kind (numbering, insert, audit, list, search, archive)",
+    ("op",),
+))
+LOCK_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "registry_db_lock_wait_seconds", "Time to obtain the write lock (BEGIN IMMEDIATE)", ("source",),
+))
+LOCK_CONTENDED = REGISTRY.register(Counter(
+    "registry_db_lock_contended_total", "Write lock requests that had to wait for another writer", ("source",),
+))
+LOCK_TIMEOUTS = REGISTRY.register(Counter(
+    "registry_db_lock_timeouts_total", "Write lock requests that gave up after busy_timeout", ("source",),
+))
+NUMBER_ALLOCATIONS = REGISTRY.register(Counter(
+    "registry_numbering_allocations_total", "Numbering sequence reservations by sequence type", ("type",),
+))
+NUMBER_UNUSED_RANGES = REGISTRY.register(Counter(
+    "registry_numbering_unused_ranges_total",
+    "Reserved blocks another writer allocated past before they could be handed back",
+))
+ARCHIVE_CHUNK_RETRIES = REGISTRY.register(Counter(
+    "registry_archive_chunk_retries_total", "Archive chunks copied again because rows changed meanwhile",
+))
+
+
+@contextmanager
+def timed(op: str) -> Iterator[None]:
+    """Observe the duration of the block in DB_SECONDS under ``op``."""
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_SECONDS.observe(time.perf_counter() - started, op)
+
+
+@contextmanager
+def lock_wait(source: str) -> Iterator[None]:
+    """Time a BEGIN IMMEDIATE: how long ``source`` waited for the write lock.
+
+    A BEGIN that raises gave up after busy_timeout and counts as a timeout.
+    """
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LOCK_TIMEOUTS.inc(source)
+        raise
+    finally:
+        waited = time.perf_counter() - started
+        LOCK_WAIT_SECONDS.observe(waited, source)
+    if waited > CONTENDED_AFTER:
+        LOCK_CONTENDED.inc(source)
+
+
+def _family(kind: str, name: str, help_text: str, values) -> Family:
+    if isinstance(values, (int, float)):
+        values = [({}, values)]
+    return name, kind, help_text, [(name, labels, value) for labels, value in values]
+
+
+def gauge(name: str, help_text: str, values) -> Family:
+    """A scrape-time gauge; ``values`` is a number or ``[(labels, value), ...]``."""
+    return _family("gauge", name, help_text, values)
+
+
+def counter(name: str, help_text: str, values) -> Family:
+    """A scrape-time counter kept elsewhere (e.g. a component's own stats)."""
+    return _family("counter", name, help_text, values)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def route_label(path: Optional[str]) -> str:
+    # Route templates only (e.g. /registrations/{id}); raw paths would let
+    # arbitrary URLs create new series
+    return path or "unmatched"
@@ -0,0 +1,718 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.src.services.db import begin_immediate, connect, resolve_db_path
+
+logger = logging.getLogger(__name__)
+
+# A database's schema version is kept in PRAGMA user_version: the number of
+# the last migration applied to it (0 for a new file, or one from before
+# versioning). Each migration runs in one write transaction together with
+# the version bump, so a failed or interrupted upgrade leaves the previous
+# version in place, and starting again repeats only what did not commit.
+#
+# Changes to the schema go into a new migration at the end of the list;
+# released migrations are not edited. A migration carries its own SQL,
+# written out as it was released, and never calls into the modules that use
+# the tables: those follow the latest schema, while a new database still
+# goes through every migration in turn. Version 1 is also safe to run again
+# (IF NOT EXISTS throughout): resetting user_version to 0 is how the
+# benchmarks rebuild what a bulk load dropped.
+#
+# Data changes too large for one transaction (filling a new table from an
+# existing one, say) are declared as backfills. The migration only records
+# the id range to cover, and the rows are then processed in short
+# transactions of their own, each advancing the position kept in
+# schema_backfills. Other writers get the lock between chunks, and an
+# interrupted backfill continues where it stopped. The server applies
+# migrations on startup and leaves their backfills to a background thread
+# (start_backfills), so it serves at once; until a backfill is done, what it
+# fills lacks the rows it has not reached. A step runs in the transaction that
+# advances the position, so each range is handled once, while the
+# migration's sync triggers already maintain the rows written since. Sync
+# triggers that would change rows a backfill has not reached yet (removing
+# them from an index they are not in, say) check schema_backfills and leave
+# those rows to it.
+
+# Width of the id range processed per backfill transaction
+BACKFILL_CHUNK = 2000
+# Minimum pause between chunks so queued writers get the lock first
+BACKFILL_PAUSE = 0.005
+
+BACKFILLS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_backfills (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL, -- migration that scheduled it
+        firstId INTEGER NOT NULL, -- first id existing when it was scheduled
+        nextId INTEGER NOT NULL,  -- first id not processed yet
+        lastId INTEGER NOT NULL,  -- last id existing when it was scheduled
+        startedAt TEXT NOT NULL,
+        finishedAt TEXT
+    )
+"""
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """Chunked data change over the id range of ``table``.
+
+    ``step(conn, lo, hi)`` handles the rows with ``lo <= id <= hi`` inside
+    the caller's transaction. ``needed(conn)``, asked before the migration
+    runs, can tell that the database does not need it.
+    """
+
+    name: str
+    table: str
+    step: Callable[[sqlite3.Connection, int, int], None]
+    needed: Optional[Callable[[sqlite3.Connection], bool]] = None
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+    backfills: Tuple[Backfill, ...] = ()
+
+
+def split_statements(script: str) -> Iterator[str]:
+    """Statements of an SQL script, for running one by one inside a transaction
+    (``executescript`` commits whatever transaction is open first)."""
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \t\r\n;"):
+                yield statement
+            statement = ""
+    if statement.strip(" \t\r\n;"):
+        raise MigrationError(f"incomplete SQL statement: {statement.strip()[:80]}")
+
+
+def execute_script(conn: sqlite3.Connection, script: str) -> None:
+    for statement in split_statements(script):
+        conn.execute(statement)
+
+
+def schema_version(conn: sqlite3.Connection, schema: str = "main") -> int:
+    return conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _schedule(conn: sqlite3.Connection, version: int, backfill: Backfill) -> None:
+    first, last = conn.execute(f"SELECT MIN(id), MAX(id) FROM {backfill.table}").fetchone()
+    if first is None:
+        return
+    # Rows added after this transaction are the sync triggers' business
+    execute_script(conn, BACKFILLS_DDL)
+    conn.execute(
+        "INSERT OR REPLACE INTO schema_backfills (name, version, firstId, nextId, lastId, startedAt) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (backfill.name, version, first, first, last, _now_iso()),
+    )
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> List[int]:
+    """Apply the migrations newer than the database, oldest first; returns their versions.
+
+    Every migration takes the write lock and reads the version again before
+    it runs, so processes starting together apply each one once.
+    """
+    current, latest = schema_version(conn), (migrations[-1].version if migrations else 0)
+    if current > latest:
+        raise MigrationError(f"database is at schema version {current}, newer than this release ({latest})")
+    applied = []
+    for migration in migrations:
+        if schema_version(conn) >= migration.version:
+            continue
+        begin_immediate(conn)
+        try:
+            if schema_version(conn) >= migration.version:
+                conn.rollback()
+                continue
+            backfills = [b for b in migration.backfills if b.needed is None or b.needed(conn)]
+            migration.apply(conn)
+            for backfill in backfills:
+                _schedule(conn, migration.version, backfill)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            conn.commit()
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            raise MigrationError(
+                f"schema migration {migration.version} ({migration.description}) failed: {exc}"
+            ) from exc
+        logger.info("applied schema migration %d: %s", migration.version, migration.description)
+        applied.append(migration.version)
+    return applied
+
+
+def pending_backfills(conn: sqlite3.Connection) -> List[Dict[str, int]]:
+    if not _has_table(conn, "schema_backfills"):
+        return []
+    rows = conn.execute(
+        "SELECT name, version, firstId, nextId, lastId FROM schema_backfills WHERE finishedAt IS NULL "
+        "ORDER BY version, name"
+    ).fetchall()
+    return [{"name": r[0], "version": r[1], "firstId": r[2], "nextId": r[3], "lastId": r[4]} for r in rows]
+
+
+def run_backfills(
+    conn: sqlite3.Connection,
+    migrations: Sequence[Migration],
+    *,
+    chunk_size: int = BACKFILL_CHUNK,
+    pause: float = BACKFILL_PAUSE,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Carry every unfinished backfill to its end; returns the chunks processed.
+
+    The position is re-read under the write lock for every chunk, so several
+    processes running this at once share the work instead of repeating it.
+    Setting ``stop`` ends the run after the chunk in progress.
+    """
+    steps = {b.name: b for m in migrations for b in m.backfills}
+    chunks = 0
+    for pending in pending_backfills(conn):
+        backfill = steps.get(pending["name"])
+        if backfill is None:
+            raise MigrationError(f"unknown backfill {pending['name']!r}")
+        while True:
+            if stop is not None and stop.is_set():
+                return chunks
+            begin_immediate(conn)
+            held = time.perf_counter()
+            try:
+                lo, last, finished = conn.execute(
+                    "SELECT nextId, lastId, finishedAt FROM schema_backfills WHERE name = ?", (backfill.name,)
+                ).fetchone()
+                if finished is not None:
+                    conn.rollback()
+                    break
+                hi = min(lo + chunk_size - 1, last)
+                backfill.step(conn, lo, hi)
+                conn.execute(
+                    "UPDATE schema_backfills SET nextId = ?, finishedAt = ? WHERE name = ?",
+                    (hi + 1, _now_iso() if hi >= last else None, backfill.name),
+                )
+                conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            held = time.perf_counter() - held
+            chunks += 1
+            if hi >= last:
+                logger.info("finished backfill %s", backfill.name)
+                break
+            if pause:
+                # As the archiver: off the lock at least as long as we held it
+                if stop is not None:
+                    stop.wait(max(pause, held))
+                else:
+                    time.sleep(max(pause, held))
+    return chunks
+
+
+def upgrade(
+    conn: sqlite3.Connection,
+    migrations: Sequence[Migration],
+    *,
+    chunk_size: int = BACKFILL_CHUNK,
+    pause: float = BACKFILL_PAUSE,
+) -> List[int]:
+    """Apply pending migrations, then finish their backfills."""
+    applied = apply_migrations(conn, migrations)
+    run_backfills(conn, migrations, chunk_size=chunk_size, pause=pause)
+    return applied
+
+
+def status(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> Dict[str, object]:
+    version = schema_version(conn)
+    return {
+        "version": version,
+        "latest": migrations[-1].version if migrations else 0,
+        "pending": [f"{m.version}: {m.description}" for m in migrations if m.version > version],
+        "backfills": pending_backfills(conn),
+    }
+
+
+# -- The main database -----------------------------------------------------
+
+# Version 1 folds Greek accents out of the search index with these pairs (as
+# services/search.py did when it was released) and indexes these columns
+_V1_ACCENTS = "άέήίόύώϊϋΐΰΆΈΉΊΌΎΏΪΫ"
+_V1_PLAIN = "αεηιουωιυιυΑΕΗΙΟΥΩΙΥ"
+_V1_SEARCH_COLUMNS = ("issuer", "subject", "referenceNumber", "recipient")
+
+
+def _v1_search_values(prefix: str) -> str:
+    values = []
+    for column in _V1_SEARCH_COLUMNS:
+        expr = f"{prefix}.{column}"
+        for accented, plain in zip(_V1_ACCENTS, _V1_PLAIN):
+            expr = f"replace({expr}, '{accented}', '{plain}')"
+        values.append(expr)
+    return ", ".join(values)
+
+
+def _v1_backfilling(name: str) -> str:
+    # True in a trigger on a row the backfill ``name`` has yet to reach
+    return (
+        f"EXISTS (SELECT 1 FROM schema_backfills WHERE name = '{name}' AND finishedAt IS NULL "
+        "AND OLD.id BETWEEN nextId AND lastId)"
+    )
+
+
+def _v1_office_codes(expr: str) -> str:
+    # 'A,B' -> '["A","B"]' for json_each; triggers cannot use a recursive CTE
+    # to split. Values that still are not valid JSON (control characters)
+    # yield no codes rather than failing the insert.
+    quoted = f"""'["' || replace(replace(replace({expr}, '\\', '\\\\'), '"', '\\"'), ',', '","') || '"]'"""
+    return f"(CASE WHEN json_valid({quoted}) THEN {quoted} END)"
+
+
+_V1_COLUMNS = ", ".join(_V1_SEARCH_COLUMNS)
+
+V1_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    issuer TEXT NOT NULL,
+    referenceNumber TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    recipient TEXT,
+    offices TEXT,
+    protocolNumber INTEGER NOT NULL,
+    draftNumber INTEGER,
+    entryDate TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    deletedFlag INTEGER NOT NULL DEFAULT 0,
+    deletedAt TEXT,
+    -- YYYY-MM derived from entryDate; computed on read, so inserts never set it
+    entryMonth TEXT GENERATED ALWAYS AS (substr(entryDate, 1, 7)) VIRTUAL
+);
+
+-- Month listings: filter by month (and category) and page in id order
+CREATE INDEX IF NOT EXISTS ix_registrations_month
+ON registrations(deletedFlag, entryMonth);
+CREATE INDEX IF NOT EXISTS ix_registrations_month_category
+ON registrations(deletedFlag, entryMonth, category);
+
+CREATE TABLE IF NOT EXISTS numbering_sequences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL, -- 'protocol' or 'draft'
+    category TEXT,      -- category for protocol; outgoing category for draft
+    year INTEGER,       -- null for draft
+    nextNumber INTEGER NOT NULL,
+    lastUpdated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL, -- 'create' or 'delete'
+    registrationId INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    username TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS archive_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    month TEXT NOT NULL,      -- YYYY-MM
+    createdAt TEXT NOT NULL,
+    itemsMoved INTEGER NOT NULL
+);
+
+-- One sequence row per (type, category, year); numbering upserts target this index
+CREATE UNIQUE INDEX IF NOT EXISTS ux_numbering_sequences
+ON numbering_sequences(type, COALESCE(category, ''), COALESCE(year, 0));
+
+-- Reserved numbers a block allocator could not hand back on shutdown
+CREATE TABLE IF NOT EXISTS numbering_unused (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    category TEXT,
+    year INTEGER,
+    fromNumber INTEGER NOT NULL,
+    toNumber INTEGER NOT NULL, -- inclusive
+    recordedAt TEXT NOT NULL
+);
+
+-- Live (not deleted) registrations per month and category, kept by triggers so
+-- listings can report a total without COUNT(*)
+CREATE TABLE IF NOT EXISTS registration_counts (
+    entryMonth TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (entryMonth, category)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_registration_counts_insert
+AFTER INSERT ON registrations WHEN NEW.deletedFlag = 0
+BEGIN
+    INSERT INTO registration_counts (entryMonth, category, total)
+    VALUES (NEW.entryMonth, NEW.category, 1)
+    ON CONFLICT (entryMonth, category) DO UPDATE SET total = total + 1;
+END;
+
+-- Rows the counts backfill has not reached are not counted yet
+CREATE TRIGGER IF NOT EXISTS trg_registration_counts_soft_delete
+AFTER UPDATE OF deletedFlag ON registrations
+WHEN OLD.deletedFlag = 0 AND NEW.deletedFlag <> 0 AND NOT {_v1_backfilling("registration_counts")}
+BEGIN
+    UPDATE registration_counts SET total = total - 1
+    WHERE entryMonth = OLD.entryMonth AND category = OLD.category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_registration_counts_delete
+AFTER DELETE ON registrations
+WHEN OLD.deletedFlag = 0 AND NOT {_v1_backfilling("registration_counts")}
+BEGIN
+    UPDATE registration_counts SET total = total - 1
+    WHERE entryMonth = OLD.entryMonth AND category = OLD.category;
+END;
+
+-- What each archive file in data/archive/ holds, so federated queries can skip
+-- files that cannot match. One row per (file, month, category).
+CREATE TABLE IF NOT EXISTS archive_catalog (
+    fileName TEXT NOT NULL,
+    entryMonth TEXT NOT NULL,
+    category TEXT NOT NULL,
+    liveCount INTEGER NOT NULL,   -- rows with deletedFlag = 0
+    minId INTEGER NOT NULL,
+    maxId INTEGER NOT NULL,
+    minProtocol INTEGER NOT NULL,
+    maxProtocol INTEGER NOT NULL,
+    minEntryDate TEXT NOT NULL,
+    maxEntryDate TEXT NOT NULL,
+    fileSize INTEGER NOT NULL,    -- size/mtime detect files changed since cataloguing
+    fileMtime REAL NOT NULL,
+    PRIMARY KEY (fileName, entryMonth, category)
+) WITHOUT ROWID;
+
+-- Progress of file imports (cli/import.py, POST /registrations/{{category}}/import),
+-- committed together with each chunk so an interrupted import resumes where it stopped
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    digest TEXT NOT NULL,         -- sha256 of the file contents
+    category TEXT NOT NULL,
+    fileName TEXT NOT NULL,
+    rowsDone INTEGER NOT NULL,    -- data rows consumed (inserted or rejected)
+    inserted INTEGER NOT NULL,
+    rejected INTEGER NOT NULL,
+    status TEXT NOT NULL,         -- running | done
+    startedAt TEXT NOT NULL,
+    updatedAt TEXT NOT NULL,
+    PRIMARY KEY (digest, category)
+) WITHOUT ROWID;
+
+-- Month being moved by run_monthly_archive; the row lives only while a run is
+-- in progress, so one left behind marks an interrupted archive to resume
+CREATE TABLE IF NOT EXISTS archive_progress (
+    month TEXT PRIMARY KEY,       -- YYYY-MM
+    moved INTEGER NOT NULL,
+    lastId INTEGER,               -- end of the last committed id range
+    startedAt TEXT NOT NULL,
+    updatedAt TEXT NOT NULL
+);
+
+-- Audit lookups by registration (archiving, history), by time and by user
+-- (GET /audit pages newest first on (timestamp, id))
+CREATE INDEX IF NOT EXISTS ix_audit_events_registration
+ON audit_events(registrationId);
+CREATE INDEX IF NOT EXISTS ix_audit_events_time
+ON audit_events(timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_events_user
+ON audit_events(username, timestamp);
+
+-- The audit log is append-only: events are never changed, and leave the main
+-- database only after their registration did (archiving moves both)
+CREATE TRIGGER IF NOT EXISTS trg_audit_events_no_update
+BEFORE UPDATE ON audit_events
+BEGIN
+    SELECT RAISE(ABORT, 'audit_events is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_audit_events_no_delete
+BEFORE DELETE ON audit_events
+WHEN EXISTS (SELECT 1 FROM registrations WHERE id = OLD.registrationId)
+BEGIN
+    SELECT RAISE(ABORT, 'audit_events is append-only');
+END;
+
+-- Runs of the maintenance scheduler (services/scheduler.py), newest last
+CREATE TABLE IF NOT EXISTS job_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job TEXT NOT NULL,
+    startedAt TEXT NOT NULL,
+    finishedAt TEXT,
+    durationMs REAL,
+    status TEXT NOT NULL,         -- running | ok | error
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_job_runs_job ON job_runs(job, id);
+
+-- Months rewritten into the sealed archive format (services/sealed.py)
+CREATE TABLE IF NOT EXISTS archive_seals (
+    month TEXT PRIMARY KEY,       -- YYYY-MM
+    rows INTEGER NOT NULL,
+    auditRows INTEGER NOT NULL,
+    sourceBytes INTEGER NOT NULL, -- archive DB (and earlier seal) replaced
+    sealedBytes INTEGER NOT NULL, -- data file + index
+    sha256 TEXT NOT NULL,         -- of the data file, as in its index
+    sealedAt TEXT NOT NULL
+);
+
+-- Full-text search over an external-content index (services/search.py);
+-- text goes in with its Greek accents folded. Removing a row the index never
+-- got would corrupt it, so rows the index backfill has not reached are left alone.
+CREATE VIRTUAL TABLE IF NOT EXISTS registrations_fts USING fts5(
+    {_V1_COLUMNS},
+    content='registrations', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_registrations_fts_insert
+AFTER INSERT ON registrations
+BEGIN
+    INSERT INTO registrations_fts (rowid, {_V1_COLUMNS}) VALUES (NEW.id, {_v1_search_values("NEW")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_registrations_fts_delete
+AFTER DELETE ON registrations WHEN NOT {_v1_backfilling("registrations_fts")}
+BEGIN
+    INSERT INTO registrations_fts (registrations_fts, rowid, {_V1_COLUMNS})
+    VALUES ('delete', OLD.id, {_v1_search_values("OLD")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_registrations_fts_update
+AFTER UPDATE OF {_V1_COLUMNS} ON registrations WHEN NOT {_v1_backfilling("registrations_fts")}
+BEGIN
+    INSERT INTO registrations_fts (registrations_fts, rowid, {_V1_COLUMNS})
+    VALUES ('delete', OLD.id, {_v1_search_values("OLD")});
+    INSERT INTO registrations_fts (rowid, {_V1_COLUMNS}) VALUES (NEW.id, {_v1_search_values("NEW")});
+END;
+
+CREATE TABLE IF NOT EXISTS offices (
+    code TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1 -- inactive offices are no longer offered for new entries
+) WITHOUT ROWID;
+
+-- One row per office of each live registration, kept from registrations.offices
+-- by the triggers below; office listings and counts read it instead of
+-- string-matching the comma-joined column
+CREATE TABLE IF NOT EXISTS registration_offices (
+    office TEXT NOT NULL,
+    entryMonth TEXT NOT NULL,
+    category TEXT NOT NULL,
+    registrationId INTEGER NOT NULL,
+    PRIMARY KEY (office, entryMonth, registrationId)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_registration_offices_category
+ON registration_offices(office, entryMonth, category, registrationId);
+CREATE INDEX IF NOT EXISTS ix_registration_offices_registration
+ON registration_offices(registrationId, office);
+
+CREATE TRIGGER IF NOT EXISTS trg_registration_offices_insert
+AFTER INSERT ON registrations WHEN NEW.deletedFlag = 0 AND NEW.offices IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO registration_offices (office, entryMonth, category, registrationId)
+    SELECT trim(value), NEW.entryMonth, NEW.category, NEW.id
+    FROM json_each({_v1_office_codes("NEW.offices")}) WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_registration_offices_delete
+AFTER DELETE ON registrations WHEN OLD.deletedFlag = 0 AND OLD.offices IS NOT NULL
+BEGIN
+    DELETE FROM registration_offices WHERE registrationId = OLD.id;
+END;
+
+-- Soft deletes drop a registration's rows; edits of the office list re-derive them
+CREATE TRIGGER IF NOT EXISTS trg_registration_offices_update
+AFTER UPDATE OF offices, entryDate, category, deletedFlag ON registrations
+BEGIN
+    DELETE FROM registration_offices WHERE registrationId = OLD.id;
+    INSERT OR IGNORE INTO registration_offices (office, entryMonth, category, registrationId)
+    SELECT trim(value), NEW.entryMonth, NEW.category, NEW.id
+    FROM json_each({_v1_office_codes("NEW.offices")})
+    WHERE NEW.deletedFlag = 0 AND trim(value) <> '';
+END;
+"""
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    # table_xinfo also lists generated (hidden) columns
+    return any(r[1] == column for r in conn.execute(f"PRAGMA table_xinfo({table})"))
+
+
+def _baseline(conn: sqlite3.Connection) -> None:
+    # The schema as it was when versioning began, reached from any earlier
+    # release: each derived table is created and filled if it is missing
+    if _has_table(conn, "registrations") and not _has_column(conn, "registrations", "entryMonth"):
+        # Before the indexes that use it; VIRTUAL generated columns can be
+        # added in place without a rewrite
+        conn.execute(
+            "ALTER TABLE registrations ADD COLUMN entryMonth TEXT "
+            "GENERATED ALWAYS AS (substr(entryDate, 1, 7)) VIRTUAL"
+        )
+    had_offices = _has_table(conn, "offices")
+    # The sync triggers read the backfill positions
+    execute_script(conn, BACKFILLS_DDL)
+    execute_script(conn, V1_SCHEMA)
+    if not had_offices:
+        # More are added with PUT /admin/offices/{code}
+        conn.execute(
+            "INSERT OR IGNORE INTO offices (code, label) VALUES ('OFF-1', 'Office 1'), ('OFF-2', 'Office 2')"
+        )
+
+
+def _v1_fill_counts(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO registration_counts (entryMonth, category, total)
+        SELECT entryMonth, category, COUNT(*) FROM registrations
+        WHERE id BETWEEN ? AND ? AND deletedFlag = 0 GROUP BY entryMonth, category
+        ON CONFLICT (entryMonth, category) DO UPDATE SET total = total + excluded.total
+        """,
+        (lo, hi),
+    )
+
+
+def _v1_fill_search(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    # Not 'rebuild': that would index the raw, accented content
+    conn.execute(
+        f"INSERT INTO registrations_fts (rowid, {_V1_COLUMNS}) "
+        f"SELECT id, {_v1_search_values('registrations')} FROM registrations WHERE id BETWEEN ? AND ?",
+        (lo, hi),
+    )
+
+
+def _v1_fill_offices(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    # Junction rows of registrations lo..hi from their comma-joined column,
+    # adding codes not yet in the offices table. Reads each row as it is now,
+    # so it is safe to repeat and to run while the sync triggers already
+    # maintain the table.
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO registration_offices (office, entryMonth, category, registrationId)
+        SELECT trim(j.value), r.entryMonth, r.category, r.id
+        FROM registrations r, json_each({_v1_office_codes("r.offices")}) j
+        WHERE r.id BETWEEN ? AND ? AND r.deletedFlag = 0 AND r.offices IS NOT NULL
+          AND trim(j.value) <> ''
+        """,
+        (lo, hi),
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO offices (code, label) "
+        "SELECT DISTINCT office, office FROM registration_offices WHERE registrationId BETWEEN ? AND ?",
+        (lo, hi),
+    )
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(
+        1, "registry schema, search index, offices junction", _baseline,
+        backfills=(
+            # Each fills a derived table that is new to the database
+            Backfill("registration_counts", "registrations", _v1_fill_counts,
+                     needed=lambda conn: not _has_table(conn, "registration_counts")),
+            Backfill("registrations_fts", "registrations", _v1_fill_search,
+                     needed=lambda conn: not _has_table(conn, "registrations_fts")),
+            # Codes already in use join the offices table as they turn up
+            Backfill("registration_offices", "registrations", _v1_fill_offices,
+                     needed=lambda conn: not _has_table(conn, "registration_offices")),
+        ),
+    ),
+)
+
+# Version a database has once every migration above ran
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def upgrade_database(
+    db_path: Optional[Path] = None,
+    *,
+    backfill: bool = True,
+    chunk_size: int = BACKFILL_CHUNK,
+    pause: float = BACKFILL_PAUSE,
+) -> List[int]:
+    """Bring the main database to :data:`SCHEMA_VERSION`; returns the versions applied.
+
+    With ``backfill`` false the backfills are left for :func:`start_backfills`.
+    A database already there, with no backfill left, costs two quick reads.
+    """
+    conn = connect(db_path or resolve_db_path())
+    try:
+        if schema_version(conn) == SCHEMA_VERSION and not (backfill and pending_backfills(conn)):
+            return []
+        if not backfill:
+            return apply_migrations(conn, MIGRATIONS)
+        return upgrade(conn, MIGRATIONS, chunk_size=chunk_size, pause=pause)
+    finally:
+        conn.close()
+
+
+_backfill_thread: Optional[threading.Thread] = None
+_backfill_stop = threading.Event()
+
+
+def _backfill_in_background(db_path: Path) -> None:
+    conn = connect(db_path)
+    try:
+        chunks = run_backfills(conn, MIGRATIONS, stop=_backfill_stop)
+        logger.info("background backfills ran %d chunks", chunks)
+    except Exception:
+        # Continues from its position on the next start (or cli/migrate.py)
+        logger.exception("schema backfill failed")
+    finally:
+        conn.close()
+
+
+def start_backfills(db_path: Optional[Path] = None) -> bool:
+    """Finish pending backfills on a background thread; False when there are none."""
+    global _backfill_thread
+    db_path = db_path or resolve_db_path()
+    conn = connect(db_path)
+    try:
+        pending = pending_backfills(conn)
+    finally:
+        conn.close()
+    if not pending:
+        return False
+    logger.info("continuing backfills in the background: %s", ", ".join(b["name"] for b in pending))
+    _backfill_stop.clear()
+    _backfill_thread = threading.Thread(
+        target=_backfill_in_background, args=(db_path,), name="schema-backfill", daemon=True
+    )
+    _backfill_thread.start()
+    return True
+
+
+def stop_backfills() -> None:
+    """Stop the background backfills after their current chunk."""
+    global _backfill_thread
+    if _backfill_thread is not None:
+        _backfill_stop.set()
+        _backfill_thread.join()
+        _backfill_thread = None
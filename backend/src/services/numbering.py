@@ -1,23 +1,51 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Optional  # noqa: F401 (retained for potential future use)
+from typing import Dict, List, Optional, Tuple
 
 import sqlite3
 
+from backend.src.services import metrics
+from backend.src.services.db import begin_immediate
+
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
-def _ensure_unique_index(conn: sqlite3.Connection) -> None:
-    # Create a unique index to prevent duplicate sequence rows
-    conn.execute(
-        """
-        CREATE UNIQUE INDEX IF NOT EXISTS ux_numbering_sequences
-        ON numbering_sequences(type, COALESCE(category, ''), COALESCE(year, 0));
-        """
-    )
+def protocol_start(category: str) -> int:
+    """Signals categories start at 1, others (common/confidential) at 40001."""
+    return 1 if category.startswith("signals_") else 40001
+
+
+def _allocate(
+    conn: sqlite3.Connection,
+    seq_type: str,
+    category: str,
+    year: Optional[int],
+    start: int,
+    count: int = 1,
+) -> int:
+    """Reserve ``count`` consecutive numbers and return the first one.
+
+    The sequence row stores the next number to hand out; a single upsert
+    creates it on first use or advances it, and returns the reserved value.
+    The unique index ``ux_numbering_sequences`` is created with the schema.
+    """
+    with metrics.timed("numbering"):
+        begin_immediate(conn)
+        row = conn.execute(
+            """
+            INSERT INTO numbering_sequences (type, category, year, nextNumber, lastUpdated)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (type, COALESCE(category, ''), COALESCE(year, 0))
+            DO UPDATE SET nextNumber = nextNumber + ?, lastUpdated = excluded.lastUpdated
+            RETURNING nextNumber
+            """,
+            (seq_type, category, year, start + count, _now_iso(), count),
+        ).fetchone()
+    metrics.NUMBER_ALLOCATIONS.inc(seq_type)
+    return row[0] - count
 
 
 def next_protocol(conn: sqlite3.Connection, category: str, year: int) -> int:
@@ -27,69 +55,135 @@ def next_protocol(conn: sqlite3.Connection, category: str, year: int) -> int:
     - Signals categories -> 1
     - Others (common/confidential) -> 40001
     """
-    _ensure_unique_index(conn)
-    start = 1 if category.startswith("signals_") else 40001
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, nextNumber FROM numbering_sequences
-        WHERE type = 'protocol' AND category = ? AND year = ?
-        """,
-        (category, year),
-    )
-    row = cur.fetchone()
-    if row is None:
-        cur.execute(
-            """
-            INSERT INTO numbering_sequences (type, category, year, nextNumber, lastUpdated)
-            VALUES ('protocol', ?, ?, ?, ?)
-            """,
-            (category, year, start, _now_iso()),
-        )
-        next_num = start
-    else:
-        next_num = row["nextNumber"]
-    # Increment for next time
-    cur.execute(
-        """
-        UPDATE numbering_sequences
-        SET nextNumber = ?, lastUpdated = ?
-        WHERE type = 'protocol' AND category = ? AND year = ?
-        """,
-        (next_num + 1, _now_iso(), category, year),
-    )
-    return next_num
+    return _allocate(conn, "protocol", category, year, protocol_start(category))
 
 
 def next_draft(conn: sqlite3.Connection, outgoing_category: str) -> int:
     """Get next draft number for outgoing category; never resets."""
-    _ensure_unique_index(conn)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, nextNumber FROM numbering_sequences
-        WHERE type = 'draft' AND category = ? AND year IS NULL
-        """,
-        (outgoing_category,),
-    )
-    row = cur.fetchone()
-    if row is None:
-        cur.execute(
-            """
-            INSERT INTO numbering_sequences (type, category, year, nextNumber, lastUpdated)
-            VALUES ('draft', ?, NULL, 1, ?)
-            """,
-            (outgoing_category, _now_iso()),
-        )
-        next_num = 1
-    else:
-        next_num = row["nextNumber"]
-    cur.execute(
+    return _allocate(conn, "draft", outgoing_category, None, 1)
+
+
+def next_protocol_range(conn: sqlite3.Connection, category: str, year: int, count: int) -> int:
+    """Reserve ``count`` consecutive protocol numbers; returns the first."""
+    return _allocate(conn, "protocol", category, year, protocol_start(category), count)
+
+
+def next_draft_range(conn: sqlite3.Connection, outgoing_category: str, count: int) -> int:
+    """Reserve ``count`` consecutive draft numbers; returns the first."""
+    return _allocate(conn, "draft", outgoing_category, None, 1, count)
+
+
+def _advance(
+    conn: sqlite3.Connection, seq_type: str, category: str, year: Optional[int], start: int, used: int
+) -> None:
+    # Move the sequence past ``used`` (never backwards), creating it if needed
+    begin_immediate(conn)
+    conn.execute(
         """
-        UPDATE numbering_sequences
-        SET nextNumber = ?, lastUpdated = ?
-        WHERE type = 'draft' AND category = ? AND year IS NULL
+        INSERT INTO numbering_sequences (type, category, year, nextNumber, lastUpdated)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (type, COALESCE(category, ''), COALESCE(year, 0))
+        DO UPDATE SET nextNumber = MAX(nextNumber, excluded.nextNumber),
+                      lastUpdated = excluded.lastUpdated
         """,
-        (next_num + 1, _now_iso(), outgoing_category),
+        (seq_type, category, year, max(start, used + 1), _now_iso()),
     )
-    return next_num
+
+
+def advance_protocol(conn: sqlite3.Connection, category: str, year: int, used: int) -> None:
+    """Record that protocol number ``used`` is taken, e.g. when importing old registers."""
+    _advance(conn, "protocol", category, year, protocol_start(category), used)
+
+
+def advance_draft(conn: sqlite3.Connection, outgoing_category: str, used: int) -> None:
+    """Record that draft number ``used`` is taken."""
+    _advance(conn, "draft", outgoing_category, None, 1, used)
+
+
+SequenceKey = Tuple[str, str, Optional[int]]
+
+
+class BlockAllocator:
+    """Hi/lo allocator serving numbers from blocks reserved in one write.
+
+    Intended for bulk paths (seeding, imports) that own ``conn`` for the
+    duration. Reservations ride on the caller's transaction, so commits and
+    rollbacks must go through :meth:`commit` / :meth:`rollback` to keep the
+    in-memory blocks consistent with the database. :meth:`close` hands the
+    unused tail of each block back to its sequence, or records it in
+    ``numbering_unused`` if another writer has allocated past it meanwhile.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, block_size: int = 1000):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.conn = conn
+        self.block_size = block_size
+        # key -> [next number to serve, end of block (exclusive)]
+        self._blocks: Dict[SequenceKey, List[int]] = {}
+        self._committed: Dict[SequenceKey, List[int]] = {}
+
+    def _take(self, key: SequenceKey, start: int) -> int:
+        block = self._blocks.get(key)
+        if block is None or block[0] >= block[1]:
+            seq_type, category, year = key
+            first = _allocate(self.conn, seq_type, category, year, start, self.block_size)
+            block = [first, first + self.block_size]
+            self._blocks[key] = block
+        num = block[0]
+        block[0] += 1
+        return num
+
+    def next_protocol(self, category: str, year: int) -> int:
+        return self._take(("protocol", category, year), protocol_start(category))
+
+    def next_draft(self, outgoing_category: str) -> int:
+        return self._take(("draft", outgoing_category, None), 1)
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._committed = {k: list(v) for k, v in self._blocks.items()}
+
+    def rollback(self) -> None:
+        # Blocks reserved in the rolled-back transaction no longer exist; blocks
+        # from earlier commits rewind so numbers of discarded rows are reused.
+        self.conn.rollback()
+        self._blocks = {k: list(v) for k, v in self._committed.items()}
+
+    def close(self) -> List[Tuple[SequenceKey, int, int]]:
+        """Release unused numbers and commit. Returns ranges that had to be recorded."""
+        recorded = []
+        now = _now_iso()
+        for (seq_type, category, year), (nxt, end) in self._blocks.items():
+            if nxt >= end:
+                continue
+            begin_immediate(self.conn)
+            cur = self.conn.execute(
+                """
+                UPDATE numbering_sequences SET nextNumber = ?, lastUpdated = ?
+                WHERE type = ? AND category = ? AND year IS ? AND nextNumber = ?
+                """,
+                (nxt, now, seq_type, category, year, end),
+            )
+            if cur.rowcount == 0:
+                self.conn.execute(
+                    """
+                    INSERT INTO numbering_unused (type, category, year, fromNumber, toNumber, recordedAt)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (seq_type, category, year, nxt, end - 1, now),
+                )
+                recorded.append(((seq_type, category, year), nxt, end - 1))
+                metrics.NUMBER_UNUSED_RANGES.inc()
+        self.commit()
+        self._blocks.clear()
+        self._committed.clear()
+        return recorded
+
+    def __enter__(self) -> "BlockAllocator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.rollback()
+        self.close()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+
+def split_offices(value: Optional[str]) -> List[str]:
+    """Office codes of a registration's ``offices`` column (comma-joined)."""
+    return [code.strip() for code in value.split(",") if code.strip()] if value else []
+
+
+def has_office(value: Optional[str], office: str) -> bool:
+    """Whether comma-joined ``value`` lists ``office``; also the SQL function
+    ``has_office`` on connections that read archive files, which carry only the
+    comma-joined column."""
+    return office in split_offices(value)
+
+
+def list_offices(conn: sqlite3.Connection, include_inactive: bool = False) -> List[Dict[str, Any]]:
+    sql = "SELECT code, label, active FROM offices"
+    if not include_inactive:
+        sql += " WHERE active = 1"
+    rows = conn.execute(sql + " ORDER BY code").fetchall()
+    if include_inactive:
+        return [{"code": r[0], "label": r[1], "active": bool(r[2])} for r in rows]
+    return [{"code": r[0], "label": r[1]} for r in rows]
+
+
+def save_office(conn: sqlite3.Connection, code: str, label: str, active: bool = True) -> Dict[str, Any]:
+    """Add an office or change its label/active flag; the caller commits."""
+    conn.execute(
+        """
+        INSERT INTO offices (code, label, active) VALUES (?, ?, ?)
+        ON CONFLICT (code) DO UPDATE SET label = excluded.label, active = excluded.active
+        """,
+        (code, label, int(active)),
+    )
+    return {"code": code, "label": label, "active": active}
+
+
+def count_office(conn: sqlite3.Connection, office: str, month: str, category: Optional[str] = None) -> int:
+    """Live registrations of ``month`` (and ``category``) filed to ``office``."""
+    sql = "SELECT COUNT(*) FROM registration_offices WHERE office = ? AND entryMonth = ?"
+    params: List[Any] = [office, month]
+    if category:
+        sql += " AND category = ?"
+        params.append(category)
+    return conn.execute(sql, params).fetchone()[0]
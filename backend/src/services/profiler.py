@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# Sampling CPU profiler for the running server: every ``interval`` seconds it
+# records the Python stack of every thread (event loop, DB executor, writer,
+# scheduler). Unlike cProfile it covers all threads, needs no restart, and
+# costs only the sampling itself, so it is safe to run against live traffic.
+DEFAULT_INTERVAL = 0.005
+MAX_SECONDS = 120.0
+# Frames in these files are waiting rather than working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "concurrent/futures/thread.py")
+
+Frame = Tuple[str, str, int]  # function, file, first line
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+@dataclass
+class Profile:
+    seconds: float
+    interval: float
+    samples: int = 0
+    # Root-first stack -> times seen, per thread name
+    stacks: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Folded stacks ("thread;outer;inner count"), the input of flame graph tools."""
+        lines = []
+        for (thread, stack), count in self.stacks.most_common():
+            frames = ";".join(f"{fn} ({file}:{line})" for fn, file, line in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def top(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Functions by samples spent in them (self) and under them (total)."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for (_, stack), count in self.stacks.items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+        rows = []
+        for frame, count in total.most_common(limit):
+            fn, file, line = frame
+            rows.append({
+                "function": fn,
+                "file": file,
+                "line": line,
+                "self": own[frame],
+                "total": count,
+                # Of sampling rounds; threads running in parallel can add up past 100
+                "selfPct": round(100 * own[frame] / self.samples, 1) if self.samples else 0,
+                "totalPct": round(100 * count / self.samples, 1) if self.samples else 0,
+            })
+        return rows
+
+    def summary(self, limit: int = 30) -> Dict[str, Any]:
+        threads: Counter = Counter()
+        for (thread, _), count in self.stacks.items():
+            threads[thread] += count
+        return {
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "samples": self.samples,
+            "threads": dict(threads.most_common()),
+            "top": self.top(limit),
+        }
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _idle(stack: Tuple[Frame, ...]) -> bool:
+    return bool(stack) and stack[-1][1].replace("\\", "/").endswith(_IDLE_FILES)
+
+
+_busy = threading.Lock()
+
+
+def sample(seconds: float, interval: float = DEFAULT_INTERVAL, include_idle: bool = False) -> Profile:
+    """Sample every other thread's stack for ``seconds``; blocks the calling thread.
+
+    Threads parked in a lock, queue or selector wait are left out unless
+    ``include_idle``, so the profile shows where CPU time goes. One profile
+    runs at a time.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("a profile is already running")
+    try:
+        seconds = min(max(seconds, interval), MAX_SECONDS)
+        profile = Profile(seconds=seconds, interval=interval)
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = _stack(frame)
+                if include_idle or not _idle(stack):
+                    profile.stacks[(names.get(ident, str(ident)), stack)] += 1
+            profile.samples += 1
+            time.sleep(interval)
+        return profile
+    finally:
+        _busy.release()
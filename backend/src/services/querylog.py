@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Opt-in statement tracing for the data layer. REGISTRY_SLOW_QUERY_MS turns it
+# on: every statement on connections opened by db.connect() is timed and
+# counted, and those slower than the threshold go to a rotating log together
+# with their EXPLAIN QUERY PLAN. REGISTRY_QUERY_LOG overrides the log file.
+PROGRESS_STEP = 1000  # VM instructions between progress handler calls
+LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+MAX_STATEMENTS = 500  # distinct statement texts kept in the summary
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+
+def threshold_ms() -> Optional[float]:
+    value = os.environ.get("REGISTRY_SLOW_QUERY_MS")
+    return float(value) if value else None
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Any = ()) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN lines for ``sql``, indented by depth; None if it has no plan."""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # A plain cursor, so the EXPLAIN itself is not traced
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    depth: Dict[int, int] = {}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+class QueryLog:
+    """Per-statement totals plus a rotating log of the slow ones.
+
+    Statements are keyed by their SQL text with placeholders; bound values
+    are never logged, since they hold registry contents.
+    """
+
+    def __init__(self, threshold_ms: float, path: Path):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._logger: Optional[logging.Logger] = None
+
+    def _slow_logger(self) -> logging.Logger:
+        if self._logger is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            logger = logging.getLogger(f"{__name__}.{id(self)}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(RotatingFileHandler(
+                self.path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+            ))
+            self._logger = logger
+        return self._logger
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any,
+               seconds: float, rows: int, steps: int) -> None:
+        text = _normalize(sql)
+        with self._lock:
+            stats = self._stats.get(text)
+            if stats is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    text = "(other)"
+                stats = self._stats.setdefault(
+                    text, {"calls": 0, "totalMs": 0.0, "maxMs": 0.0, "rows": 0, "vmSteps": 0, "slow": 0}
+                )
+            ms = seconds * 1000
+            stats["calls"] += 1
+            stats["totalMs"] += ms
+            stats["maxMs"] = max(stats["maxMs"], ms)
+            stats["rows"] += rows
+            stats["vmSteps"] += steps
+            slow = seconds >= self.threshold
+            if slow:
+                stats["slow"] += 1
+        if slow:
+            entry = {
+                "at": _now_iso(),
+                "ms": round(ms, 2),
+                "rows": rows,
+                "vmSteps": steps,
+                "thread": threading.current_thread().name,
+                "sql": text,
+                "plan": explain(conn, sql, params),
+            }
+            self._slow_logger().info(json.dumps(entry, ensure_ascii=False))
+
+    def summary(self, limit: int = 20, order: str = "totalMs") -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [dict(v, sql=k) for k, v in self._stats.items()]
+        for item in items:
+            item["totalMs"] = round(item["totalMs"], 2)
+            item["maxMs"] = round(item["maxMs"], 2)
+            item["meanMs"] = round(item["totalMs"] / item["calls"], 3)
+        items.sort(key=lambda item: item[order], reverse=True)
+        return items[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def close(self) -> None:
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+                handler.close()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor timing each statement from execute until its rows are consumed.
+
+    Only time spent inside sqlite3 calls counts (not the caller's work
+    between fetches). A statement ends when its rows run out, at the next
+    execute, or when the cursor is closed or collected.
+    """
+
+    _sql: Optional[str] = None
+
+    def _begin(self, sql: str, params: Any) -> None:
+        self._finish()
+        self._sql, self._params = sql, params
+        self._elapsed, self._steps, self._rows = 0.0, 0, 0
+
+    def _timed(self, fn, *args):
+        conn = self.connection
+        steps = conn.steps
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+            self._steps += conn.steps - steps
+
+    def _finish(self) -> None:
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        log = self.connection.query_log
+        if log is not None:
+            log.record(self.connection, sql, self._params, self._elapsed, self._rows, self._steps)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        self._begin(sql, parameters)
+        try:
+            self._timed(super().execute, sql, parameters)
+        except BaseException:
+            self._finish()
+            raise
+        if self.description is None:
+            # Not a query: done once executed
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        seq_of_parameters = list(seq_of_parameters)
+        self._begin(sql, seq_of_parameters[0] if seq_of_parameters else ())
+        try:
+            self._timed(super().executemany, sql, seq_of_parameters)
+            self._rows = max(self.rowcount, 0)
+        finally:
+            self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        self._rows += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except sqlite3.Error:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose statements and commits are recorded in ``query_log``."""
+
+    query_log: Optional[QueryLog] = None
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.steps = 0
+        # Counts VM instructions, i.e. CPU work, as opposed to waiting on I/O or locks
+        self.set_progress_handler(self._progress, PROGRESS_STEP)
+
+    def _progress(self) -> int:
+        self.steps += PROGRESS_STEP
+        return 0
+
+    def cursor(self, factory: type = TracedCursor):
+        return super().cursor(factory)
+
+    # The built-in shortcuts would create untraced cursors
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        if not self.in_transaction or self.query_log is None:
+            super().commit()
+            return
+        # The fsync cost of a commit shows up as its own statement
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.query_log.record(self, "COMMIT", (), time.perf_counter() - started, 0, 0)
+
+
+_log: Optional[QueryLog] = None
+_log_lock = threading.Lock()
+
+
+def get_query_log(default_path: Path) -> Optional[QueryLog]:
+    """Process-wide log, or None unless REGISTRY_SLOW_QUERY_MS is set."""
+    global _log
+    threshold = threshold_ms()
+    if threshold is None:
+        return None
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                path = os.environ.get("REGISTRY_QUERY_LOG")
+                _log = QueryLog(threshold, Path(path) if path else default_path)
+    return _log
+
+
+def current() -> Optional[QueryLog]:
+    return _log
+
+
+def reset() -> None:
+    """Drop the process-wide log (the database it traced was closed)."""
+    global _log
+    with _log_lock:
+        if _log is not None:
+            _log.close()
+        _log = None
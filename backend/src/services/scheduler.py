@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+from backend.src.services.archive import compact_database, previous_month, run_monthly_archive
+from backend.src.services.db import begin_immediate, get_pool
+from backend.src.services.sealed import seal_month
+
+logger = logging.getLogger(__name__)
+
+# How often the loop wakes up to re-check schedules (clock changes, new jobs)
+MAX_SLEEP = 60.0
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Fields take ``*``, numbers, ``a-b`` ranges, ``,`` lists and ``/n`` steps;
+    day-of-week is 0-6 with 0 = Sunday. As in cron, when both day fields are
+    restricted a day matching either one is due.
+    """
+
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        sets = [self._parse(p, lo, hi) for p, (lo, hi) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = sets
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> FrozenSet[int]:
+        values = set()
+        for part in field.split(","):
+            rng, _, step = part.partition("/")
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                start, end = (int(x) for x in rng.split("-", 1))
+            else:
+                start = end = int(rng)
+                if step:
+                    end = hi
+            if not (lo <= start <= end <= hi):
+                raise ValueError(f"cron field {field!r} out of range {lo}-{hi}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return frozenset(values)
+
+    def _day_matches(self, d: date) -> bool:
+        in_month = d.day in self.days
+        in_week = (d.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = datetime(
+                            day.year, day.month, day.day, hour, minute, tzinfo=moment.tzinfo
+                        )
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"cron expression never matches: {self.expr!r}")
+
+
+def _archive_job(conn: sqlite3.Connection) -> str:
+    # Finish interrupted runs first, then last month if it still has rows
+    months = [r[0] for r in conn.execute("SELECT month FROM archive_progress ORDER BY month")]
+    previous = previous_month()
+    pending = conn.execute(
+        "SELECT 1 FROM registrations WHERE deletedFlag IN (0, 1) AND entryMonth = ? LIMIT 1",
+        (previous,),
+    ).fetchone()
+    if pending and previous not in months:
+        months.append(previous)
+    if not months:
+        return "nothing to archive"
+    moved, sealed = [], []
+    for month in months:
+        result = run_monthly_archive(conn, month)
+        moved.append(f"{result.month}: {result.itemsMoved}")
+        # Finished months are rewritten into the compressed read-only format
+        seal = seal_month(conn, result.month)
+        if seal is not None:
+            sealed.append(f"{seal.month}: {seal.sourceBytes} -> {seal.sealedBytes} bytes")
+    compacted = compact_database(conn)
+    detail = f"moved {', '.join(moved)}; freed {compacted.freedPages} pages"
+    if sealed:
+        detail += f"; sealed {', '.join(sealed)}"
+    return detail
+
+
+def _checkpoint_job(conn: sqlite3.Connection) -> str:
+    # PASSIVE never waits for readers or writers
+    busy, log, done = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    return f"checkpointed {done}/{log} WAL frames" + (" (busy)" if busy else "")
+
+
+def _optimize_job(conn: sqlite3.Connection) -> str:
+    conn.execute("PRAGMA optimize").fetchall()
+    return "ok"
+
+
+def _analyze_job(conn: sqlite3.Connection) -> str:
+    conn.execute("ANALYZE")
+    conn.commit()
+    return "ok"
+
+
+# One lock per job name, shared by the scheduler, manual runs and the admin
+# endpoints that do a job's work, so a job never overlaps itself in a process
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def job_lock(name: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    run: Callable[[sqlite3.Connection], str]
+    next_run: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return job_lock(self.name).locked()
+
+
+# name -> (default schedule, task); override with REGISTRY_JOB_<NAME>, "off" disables
+DEFAULT_JOBS: Dict[str, tuple] = {
+    "archive": ("30 2 1 * *", _archive_job),       # 02:30 on the 1st
+    "checkpoint": ("*/15 * * * *", _checkpoint_job),
+    "optimize": ("0 3 * * *", _optimize_job),
+    "analyze": ("0 4 * * 0", _analyze_job),        # Sundays
+}
+
+
+def configured_jobs() -> List[Job]:
+    jobs = []
+    for name, (default, task) in DEFAULT_JOBS.items():
+        expr = os.environ.get(f"REGISTRY_JOB_{name.upper()}", default).strip()
+        if expr.lower() == "off":
+            continue
+        jobs.append(Job(name=name, schedule=CronSchedule(expr), run=task))
+    return jobs
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def run_job(job: Job, slot: Optional[datetime] = None) -> bool:
+    """Run ``job`` on a pooled connection and record it in ``job_runs``.
+
+    ``slot`` is the scheduled time being served. Every server process runs
+    the same schedule; the first to record a run at or after the slot runs
+    it and the others skip it. Returns False, without waiting, when the job
+    is already running in this process or the slot was served.
+    """
+    lock = job_lock(job.name)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        return _run_locked(job, slot)
+    finally:
+        lock.release()
+
+
+def _run_locked(job: Job, slot: Optional[datetime]) -> bool:
+    with get_pool().connection() as conn:
+        started = time.perf_counter()
+        begin_immediate(conn)
+        if slot is not None and conn.execute(
+            "SELECT 1 FROM job_runs WHERE job = ? AND startedAt >= ? LIMIT 1",
+            (job.name, slot.astimezone(timezone.utc).isoformat(timespec="seconds")),
+        ).fetchone():
+            conn.rollback()
+            return False
+        run_id = conn.execute(
+            "INSERT INTO job_runs (job, startedAt, status) VALUES (?, ?, 'running')",
+            (job.name, _now_iso()),
+        ).lastrowid
+        conn.commit()
+        try:
+            detail, status = job.run(conn), "ok"
+        except Exception as exc:  # recorded, and the schedule carries on
+            logger.exception("maintenance job %s failed", job.name)
+            if conn.in_transaction:
+                conn.rollback()
+            detail, status = f"{type(exc).__name__}: {exc}", "error"
+        conn.execute(
+            "UPDATE job_runs SET finishedAt = ?, durationMs = ?, status = ?, detail = ? WHERE id = ?",
+            (_now_iso(), round((time.perf_counter() - started) * 1000, 1), status, detail, run_id),
+        )
+        conn.commit()
+    return True
+
+
+class JobScheduler:
+    """Runs maintenance jobs on their cron schedules from the event loop.
+
+    The loop only sleeps and dispatches; every job runs in a worker thread
+    (``asyncio.to_thread``), one at a time, so requests are never blocked
+    by maintenance work.
+    """
+
+    def __init__(self, jobs: List[Job]):
+        self.jobs = {job.name: job for job in jobs}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        now = datetime.now()
+        for job in self.jobs.values():
+            job.next_run = job.schedule.next_after(now)
+        self._task = asyncio.create_task(self._loop(), name="maintenance-scheduler")
+
+    async def _loop(self) -> None:
+        while True:
+            now = datetime.now()
+            for job in self.jobs.values():
+                if job.next_run is not None and job.next_run <= now:
+                    if job.running:
+                        # Started by hand and not done yet: that run serves this slot
+                        logger.info("maintenance job %s is already running; skipping its slot", job.name)
+                    else:
+                        try:
+                            await asyncio.to_thread(run_job, job, job.next_run)
+                        except Exception:
+                            # e.g. no database connection; try again at the next slot
+                            logger.exception("could not run maintenance job %s", job.name)
+                    job.next_run = job.schedule.next_after(datetime.now())
+            upcoming = min((j.next_run for j in self.jobs.values() if j.next_run), default=None)
+            delay = MAX_SLEEP if upcoming is None else (upcoming - datetime.now()).total_seconds()
+            await asyncio.sleep(min(max(delay, 0.0), MAX_SLEEP))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def get_scheduler() -> Optional[JobScheduler]:
+    return _scheduler
+
+
+def start() -> None:
+    """Start the scheduler on the running loop unless REGISTRY_SCHEDULER=0."""
+    global _scheduler
+    if os.environ.get("REGISTRY_SCHEDULER", "1") == "0":
+        return
+    _scheduler = JobScheduler(configured_jobs())
+    _scheduler.start()
+
+
+async def shutdown() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
+
+
+def job_status(conn: sqlite3.Connection) -> List[dict]:
+    """Configured jobs with their schedule and most recent run."""
+    scheduler = _scheduler
+    jobs = list(scheduler.jobs.values()) if scheduler else configured_jobs()
+    result = []
+    for job in jobs:
+        last = conn.execute(
+            "SELECT startedAt, finishedAt, durationMs, status, detail FROM job_runs "
+            "WHERE job = ? ORDER BY id DESC LIMIT 1",
+            (job.name,),
+        ).fetchone()
+        result.append({
+            "name": job.name,
+            "schedule": job.schedule.expr,
+            "nextRun": job.next_run.isoformat(timespec="minutes") if job.next_run else None,
+            "running": job.running,
+            "lastRun": dict(last) if last else None,
+        })
+    return result
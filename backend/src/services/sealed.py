@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import sqlite3
+import stat
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from backend.src.services.archive import REGISTRATION_COLUMNS, archive_dir
+from backend.src.services.db import begin_immediate
+
+# A sealed month is two files next to the archive DBs:
+#   <month>.sealed.idx         JSON index: data file name, block offsets, id/protocol
+#                              ranges, checksums and catalogue stats
+#   <month>.<digest>.sealed    zlib-compressed blocks of NDJSON rows (JSON arrays
+#                              in column order)
+# Blocks are compressed independently, so a reader maps the file and inflates
+# only the blocks a query reaches. The data file name carries its digest and
+# the index is replaced in one rename, so readers always see a matching pair.
+SEALED_SUFFIX = ".sealed"
+INDEX_SUFFIX = ".sealed.idx"
+FORMAT_VERSION = 1
+BLOCK_ROWS = 1000
+COMPRESS_LEVEL = 6
+# One seal at a time per process: seals of a month share their temporary files
+_seal_lock = threading.Lock()
+
+COLUMNS: Dict[str, Sequence[str]] = {
+    "registrations": [c.strip() for c in REGISTRATION_COLUMNS.split(",")],
+    "audit_events": ["id", "action", "registrationId", "timestamp", "username"],
+}
+_PROTOCOL = COLUMNS["registrations"].index("protocolNumber")
+_CATEGORY = COLUMNS["registrations"].index("category")
+_ENTRY_DATE = COLUMNS["registrations"].index("entryDate")
+_DELETED = COLUMNS["registrations"].index("deletedFlag")
+
+
+class SealedArchiveError(Exception):
+    """A sealed archive is missing, unreadable or fails its checksums."""
+
+
+@dataclass
+class SealResult:
+    month: str
+    rows: int
+    auditRows: int
+    sourceBytes: int
+    sealedBytes: int
+    sha256: str
+
+
+def index_path_for(month: str, directory: Optional[Path] = None) -> Path:
+    return (directory or archive_dir()) / f"{month}{INDEX_SUFFIX}"
+
+
+def _line(row: Sequence[Any]) -> bytes:
+    return json.dumps(list(row), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class SealedArchive:
+    """Read access to a sealed month (opened by its index) through a read-only memory map."""
+
+    def __init__(self, index_path: Path):
+        index_path = Path(index_path)
+        try:
+            self.index = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise SealedArchiveError(f"{index_path.name}: {exc}")
+        if self.index.get("format") != FORMAT_VERSION:
+            raise SealedArchiveError(f"{index_path.name}: unsupported format {self.index.get('format')!r}")
+        self.path = index_path.with_name(self.index["data"])
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as exc:
+            raise SealedArchiveError(f"{index_path.name}: {exc}")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "SealedArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def blocks(self, table: str = "registrations") -> List[Dict[str, Any]]:
+        return self.index["tables"][table]["blocks"]
+
+    def read_block(self, block: Dict[str, Any]) -> List[list]:
+        data = self._map[block["offset"]: block["offset"] + block["length"]]
+        if zlib.crc32(data) != block["crc32"]:
+            raise SealedArchiveError(f"{self.path.name}: block at {block['offset']} fails its checksum")
+        return [json.loads(line) for line in zlib.decompress(data).split(b"\n")]
+
+    def rows(
+        self,
+        table: str = "registrations",
+        *,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+        block_filter=None,
+    ) -> Iterator[list]:
+        """Rows in id order, inflating one block at a time.
+
+        ``block_filter(block)`` may return False to skip blocks by their
+        index entry (id range, and protocol ranges per category).
+        """
+        blocks = self.blocks(table)
+        for block in reversed(blocks) if descending else blocks:
+            if after_id is not None:
+                if descending and block["firstId"] >= after_id:
+                    continue
+                if not descending and block["lastId"] <= after_id:
+                    continue
+            if block_filter is not None and not block_filter(block):
+                continue
+            rows = self.read_block(block)
+            for row in reversed(rows) if descending else rows:
+                if after_id is None or (row[0] < after_id if descending else row[0] > after_id):
+                    yield row
+
+
+class _Catalog:
+    """Per (month, category) figures that refresh_catalog reads from archive DBs."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[tuple, Dict[str, Any]] = {}
+
+    def add(self, r: Sequence[Any]) -> None:
+        key = (r[_ENTRY_DATE][:7], r[_CATEGORY])
+        s = self.stats.get(key)
+        if s is None:
+            s = self.stats[key] = {
+                "entryMonth": key[0], "category": key[1], "liveCount": 0,
+                "minId": r[0], "maxId": r[0], "minProtocol": r[_PROTOCOL], "maxProtocol": r[_PROTOCOL],
+                "minEntryDate": r[_ENTRY_DATE], "maxEntryDate": r[_ENTRY_DATE],
+            }
+        s["liveCount"] += r[_DELETED] == 0
+        s["minId"], s["maxId"] = min(s["minId"], r[0]), max(s["maxId"], r[0])
+        s["minProtocol"] = min(s["minProtocol"], r[_PROTOCOL])
+        s["maxProtocol"] = max(s["maxProtocol"], r[_PROTOCOL])
+        s["minEntryDate"] = min(s["minEntryDate"], r[_ENTRY_DATE])
+        s["maxEntryDate"] = max(s["maxEntryDate"], r[_ENTRY_DATE])
+
+
+def _write_table(out, rows: Iterable[Sequence[Any]], file_digest, content_digest, table: str,
+                 catalog: Optional[_Catalog] = None) -> Dict[str, Any]:
+    blocks: List[Dict[str, Any]] = []
+    batch: List[Sequence[Any]] = []
+    total = 0
+
+    def flush() -> None:
+        payload = b"\n".join(_line(r) for r in batch)
+        content_digest.update(payload + b"\n")
+        data = zlib.compress(payload, COMPRESS_LEVEL)
+        block = {
+            "offset": out.tell(),
+            "length": len(data),
+            "rows": len(batch),
+            "firstId": batch[0][0],
+            "lastId": batch[-1][0],
+            "crc32": zlib.crc32(data),
+        }
+        if table == "registrations":
+            # Each category numbers on its own, so ranges are kept per category
+            protocols: Dict[str, List[int]] = {}
+            for r in batch:
+                lo_hi = protocols.setdefault(r[_CATEGORY], [r[_PROTOCOL], r[_PROTOCOL]])
+                lo_hi[0], lo_hi[1] = min(lo_hi[0], r[_PROTOCOL]), max(lo_hi[1], r[_PROTOCOL])
+            block["protocols"] = protocols
+        out.write(data)
+        file_digest.update(data)
+        blocks.append(block)
+        batch.clear()
+
+    for row in rows:
+        if catalog is not None:
+            catalog.add(row)
+        batch.append(row)
+        total += 1
+        if len(batch) >= BLOCK_ROWS:
+            flush()
+    if batch:
+        flush()
+    return {"columns": list(COLUMNS[table]), "rows": total, "blocks": blocks}
+
+
+def _merged_source(month: str, directory: Path, table: str) -> Iterator[list]:
+    """Rows of ``table`` from the month's archive DB and any earlier seal, by id."""
+    sources: List[Iterable[list]] = []
+    db_path = directory / f"{month}.db"
+    index_path = index_path_for(month, directory)
+    opened = []
+    try:
+        if index_path.exists():
+            sealed = SealedArchive(index_path)
+            opened.append(sealed)
+            sources.append(sealed.rows(table))
+        if db_path.exists():
+            conn = sqlite3.connect(db_path.as_uri() + "?mode=ro", uri=True)
+            opened.append(conn)
+            cols = ", ".join(COLUMNS[table])
+            sources.append(list(r) for r in conn.execute(f"SELECT {cols} FROM {table} ORDER BY id"))
+        previous = None
+        for row in heapq.merge(*sources, key=lambda r: r[0]):
+            # The same id in both (an interrupted seal): the archive DB is newer
+            if previous is not None and previous[0] != row[0]:
+                yield previous
+            previous = row
+        if previous is not None:
+            yield previous
+    finally:
+        for handle in opened:
+            handle.close()
+
+
+def _file_sha256(archive: SealedArchive) -> str:
+    h = hashlib.sha256()
+    view = memoryview(archive._map)
+    try:
+        for start in range(0, len(view), 1 << 20):
+            h.update(view[start:start + (1 << 20)])
+    finally:
+        view.release()
+    return h.hexdigest()
+
+
+def verify_sealed(index_path: Path) -> int:
+    """Check the file digest, every block checksum and the content hash; returns the row count."""
+    with SealedArchive(index_path) as archive:
+        if _file_sha256(archive) != archive.index["sha256"]:
+            raise SealedArchiveError(f"{archive.path.name}: file digest mismatch")
+        content = hashlib.sha256()
+        total = 0
+        for table in COLUMNS:
+            for row in archive.rows(table):
+                content.update(_line(row) + b"\n")
+                total += 1
+        if content.hexdigest() != archive.index["contentSha256"]:
+            raise SealedArchiveError(f"{archive.path.name}: content hash mismatch")
+        return total
+
+
+def seal_month(conn: sqlite3.Connection, month: str, directory: Optional[Path] = None) -> Optional[SealResult]:
+    """Rewrite an archived month into the sealed format and drop its archive DB.
+
+    Rows already sealed for the month are merged with any newer archive DB
+    (late, backdated entries archived after an earlier seal). The new files
+    are written next to the old ones, read back and compared row for row
+    (checksums and content hash) before they replace them. The archive DB is
+    removed only if no archive run claimed the month meanwhile and the file
+    is unchanged since it was read; otherwise it stays for the next seal.
+    Returns None if the month has no archived rows or is still being archived.
+    """
+    with _seal_lock:
+        return _seal_month(conn, month, directory or archive_dir())
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _seal_month(conn: sqlite3.Connection, month: str, directory: Path) -> Optional[SealResult]:
+    from backend.src.services.federation import catalog_entries, store_catalog  # imports this module
+
+    if conn.execute("SELECT 1 FROM archive_progress WHERE month = ?", (month,)).fetchone():
+        return None
+    db_path = directory / f"{month}.db"
+    # An archive run may start while we read: the file is removed at the end
+    # only if it is still as read and no run holds the month
+    db_signature = _file_signature(db_path)
+    index_path = index_path_for(month, directory)
+    old_data = None
+    if index_path.exists():
+        old_data = index_path.with_name(json.loads(index_path.read_text(encoding="utf-8"))["data"])
+    source_bytes = sum(p.stat().st_size for p in (db_path, index_path, old_data) if p and p.exists())
+
+    tmp_data = directory / f"{month}.tmp{SEALED_SUFFIX}"
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    file_digest, content_digest, catalog = hashlib.sha256(), hashlib.sha256(), _Catalog()
+    with open(tmp_data, "wb") as out:
+        index_tables = {
+            table: _write_table(
+                out, _merged_source(month, directory, table), file_digest, content_digest, table,
+                catalog if table == "registrations" else None,
+            )
+            for table in COLUMNS
+        }
+        out.flush()
+        os.fsync(out.fileno())
+    if not index_tables["registrations"]["rows"]:
+        tmp_data.unlink()
+        return None
+    data_path = directory / f"{month}.{file_digest.hexdigest()[:12]}{SEALED_SUFFIX}"
+    os.replace(tmp_data, data_path)
+    index = {
+        "format": FORMAT_VERSION,
+        "month": month,
+        "data": data_path.name,
+        "sealedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sha256": file_digest.hexdigest(),
+        "contentSha256": content_digest.hexdigest(),
+        "tables": index_tables,
+        "catalog": list(catalog.stats.values()),
+    }
+    tmp_index.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+
+    # Read the new files back through the normal reader before trusting them
+    try:
+        verify_sealed(tmp_index)
+    except Exception:
+        tmp_index.unlink(missing_ok=True)
+        if data_path != old_data:
+            data_path.unlink(missing_ok=True)
+        raise
+
+    if index_path.exists():
+        os.chmod(index_path, stat.S_IREAD | stat.S_IWRITE)
+    os.replace(tmp_index, index_path)  # the switch-over
+    for path in (data_path, index_path):
+        os.chmod(path, stat.S_IREAD)
+    sealed_bytes = data_path.stat().st_size + index_path.stat().st_size
+
+    # The catalogue moves to the seal, and the archive DB goes, under the
+    # write lock that an archive run needs to claim the month. The DB is
+    # moved aside rather than deleted until the commit: if that fails, it is
+    # put back, and the catalogue still matches the files.
+    entries = catalog_entries(index_path)
+    removed_db = db_path.with_name(db_path.name + ".removed")
+    drop_db = False
+    begin_immediate(conn)
+    try:
+        drop_db = db_signature is not None and _file_signature(db_path) == db_signature and not conn.execute(
+            "SELECT 1 FROM archive_progress WHERE month = ?", (month,)
+        ).fetchone()
+        if drop_db:
+            try:
+                if db_path.exists():
+                    os.chmod(db_path, stat.S_IREAD | stat.S_IWRITE)
+                os.replace(db_path, removed_db)
+            except OSError:
+                # Still open elsewhere (Windows): it stays for the next seal
+                drop_db = False
+        store_catalog(conn, index_path.name, entries)
+        # A DB changed meanwhile keeps only the rows the seal did not take
+        store_catalog(conn, db_path.name, [] if drop_db or not db_path.exists() else catalog_entries(db_path))
+        conn.execute(
+            """
+            INSERT INTO archive_seals (month, rows, auditRows, sourceBytes, sealedBytes, sha256, sealedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (month) DO UPDATE SET
+                rows = excluded.rows, auditRows = excluded.auditRows, sourceBytes = excluded.sourceBytes,
+                sealedBytes = excluded.sealedBytes, sha256 = excluded.sha256, sealedAt = excluded.sealedAt
+            """,
+            (month, index_tables["registrations"]["rows"], index_tables["audit_events"]["rows"], source_bytes,
+             sealed_bytes, index["sha256"], index["sealedAt"]),
+        )
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        if drop_db and removed_db.exists():
+            os.replace(removed_db, db_path)
+        raise
+    # Readers skip ids they already saw, so leftovers (e.g. still open
+    # elsewhere on Windows) only cost time until the next seal removes them.
+    # A changed archive DB stays for the next seal to merge.
+    for stale in (removed_db, old_data):
+        if stale is not None and stale != data_path:
+            try:
+                if stale.exists():
+                    os.chmod(stale, stat.S_IREAD | stat.S_IWRITE)
+                    stale.unlink()
+            except OSError:
+                pass
+    return SealResult(
+        month=month,
+        rows=index_tables["registrations"]["rows"],
+        auditRows=index_tables["audit_events"]["rows"],
+        sourceBytes=source_bytes,
+        sealedBytes=sealed_bytes,
+        sha256=index["sha256"],
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns indexed for full-text search, in FTS column order
+SEARCH_COLUMNS = ("issuer", "subject", "referenceNumber", "recipient")
+
+# unicode61 folds Greek case and final sigma but keeps the tonos/dialytika of
+# precomposed letters, so those are stripped before text reaches the index.
+# The same mapping runs in SQL (the index triggers, see services/migrations.py)
+# and Python (queries).
+GREEK_ACCENTS = {
+    "ά": "α", "έ": "ε", "ή": "η", "ί": "ι", "ό": "ο", "ύ": "υ", "ώ": "ω",
+    "ϊ": "ι", "ϋ": "υ", "ΐ": "ι", "ΰ": "υ",
+    "Ά": "Α", "Έ": "Ε", "Ή": "Η", "Ί": "Ι", "Ό": "Ο", "Ύ": "Υ", "Ώ": "Ω",
+    "Ϊ": "Ι", "Ϋ": "Υ",
+}
+_ACCENT_TABLE = str.maketrans(GREEK_ACCENTS)
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Hits ranked together per window (see search_registrations)
+SEARCH_WINDOW = 2000
+
+
+def normalize_text(text: str) -> str:
+    return text.translate(_ACCENT_TABLE)
+
+
+def search_terms(q: str) -> List[str]:
+    return _TERM_RE.findall(normalize_text(q))
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every term must match as a prefix."""
+    terms = search_terms(q)
+    if not terms:
+        return None
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def _month_id_bounds(conn: sqlite3.Connection, month: str) -> Tuple[Optional[int], Optional[int]]:
+    # Cheap via ix_registrations_month; lets FTS5 skip doclist entries outside the month
+    row = conn.execute(
+        "SELECT MIN(id), MAX(id) FROM registrations WHERE deletedFlag = 0 AND entryMonth = ?",
+        (month,),
+    ).fetchone()
+    return row[0], row[1]
+
+
+def search_registrations(
+    conn: sqlite3.Connection,
+    match: str,
+    *,
+    category: Optional[str] = None,
+    month: Optional[str] = None,
+    office: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[sqlite3.Row], Optional[Dict[str, Any]]]:
+    """Return up to ``limit`` matches and the position to resume from (or None).
+
+    bm25 has to score every hit, which is too slow for common words on a large
+    register, so hits are ranked in windows of SEARCH_WINDOW, newest first:
+    the best match of the latest window comes first and paging continues into
+    older windows. A window is an id range, which FTS5 applies natively.
+    """
+    base = """
+        FROM registrations_fts f
+        JOIN registrations r ON r.id = f.rowid
+        WHERE registrations_fts MATCH ? AND r.deletedFlag = 0
+    """
+    base_params: List[Any] = [match]
+    if category:
+        base += " AND r.category = ?"
+        base_params.append(category)
+    if month:
+        base += " AND r.entryMonth = ?"
+        base_params.append(month)
+        floor, ceiling = _month_id_bounds(conn, month)
+        if floor is None:
+            return [], None
+        base += " AND f.rowid BETWEEN ? AND ?"
+        base_params += [floor, ceiling]
+    if office:
+        base += (
+            " AND EXISTS (SELECT 1 FROM registration_offices o"
+            " WHERE o.registrationId = r.id AND o.office = ?)"
+        )
+        base_params.append(office)
+
+    found: List[Tuple[sqlite3.Row, Dict[str, Any]]] = []
+    pos: Dict[str, Any] = dict(after) if after else {"hi": None}
+    while True:
+        hi = pos.get("hi")
+        bounded = base + (" AND f.rowid < ?" if hi is not None else "")
+        params = base_params + ([hi] if hi is not None else [])
+        if pos.get("lo") is None:
+            lo, hits = conn.execute(
+                f"SELECT MIN(id), COUNT(*) FROM (SELECT f.rowid AS id {bounded} "
+                "ORDER BY f.rowid DESC LIMIT ?)",
+                params + [SEARCH_WINDOW],
+            ).fetchone()
+            if lo is None:
+                break
+            pos = {"hi": hi, "lo": lo, "full": hits >= SEARCH_WINDOW}
+        window = {"hi": hi, "lo": pos["lo"], "full": pos["full"]}
+        sql = f"""
+            SELECT r.*, f.rank AS rank,
+                   snippet(registrations_fts, -1, '[', ']', '…', 12) AS snippet
+            {bounded} AND f.rowid >= ?
+        """
+        params = params + [window["lo"]]
+        if "id" in pos:
+            sql += " AND (f.rank, r.id) > (?, ?)"
+            params += [pos["rank"], pos["id"]]
+        sql += " ORDER BY f.rank, r.id LIMIT ?"
+        params.append(limit + 1 - len(found))
+        found += [(row, window) for row in conn.execute(sql, params)]
+        if len(found) > limit or not window["full"]:
+            break
+        # Window exhausted: continue with the next older one
+        pos = {"hi": window["lo"]}
+
+    if len(found) <= limit:
+        return [row for row, _ in found], None
+    last, window = found[limit - 1]
+    return [row for row, _ in found[:limit]], dict(window, rank=last["rank"], id=last["id"])
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+from backend.src.services import cache as response_cache
+from backend.src.services import feed
+from backend.src.services.db import connect, resolve_db_path
+
+logger = logging.getLogger(__name__)
+
+# Several server processes (cli/run.py --workers, which sets REGISTRY_WORKERS)
+# share one database file. Numbering is safe as it is: every allocation is a
+# single upsert under BEGIN IMMEDIATE, and SQLite's write lock serialises
+# those across processes just as across threads. What each process keeps in
+# memory is not shared, though: its response cache and the live feed only
+# hear about its own writes. The watcher below notices commits made by any
+# other connection and makes both catch up.
+SYNC_INTERVAL = 0.25
+
+
+def worker_count() -> int:
+    return max(1, int(os.environ.get("REGISTRY_WORKERS", "1")))
+
+
+class ChangeWatcher:
+    """Polls ``PRAGMA data_version`` and reacts when the database changed.
+
+    The value changes whenever another connection commits, this process's
+    own writer included, so the cache is dropped whole (a cached body is
+    then at most one interval stale) and open streams re-read from the
+    database what they have not sent yet.
+    """
+
+    def __init__(self, interval: float = SYNC_INTERVAL):
+        self.interval = interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self) -> bool:
+        """True when another connection committed since the last check."""
+        if self._conn is None:
+            self._conn = connect(resolve_db_path(), check_same_thread=False)
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._version is not None and version != self._version
+        self._version = version
+        return changed
+
+    def start(self) -> None:
+        self.check()
+        self._task = asyncio.create_task(self._loop(), name="change-watcher")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = self.check()
+            except sqlite3.Error:
+                logger.exception("could not read the database version")
+                continue
+            if changed:
+                response_cache.clear()
+                feed.publish(feed.Change("changed", None))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_watcher: Optional[ChangeWatcher] = None
+
+
+def start() -> None:
+    """Watch for other processes' writes when running with several workers."""
+    global _watcher
+    if worker_count() < 2:
+        return
+    _watcher = ChangeWatcher()
+    _watcher.start()
+
+
+async def shutdown() -> None:
+    global _watcher
+    if _watcher is not None:
+        await _watcher.stop()
+        _watcher = None
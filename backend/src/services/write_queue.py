@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.src.services import audit, metrics
+
+# REGISTRY_DURABILITY -> PRAGMA synchronous for the writer connection.
+# full: every group commit is fsynced before requests get their answer;
+# normal: durable across application crashes, the last commits may be lost
+# on power failure (WAL default); off: leave syncing to the OS.
+DURABILITY = {"full": "FULL", "normal": "NORMAL", "off": "OFF"}
+# Longest the writer waits for more requests before committing a group
+COMMIT_WINDOW_MS = 2.0
+MAX_GROUP = 256
+
+
+@dataclass
+class _Operation:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: Dict[str, Any]
+    future: Future = field(default_factory=Future)
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """A single writer thread that commits concurrent writes together (group commit).
+
+    Operations are callables taking the writer's connection. The thread
+    takes the first waiting operation, collects whatever else is queued
+    (waiting up to the commit window while writers are busy), and runs them
+    in order inside one transaction, each under its own savepoint: an operation that raises is
+    rolled back on its own and only its caller sees the error. Audit events
+    the operations record are appended together at the end of the group.
+    One COMMIT (one WAL sync) then covers the whole group. Operations must
+    not commit or roll back themselves.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        *,
+        durability: str = "normal",
+        window_ms: float = COMMIT_WINDOW_MS,
+        max_group: int = MAX_GROUP,
+    ):
+        if durability not in DURABILITY:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY)}: {durability!r}")
+        self.durability = durability
+        self.window = window_ms / 1000
+        self.max_group = max_group
+        self._connect = connect
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._stats = {"transactions": 0, "operations": 0, "failed": 0}
+        self._closed = False
+        self._last_group = 1
+        self._thread = threading.Thread(target=self._drain, name="db-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, connect: Callable[[], sqlite3.Connection]) -> "WriteQueue":
+        return cls(
+            connect,
+            durability=os.environ.get("REGISTRY_DURABILITY", "normal").strip().lower(),
+            window_ms=float(os.environ.get("REGISTRY_COMMIT_WINDOW_MS", COMMIT_WINDOW_MS)),
+        )
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self._closed:
+            raise RuntimeError("write queue is closed")
+        op = _Operation(fn, args, kwargs)
+        self._queue.put(op)
+        return op.future
+
+    def _collect(self, first: _Operation) -> tuple:
+        # Take everything already waiting. Only when the previous group showed
+        # concurrent writers is it worth waiting (up to the window) for about
+        # as many again; a lone writer is never delayed.
+        group: List[_Operation] = [first]
+        target = min(self._last_group, self.max_group)
+        deadline = time.monotonic() + self.window
+        while len(group) < self.max_group:
+            remaining = deadline - time.monotonic()
+            try:
+                if len(group) < target and remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        self._last_group = len(group)
+        return group, False
+
+    def _drain(self) -> None:
+        conn = self._connect()
+        conn.execute(f"PRAGMA synchronous={DURABILITY[self.durability]}")
+        try:
+            stopping = False
+            while not stopping:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                group, stopping = self._collect(first)
+                self._commit_group(conn, group)
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn: sqlite3.Connection, group: List[_Operation]) -> None:
+        # Callers that gave up (cancelled) before their turn are skipped
+        group = [op for op in group if op.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        outcomes: List[tuple] = []
+        try:
+            with metrics.lock_wait("write_queue"):
+                conn.execute("BEGIN IMMEDIATE")
+            with audit.buffered() as events:
+                for op in group:
+                    conn.execute("SAVEPOINT op")
+                    mark = events.mark()
+                    try:
+                        value = op.fn(conn, *op.args, **op.kwargs)
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO op")
+                        events.discard(mark)
+                        outcomes.append((op, None, exc))
+                    else:
+                        outcomes.append((op, value, None))
+                    conn.execute("RELEASE op")
+                events.flush(conn)
+            conn.commit()
+        except Exception as exc:
+            # BEGIN, the audit append or COMMIT failed (e.g. busy past busy_timeout):
+            # nothing was written
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(op, None, exc) for op in group]
+        failed = sum(1 for _, _, exc in outcomes if exc is not None)
+        self._stats["transactions"] += 1
+        self._stats["operations"] += len(outcomes)
+        self._stats["failed"] += failed
+        for op, value, exc in outcomes:
+            if exc is None:
+                op.future.set_result(value)
+            else:
+                op.future.set_exception(exc)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["durability"] = self.durability
+        stats["meanGroup"] = round(stats["operations"] / stats["transactions"], 2) if stats["transactions"] else 0
+        return stats
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        # Operations queued before close still run
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
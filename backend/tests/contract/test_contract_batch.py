@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, get_connection, init_db
+
+
+def _item(i, **extra):
+    body = {"issuer": f"Issuer {i}", "referenceNumber": f"B-{i}", "subject": "Backfill",
+            "recipient": "Citizen", "entryDate": "2024-02-0%d" % (i % 9 + 1)}
+    body.update(extra)
+    return body
+
+
+def test_batch_assigns_contiguous_numbers_in_one_transaction(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    with TestClient(app) as client:
+        res = client.post("/registrations/common_outgoing/batch", json={"items": [_item(i) for i in range(5)]})
+        assert res.status_code == HTTPStatus.CREATED
+        body = res.json()
+        assert body["created"] == 5 and body["errors"] == []
+        assert [it["protocolNumber"] for it in body["items"]] == list(range(40001, 40006))
+        assert [it["draftNumber"] for it in body["items"]] == [1, 2, 3, 4, 5]
+
+        # Numbering continues after the batch for single inserts
+        single = client.post("/registrations/common_outgoing", json=_item(9)).json()
+        assert single["protocolNumber"] == 40006 and single["draftNumber"] == 6
+
+        conn = get_connection()
+        ids = [it["id"] for it in body["items"]]
+        audited = [r[0] for r in conn.execute(
+            "SELECT registrationId FROM audit_events WHERE action = 'create' ORDER BY id")]
+        assert audited[:5] == ids
+        stored = conn.execute(
+            "SELECT protocolNumber FROM registrations WHERE id = ?", (ids[2],)).fetchone()[0]
+        assert stored == 40003
+        conn.close()
+    close_pool()
+
+
+def test_batch_atomic_rejects_and_best_effort_reports_per_item(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    with TestClient(app) as client:
+        items = [_item(0), _item(1, recipient=None), _item(2, subject="x" * 300), _item(3)]
+        res = client.post("/registrations/common_outgoing/batch", json={"items": items})
+        assert res.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert [e["index"] for e in res.json()["detail"]["errors"]] == [1, 2]
+
+        res = client.post("/registrations/common_outgoing/batch", json={"items": items, "mode": "best_effort"})
+        assert res.status_code == HTTPStatus.CREATED
+        body = res.json()
+        assert [it["index"] for it in body["items"]] == [0, 3]
+        # Nothing was consumed by the rejected atomic attempt
+        assert [it["protocolNumber"] for it in body["items"]] == [40001, 40002]
+        assert [e["index"] for e in body["errors"]] == [1, 2]
+    close_pool()
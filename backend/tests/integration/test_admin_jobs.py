@@ -0,0 +1,98 @@
+import json
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+from backend.src.services.scheduler import job_lock
+
+
+def test_jobs_listing_and_manual_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_JOB_ANALYZE", "off")
+    monkeypatch.setenv("REGISTRY_JOB_CHECKPOINT", "*/5 * * * *")
+    init_db()
+    with TestClient(app) as client:
+        jobs = {j["name"]: j for j in client.get("/admin/jobs").json()}
+        assert set(jobs) == {"archive", "checkpoint", "optimize"}
+        assert jobs["checkpoint"]["schedule"] == "*/5 * * * *"
+        assert jobs["checkpoint"]["nextRun"] and jobs["checkpoint"]["lastRun"] is None
+
+        res = client.post("/admin/jobs/archive/run")
+        assert res.status_code == HTTPStatus.OK
+        last = res.json()["lastRun"]
+        assert last["status"] == "ok" and last["detail"] == "nothing to archive"
+        assert last["durationMs"] >= 0
+
+        assert client.post("/admin/jobs/checkpoint/run").json()["lastRun"]["status"] == "ok"
+        with job_lock("archive"):
+            # Already running (scheduled or by hand): neither way starts a second run
+            assert client.post("/admin/jobs/archive/run").status_code == HTTPStatus.CONFLICT
+            assert client.post("/admin/archive/run").status_code == HTTPStatus.CONFLICT
+        assert client.post("/admin/jobs/analyze/run").status_code == HTTPStatus.NOT_FOUND
+    close_pool()
+
+
+def test_seal_archived_month(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        for subject in ("Πρώτη αίτηση", "Δεύτερη αίτηση"):
+            res = client.post(
+                "/registrations/common_incoming",
+                json={"issuer": "Δήμος", "referenceNumber": "R", "subject": subject,
+                      "offices": ["OFF-1"], "entryDate": "2024-02-10"},
+            )
+            assert res.status_code == HTTPStatus.CREATED
+        assert client.post("/admin/archive/run", params={"month": "2024-02"}).json()["itemsMoved"] == 2
+
+        res = client.post("/admin/archive/2024-02/seal")
+        assert res.status_code == HTTPStatus.OK
+        body = res.json()
+        assert (body["month"], body["rows"], body["auditRows"]) == ("2024-02", 2, 2)
+        assert body["sealedBytes"] < body["sourceBytes"]
+
+        res = client.get("/registrations/export", params={"month": "2024-02", "format": "ndjson"})
+        assert [json.loads(line)["subject"] for line in res.text.splitlines()] == ["Πρώτη αίτηση", "Δεύτερη αίτηση"]
+        assert client.post("/admin/archive/2024-05/seal").status_code == HTTPStatus.NOT_FOUND
+    close_pool()
+
+
+def test_slow_query_log_and_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    monkeypatch.setenv("REGISTRY_SLOW_QUERY_MS", "0")  # log every statement
+    init_db()
+    with TestClient(app) as client:
+        res = client.post(
+            "/registrations/common_incoming",
+            json={"issuer": "Δήμος", "referenceNumber": "R", "subject": "Απόρρητο θέμα",
+                  "offices": ["OFF-1"], "entryDate": "2024-03-05"},
+        )
+        assert res.status_code == HTTPStatus.CREATED
+        assert client.get("/registrations", params={"month": "2024-03"}).json()["total"] == 1
+
+        stats = client.get("/admin/queries", params={"limit": 500}).json()
+        by_sql = {s["sql"]: s for s in stats["statements"]}
+        listing = next(s for sql, s in by_sql.items() if sql.startswith("SELECT * FROM registrations"))
+        assert listing["calls"] == 1 and listing["rows"] == 1
+        assert by_sql["COMMIT"]["calls"] >= 1
+
+        entries = [json.loads(line) for line in (tmp_path / "logs" / "slow-queries.log").read_text().splitlines()]
+        listed = next(e for e in entries if e["sql"] == listing["sql"])
+        assert any("USING INDEX" in line for line in listed["plan"])
+        # Bound values never reach the log
+        assert all("Απόρρητο" not in json.dumps(e, ensure_ascii=False) for e in entries)
+
+        profile = client.post("/admin/profile", params={"seconds": 0.2, "includeIdle": True}).json()
+        assert profile["samples"] > 0 and profile["top"]
+        folded = client.post("/admin/profile", params={"seconds": 0.1, "includeIdle": True, "format": "collapsed"})
+        assert folded.headers["content-type"].startswith("text/plain") and folded.text.strip()
+    close_pool()
+    # Without the setting there is nothing to report
+    monkeypatch.delenv("REGISTRY_SLOW_QUERY_MS")
+    with TestClient(app) as client:
+        assert client.get("/admin/queries").status_code == HTTPStatus.NOT_FOUND
+    close_pool()
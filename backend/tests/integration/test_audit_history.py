@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+
+
+def _create(client, day):
+    res = client.post(
+        "/registrations/common_incoming",
+        json={"issuer": "Δήμος", "referenceNumber": "R", "subject": "Αίτηση", "offices": ["OFF-1"],
+              "entryDate": day},
+    )
+    assert res.status_code == HTTPStatus.CREATED
+    return res.json()["id"]
+
+
+def test_history_follows_a_registration_into_the_archive(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    monkeypatch.setenv("USERNAME", "maria")
+    init_db()
+    with TestClient(app) as client:
+        reg_id = _create(client, "2024-03-05")
+        kept = _create(client, "2024-04-01")
+        monkeypatch.setenv("USERNAME", "nikos")
+        assert client.delete(f"/registrations/{reg_id}").status_code == HTTPStatus.NO_CONTENT
+
+        history = client.get(f"/registrations/{reg_id}/history").json()
+        assert history["source"] == "main"
+        events = [(e["action"], e["username"]) for e in history["events"]]
+        assert events == [("create", "maria"), ("delete", "nikos")]
+        assert client.get("/registrations/999/history").status_code == HTTPStatus.NOT_FOUND
+
+        assert client.post("/admin/archive/run", params={"month": "2024-03"}).status_code == HTTPStatus.OK
+        archived = client.get(f"/registrations/{reg_id}/history").json()
+        assert archived["source"] == "2024-03" and archived["events"] == history["events"]
+        assert client.post("/admin/archive/2024-03/seal").status_code == HTTPStatus.OK
+        assert client.get(f"/registrations/{reg_id}/history").json()["events"] == history["events"]
+        assert client.get(f"/registrations/{kept}/history").json()["source"] == "main"
+    close_pool()
+
+
+def test_audit_listing_filters_and_pages(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        ids = []
+        for user in ("maria", "nikos", "maria", "maria"):
+            monkeypatch.setenv("USERNAME", user)
+            ids.append(_create(client, "2024-05-02"))
+
+        res = client.get("/audit", params={"user": "maria", "pageSize": 2})
+        body = res.json()
+        assert [e["registrationId"] for e in body["items"]] == [ids[3], ids[2]]
+        res = client.get("/audit", params={"user": "maria", "pageSize": 2, "after": body["nextCursor"]})
+        assert [e["registrationId"] for e in res.json()["items"]] == [ids[0]]
+        assert res.json()["nextCursor"] is None
+
+        # Events are stamped with the time they were recorded
+        assert len(client.get("/audit", params={"from": "2000-01-01"}).json()["items"]) == 4
+        assert client.get("/audit", params={"to": "2000-01-01"}).json()["items"] == []
+        assert client.get("/audit", params={"from": "2024-02-01", "to": "2024-01-01"}).status_code == 400
+        assert client.get("/audit", params={"after": "garbage"}).status_code == 400
+    close_pool()
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+import sqlite3
+import zipfile
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.archive import archive_dir, upgrade_archive
+from backend.src.services.db import close_pool, init_db
+
+
+def _write_archive(month, rows):
+    arch_dir = archive_dir()
+    arch_dir.mkdir(parents=True, exist_ok=True)
+    upgrade_archive(arch_dir / f"{month}.db")
+    conn = sqlite3.connect(arch_dir / f"{month}.db")
+    conn.executemany("INSERT INTO registrations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_export_streams_month_from_main_and_archive(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    _write_archive("2024-02", [
+        (900, "common_incoming", "Αρχείο", "R-900", "Παλιά αίτηση", None, "OFF-1", 39999, None,
+         "2024-02-01", "2024-02-01T09:00:00", 0, None),
+        (901, "common_incoming", "Αρχείο", "R-901", "Διαγραμμένη", None, "OFF-1", 40000, None,
+         "2024-02-01", "2024-02-01T09:00:00", 1, "2024-02-02T09:00:00"),
+    ])
+    with TestClient(app) as client:
+        for day, subject in (("2024-02-10", "Πρώτη, με κόμμα"), ("2024-02-11", "Δεύτερη"),
+                             ("2024-03-01", "Άλλος μήνας")):
+            res = client.post(
+                "/registrations/common_incoming",
+                json={"issuer": "Δήμος", "referenceNumber": "R", "subject": subject,
+                      "offices": ["OFF-1", "OFF-2"], "entryDate": day},
+            )
+            assert res.status_code == HTTPStatus.CREATED
+
+        res = client.get("/registrations/export", params={"month": "2024-02"})
+        assert res.status_code == HTTPStatus.OK
+        assert res.headers["content-type"].startswith("text/csv")
+        assert 'filename="register-2024-02.csv"' in res.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert [r["id"] for r in rows] == ["1", "2", "900"]
+        assert rows[0]["subject"] == "Πρώτη, με κόμμα"
+
+        res = client.get("/registrations/export",
+                         params={"month": "2024-02", "category": "common_incoming", "format": "ndjson"})
+        records = [json.loads(line) for line in res.text.splitlines()]
+        assert [r["id"] for r in records] == [1, 2, 900]
+        assert records[0]["offices"] == ["OFF-1", "OFF-2"] and records[0]["deletedFlag"] is False
+
+        res = client.get("/registrations/export", params={"month": "2024-02", "format": "xlsx"})
+        with zipfile.ZipFile(io.BytesIO(res.content)) as zf:
+            assert zf.testzip() is None
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        assert sheet.count("<row>") == 4  # header + 3 rows
+        assert "Παλιά αίτηση" in sheet and "Διαγραμμένη" not in sheet
+
+        empty = client.get("/registrations/export", params={"month": "2024-05", "format": "ndjson"})
+        assert empty.status_code == HTTPStatus.OK and empty.content == b""
+        bad = client.get("/registrations/export", params={"month": "2024-02", "format": "pdf"})
+        assert bad.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    close_pool()
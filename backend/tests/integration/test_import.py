@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+
+
+def test_upload_xlsx_register_keeping_historical_numbers(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    with TestClient(app) as client:
+        for i in range(3):
+            res = client.post(
+                "/registrations/common_outgoing",
+                json={"issuer": "Γραμματεία", "referenceNumber": f"Φ.{i}", "subject": f"Θέμα {i}",
+                      "recipient": "Δήμος", "entryDate": "2024-02-0%d" % (i + 1)},
+            )
+            assert res.status_code == HTTPStatus.CREATED
+        # An exported month is a valid import file
+        workbook = client.get("/registrations/export", params={"month": "2024-02", "format": "xlsx"}).content
+
+        url = "/registrations/confidential_outgoing/import"
+        params = {"format": "xlsx", "keepNumbers": "true", "fileName": "feb.xlsx"}
+        res = client.post(url, params=params, content=workbook)
+        assert res.status_code == HTTPStatus.OK
+        body = res.json()
+        assert (body["inserted"], body["rejected"], body["fileName"]) == (3, 0, "feb.xlsx")
+
+        items = client.get("/registrations", params={"month": "2024-02", "category": "confidential_outgoing"}).json()["items"]
+        assert [(i["protocolNumber"], i["draftNumber"]) for i in items] == [(40001, 1), (40002, 2), (40003, 3)]
+        nxt = client.post(
+            "/registrations/confidential_outgoing",
+            json={"issuer": "Γ", "referenceNumber": "Ν", "subject": "Νέο", "recipient": "Δ", "entryDate": "2024-03-01"},
+        ).json()
+        assert (nxt["protocolNumber"], nxt["draftNumber"]) == (40004, 4)
+
+        assert client.post(url, params=params, content=workbook).json()["alreadyImported"] is True
+        bad = client.post(url, params=params, content=b"not a workbook")
+        assert bad.status_code == HTTPStatus.BAD_REQUEST
+    close_pool()
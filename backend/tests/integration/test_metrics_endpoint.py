@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services import metrics
+from backend.src.services.db import close_pool, init_db
+
+
+def _value(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_cover_routes_db_operations_and_pools(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        before = client.get("/metrics").text
+        created = client.post(
+            "/registrations/common_outgoing",
+            json={"issuer": "Δήμος", "referenceNumber": "R", "subject": "Αίτηση", "recipient": "Υπουργείο",
+                  "offices": ["OFF-1"], "entryDate": "2024-03-05"},
+        )
+        assert created.status_code == HTTPStatus.CREATED
+        client.get(f"/registrations/{created.json()['id']}/missing")
+        assert client.get("/registrations", params={"month": "2024-03"}).status_code == HTTPStatus.OK
+
+        res = client.get("/metrics")
+        assert res.status_code == HTTPStatus.OK
+        assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = res.text
+
+        # Route templates, not raw paths, label the latency histogram
+        create = 'registry_http_request_duration_seconds_count{method="POST",route="/registrations/{category}",status="201"}'
+        assert _value(text, create) == _value(before, create) + 1
+        assert 'route="unmatched",status="404"' in text
+        assert "/registrations/1/missing" not in text
+
+        for op in ("numbering", "insert", "audit", "list"):
+            key = f'registry_db_operation_duration_seconds_count{{op="{op}"}}'
+            assert _value(text, key) > _value(before, key)
+        drafts = 'registry_numbering_allocations_total{type="draft"}'
+        assert _value(text, drafts) == _value(before, drafts) + 1
+        assert 'registry_db_lock_wait_seconds_count{source="write_queue"}' in text
+        assert 'registry_db_queued_operations{kind="read"}' in text
+        assert 'registry_db_write_operations_total{outcome="ok"}' in text
+        assert 'registry_response_cache_lookups_total{result="miss"}' in text
+
+        metrics.set_enabled(False)
+        try:
+            assert client.get("/metrics").status_code == HTTPStatus.NOT_FOUND
+        finally:
+            metrics.set_enabled(True)
+    close_pool()
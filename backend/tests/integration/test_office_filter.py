@@ -0,0 +1,110 @@
+import csv
+import io
+import sqlite3
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.archive import archive_dir, upgrade_archive
+from backend.src.services.db import close_pool, init_db
+
+
+def _create(client, category, offices, day, subject="Αίτηση"):
+    res = client.post(
+        f"/registrations/{category}",
+        json={"issuer": "Δήμος", "referenceNumber": "R", "subject": subject, "offices": offices,
+              "entryDate": day},
+    )
+    assert res.status_code == HTTPStatus.CREATED
+    return res.json()["id"]
+
+
+def test_listing_search_and_export_by_office(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    arch_dir = archive_dir()
+    arch_dir.mkdir(parents=True, exist_ok=True)
+    upgrade_archive(arch_dir / "2024-04.db")
+    arch = sqlite3.connect(arch_dir / "2024-04.db")
+    arch.executemany("INSERT INTO registrations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (900, "common_incoming", "Αρχείο", "R-900", "Παλιά αίτηση", None, "OFF-2,OFF-12", 39999, None,
+         "2024-04-01", "2024-04-01T09:00:00", 0, None),
+        (901, "common_incoming", "Αρχείο", "R-901", "Άλλη αίτηση", None, "OFF-12", 40000, None,
+         "2024-04-01", "2024-04-01T09:00:00", 0, None),
+    ])
+    arch.commit()
+    arch.close()
+
+    with TestClient(app) as client:
+        both = _create(client, "common_incoming", ["OFF-1", "OFF-2"], "2024-04-10")
+        second = _create(client, "common_incoming", ["OFF-2"], "2024-04-11", "Πρόσκληση")
+        other = _create(client, "signals_incoming", ["OFF-2"], "2024-04-12")
+        _create(client, "common_incoming", ["OFF-1"], "2024-04-13")
+        _create(client, "common_incoming", ["OFF-2"], "2024-05-01")
+
+        res = client.get("/registrations", params={"month": "2024-04", "office": "OFF-2", "pageSize": 2})
+        body = res.json()
+        assert [i["id"] for i in body["items"]] == [both, second] and body["total"] == 3
+        res = client.get("/registrations", params={"month": "2024-04", "office": "OFF-2", "pageSize": 2,
+                                                   "after": body["nextCursor"]})
+        assert [i["id"] for i in res.json()["items"]] == [other]
+        res = client.get("/registrations", params={"month": "2024-04", "office": "OFF-2",
+                                                   "category": "common_incoming"})
+        assert [i["id"] for i in res.json()["items"]] == [both, second]
+        assert res.json()["items"][0]["offices"] == ["OFF-1", "OFF-2"]
+
+        # Cached per office; a delete drops the page
+        params = {"month": "2024-04", "office": "OFF-1"}
+        assert client.get("/registrations", params=params).json()["total"] == 2
+        assert client.delete(f"/registrations/{both}").status_code == HTTPStatus.NO_CONTENT
+        assert client.get("/registrations", params=params).json()["total"] == 1
+
+        # Archive files are matched on whole codes of the comma-joined column
+        res = client.get("/registrations", params={"month": "2024-04", "office": "OFF-2",
+                                                   "includeArchive": True})
+        assert [i["id"] for i in res.json()["items"]] == [second, other, 900]
+        assert res.json()["total"] == 3
+
+        search = {"q": "αιτηση", "office": "OFF-2", "month": "2024-04"}
+        res = client.get("/registrations/search", params=search)
+        assert [i["id"] for i in res.json()["items"]] == [other]
+        # Federated results come newest (highest id) first
+        res = client.get("/registrations/search", params=dict(search, includeArchive=True))
+        assert [i["id"] for i in res.json()["items"]] == [900, other]
+
+        res = client.get("/registrations/export", params={"month": "2024-04", "office": "OFF-12"})
+        assert 'filename="register-2024-04-OFF-12.csv"' in res.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert [r["id"] for r in rows] == ["900", "901"]
+        res = client.get("/registrations/export", params={"month": "2024-04", "office": "OFF-2"})
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert [r["id"] for r in rows] == [str(second), str(other), "900"]
+    close_pool()
+
+
+def test_meta_offices_come_from_the_offices_table(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        res = client.get("/meta/offices")
+        assert res.json() == [{"code": "OFF-1", "label": "Office 1"}, {"code": "OFF-2", "label": "Office 2"}]
+        etag = res.headers["etag"]
+        res = client.get("/meta/offices", headers={"If-None-Match": etag})
+        assert res.status_code == HTTPStatus.NOT_MODIFIED
+
+        res = client.put("/admin/offices/OFF-3", json={"label": "Γραφείο 3"})
+        assert res.status_code == HTTPStatus.OK
+        res = client.put("/admin/offices/OFF-1", json={"label": "Office 1", "active": False})
+        assert res.status_code == HTTPStatus.OK
+        assert client.put("/admin/offices/A,B", json={"label": "x"}).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        res = client.get("/meta/offices", headers={"If-None-Match": etag})
+        assert res.status_code == HTTPStatus.OK
+        assert res.json() == [
+            {"code": "OFF-2", "label": "Office 2"}, {"code": "OFF-3", "label": "Γραφείο 3"},
+        ]
+        assert len(client.get("/admin/offices").json()) == 3
+    close_pool()
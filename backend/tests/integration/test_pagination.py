@@ -0,0 +1,50 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+
+
+def test_keyset_pages_cover_month_with_maintained_total(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    with TestClient(app) as client:
+        ids = []
+        for i in range(7):
+            res = client.post(
+                "/registrations/common_incoming",
+                json={
+                    "issuer": f"Issuer {i}",
+                    "referenceNumber": f"R-{i}",
+                    "subject": "Paging",
+                    "offices": ["OFF-1"],
+                    "entryDate": "2024-03-0%d" % (i + 1),
+                },
+            )
+            assert res.status_code == HTTPStatus.CREATED
+            ids.append(res.json()["id"])
+        client.post(
+            "/registrations/signals_incoming",
+            json={"issuer": "X", "referenceNumber": "R-X", "subject": "Other", "offices": ["OFF-2"],
+                  "entryDate": "2024-03-10"},
+        )
+        assert client.delete(f"/registrations/{ids[0]}").status_code == HTTPStatus.NO_CONTENT
+
+        seen, after = [], None
+        while True:
+            params = {"month": "2024-03", "category": "common_incoming", "pageSize": 4}
+            if after:
+                params["after"] = after
+            body = client.get("/registrations", params=params).json()
+            assert body["total"] == 6
+            seen += [item["id"] for item in body["items"]]
+            after = body["nextCursor"]
+            if after is None:
+                break
+        assert seen == ids[1:]
+
+        assert client.get("/registrations", params={"month": "2024-03"}).json()["total"] == 7
+        bad = client.get("/registrations", params={"month": "2024-03", "after": "%%%"})
+        assert bad.status_code == HTTPStatus.BAD_REQUEST
+    close_pool()
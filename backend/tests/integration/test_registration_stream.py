@@ -0,0 +1,116 @@
+import asyncio
+import json
+import sqlite3
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.api.registrations import (
+    _event_stream,
+    create_registration,
+    delete_registration,
+)
+from backend.src.app import app
+from backend.src.models.registration import RegistrationCreate
+from backend.src.services.db import close_pool, init_db, resolve_db_path
+
+
+def _payload(subject):
+    return RegistrationCreate(issuer="Δήμος", referenceNumber="R", subject=subject, offices=["OFF-1"],
+                              entryDate="2024-05-02")
+
+
+def _parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields.get("event"), fields.get("id"), json.loads(fields.get("data", "null"))
+
+
+async def _next(stream):
+    return _parse(await asyncio.wait_for(stream.__anext__(), 5))
+
+
+def test_stream_sends_deltas_and_replays_from_last_event_id(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+
+    async def scenario():
+        stream = _event_stream(["common_incoming"], None)
+        assert (await stream.__anext__()).startswith("retry:")
+        # Subscribed: writes from now on arrive as they commit
+        first = await create_registration(category="common_incoming", payload=_payload("πρώτη"))
+        await create_registration(category="common_outgoing",
+                                  payload=_payload("άλλη").model_copy(update={"recipient": "Υπουργείο"}))
+        second = await create_registration(category="common_incoming", payload=_payload("δεύτερη"))
+        assert await _next(stream) == ("created", str(first["id"]), first)
+        kind, event_id, data = await _next(stream)
+        assert (kind, event_id, data["subject"]) == ("created", str(second["id"]), "δεύτερη")
+        await delete_registration(id_=first["id"])
+        assert await _next(stream) == (
+            "deleted", None, {"id": first["id"], "category": "common_incoming", "month": "2024-05"}
+        )
+        await stream.aclose()
+
+        # A client that saw `first` reconnects: it missed `second` and the deletion
+        third = await create_registration(category="common_incoming", payload=_payload("τρίτη"))
+        resumed = _event_stream(["common_incoming"], first["id"])
+        await resumed.__anext__()
+        assert (await _next(resumed))[::2] == ("deleted", {"id": first["id"], "category": "common_incoming",
+                                                           "month": "2024-05"})
+        replayed = [await _next(resumed) for _ in range(2)]
+        assert [(k, i, d["id"]) for k, i, d in replayed] == [
+            ("created", str(second["id"]), second["id"]), ("created", str(third["id"]), third["id"]),
+        ]
+        await resumed.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        close_pool()
+
+
+def test_stream_with_several_workers_does_not_skip_another_workers_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    monkeypatch.setenv("REGISTRY_WORKERS", "2")
+    init_db()
+    # Stands in for a second worker process writing to the same file
+    other = sqlite3.connect(resolve_db_path())
+
+    async def scenario():
+        first = await create_registration(category="common_incoming", payload=_payload("πρώτη"))
+        # Opened at the newest row, so the stream starts live (no replay)
+        stream = _event_stream(["common_incoming"], None)
+        await stream.__anext__()
+        # The other worker commits a row; this process has not heard of it
+        # when its own, later row is announced
+        other.execute(
+            "INSERT INTO registrations (category, issuer, referenceNumber, subject, offices, protocolNumber, "
+            "entryDate, createdAt) VALUES ('common_incoming', 'Δήμος', 'R', 'άλλη', 'OFF-1', 99, '2024-05-02', 't')"
+        )
+        other.commit()
+        mine = await create_registration(category="common_incoming", payload=_payload("δική μου"))
+        received = [await _next(stream) for _ in range(2)]
+        assert [(k, i, d["subject"]) for k, i, d in received] == [
+            ("created", str(first["id"] + 1), "άλλη"), ("created", str(mine["id"]), "δική μου"),
+        ]
+        # Next in line: sent as it comes
+        last = await create_registration(category="common_incoming", payload=_payload("τελευταία"))
+        assert await _next(stream) == ("created", str(last["id"]), last)
+        await stream.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        other.close()
+        close_pool()
+
+
+def test_stream_rejects_a_malformed_last_event_id(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        res = client.get("/registrations/stream", headers={"Last-Event-ID": "abc"})
+        assert res.status_code == HTTPStatus.BAD_REQUEST
+    close_pool()
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+
+
+def _create(client, category, day):
+    res = client.post(
+        f"/registrations/{category}",
+        json={"issuer": "Δήμος", "referenceNumber": "R", "subject": "Αίτηση", "offices": ["OFF-1"],
+              "entryDate": day},
+    )
+    assert res.status_code == HTTPStatus.CREATED
+    return res.json()["id"]
+
+
+def test_listing_cache_revalidates_and_follows_writes(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setenv("REGISTRY_SCHEDULER", "0")
+    init_db()
+    with TestClient(app) as client:
+        first = _create(client, "common_incoming", "2024-03-05")
+        _create(client, "signals_incoming", "2024-03-06")
+        params = {"month": "2024-03", "category": "common_incoming"}
+
+        res = client.get("/registrations", params=params)
+        assert res.headers["x-cache"] == "miss" and res.json()["total"] == 1
+        etag = res.headers["etag"]
+        res = client.get("/registrations", params=params, headers={"If-None-Match": etag})
+        assert res.status_code == HTTPStatus.NOT_MODIFIED and res.headers["x-cache"] == "hit"
+        assert res.content == b""
+
+        # A write to another category leaves this page cached
+        _create(client, "signals_incoming", "2024-03-07")
+        assert client.get("/registrations", params=params).headers["x-cache"] == "hit"
+        # A write to this month and category invalidates it
+        _create(client, "common_incoming", "2024-03-08")
+        res = client.get("/registrations", params=params, headers={"If-None-Match": etag})
+        assert res.status_code == HTTPStatus.OK and res.json()["total"] == 2
+        assert res.headers["etag"] != etag
+
+        assert client.delete(f"/registrations/{first}").status_code == HTTPStatus.NO_CONTENT
+        assert client.get("/registrations", params=params).json()["total"] == 1
+        month_wide = client.get("/registrations", params={"month": "2024-03"})
+        assert month_wide.json()["total"] == 3
+
+        # Archiving the month empties its listings
+        assert client.post("/admin/archive/run", params={"month": "2024-03"}).status_code == HTTPStatus.OK
+        assert client.get("/registrations", params={"month": "2024-03"}).json()["items"] == []
+
+        res = client.get("/meta/offices")
+        res = client.get("/meta/offices", headers={"If-None-Match": res.headers["etag"]})
+        assert res.status_code == HTTPStatus.NOT_MODIFIED
+
+        stats = client.get("/admin/cache").json()
+        assert stats["hits"] >= 3 and stats["misses"] >= 4 and stats["notModified"] == 2
+    close_pool()
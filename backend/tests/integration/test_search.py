@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from backend.src.app import app
+from backend.src.services.db import close_pool, init_db
+
+
+def _create(client, category, subject, issuer="Δήμος Αθηναίων", entry_date="2024-05-02", **extra):
+    body = {"issuer": issuer, "referenceNumber": "Φ.100/1", "subject": subject, "entryDate": entry_date}
+    body.update(extra)
+    if category.endswith("incoming"):
+        body.setdefault("offices", ["OFF-1"])
+    res = client.post(f"/registrations/{category}", json=body)
+    assert res.status_code == HTTPStatus.CREATED
+    return res.json()["id"]
+
+
+def test_search_is_accent_and_case_insensitive_with_filters_and_paging(tmp_path, monkeypatch):
+    monkeypatch.setenv("REGISTRY_DB_PATH", str(tmp_path / "test.db"))
+    init_db()
+    with TestClient(app) as client:
+        first = _create(client, "common_incoming", "Αίτηση χορήγησης άδειας")
+        second = _create(client, "common_incoming", "ΑΙΤΗΣΗ ΑΝΑΝΕΩΣΗΣ", entry_date="2024-06-01")
+        other = _create(client, "common_outgoing", "Αίτηση προς υπουργείο", recipient="Υπουργείο")
+        deleted = _create(client, "common_incoming", "Αίτηση που διαγράφηκε")
+        _create(client, "signals_incoming", "Σήμα", issuer="Άλλος")
+        client.delete(f"/registrations/{deleted}")
+
+        res = client.get("/registrations/search", params={"q": "αιτηση"})
+        assert res.status_code == HTTPStatus.OK
+        ids = [item["id"] for item in res.json()["items"]]
+        assert sorted(ids) == sorted([first, second, other])
+        assert "[" in res.json()["items"][0]["snippet"]
+
+        # Prefix terms, all required
+        res = client.get("/registrations/search", params={"q": "αιτ αδει"})
+        assert [item["id"] for item in res.json()["items"]] == [first]
+
+        res = client.get("/registrations/search", params={"q": "Αίτηση", "category": "common_incoming", "month": "2024-06"})
+        assert [item["id"] for item in res.json()["items"]] == [second]
+
+        seen, after = [], None
+        while True:
+            params = {"q": "αιτηση", "pageSize": 1}
+            if after:
+                params["after"] = after
+            body = client.get("/registrations/search", params=params).json()
+            seen += [item["id"] for item in body["items"]]
+            after = body["nextCursor"]
+            if not after:
+                break
+        assert seen == ids
+
+        assert client.get("/registrations/search", params={"q": "!!"}).status_code == HTTPStatus.BAD_REQUEST
+    close_pool()
@@ -3,6 +3,8 @@ import sqlite3
 import tempfile
 from datetime import date, datetime, timedelta, timezone
 
+from backend.benchmarks.synthetic import bulk_insert, generate_registrations
+from backend.src.services import archive
 from backend.src.services.db import get_connection, init_db, resolve_db_path
 from backend.src.services.archive import run_monthly_archive
 
@@ -78,3 +80,61 @@ def test_run_monthly_archive_moves_previous_month_records():
         ).fetchone()[0] == 1
 
         conn.close()
+
+
+def test_chunked_archive_resumes_after_interruption(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        bulk_insert(conn, generate_registrations(600, start=date(2024, 1, 1), days=60))
+        conn.execute(
+            "INSERT INTO audit_events (action, registrationId, timestamp, username) "
+            "SELECT 'create', id, createdAt, 'tester' FROM registrations"
+        )
+        conn.commit()
+        january = conn.execute(
+            "SELECT COUNT(*) FROM registrations WHERE entryMonth = '2024-01'"
+        ).fetchone()[0]
+        live = "SELECT COUNT(*) FROM registrations WHERE entryMonth = '2024-01' AND deletedFlag = 0"
+        january_live = conn.execute(live).fetchone()[0]
+        catalogued = "SELECT COALESCE(SUM(liveCount), 0) FROM archive_catalog"
+
+        real_delete = archive._delete_chunk
+        calls = []
+
+        def crash_on_third_chunk(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise RuntimeError("power cut")
+            return real_delete(*args)
+
+        monkeypatch.setattr(archive, "_delete_chunk", crash_on_third_chunk)
+        try:
+            archive.run_monthly_archive(conn, "2024-01", chunk_size=100, pause=0)
+        except RuntimeError:
+            pass
+        monkeypatch.setattr(archive, "_delete_chunk", real_delete)
+        left = conn.execute("SELECT COUNT(*) FROM registrations WHERE entryMonth = '2024-01'").fetchone()[0]
+        assert 0 < left < january
+        # The catalogue follows the committed chunks, not the one copied before the crash
+        assert conn.execute(catalogued).fetchone()[0] == january_live - conn.execute(live).fetchone()[0]
+
+        result = archive.run_monthly_archive(conn, "2024-01", chunk_size=100, pause=0)
+        assert result.resumed and result.itemsMoved == january
+        assert conn.execute("SELECT COUNT(*) FROM registrations WHERE entryMonth = '2024-01'").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM archive_progress").fetchone()[0] == 0
+        assert conn.execute(catalogued).fetchone()[0] == january_live
+        assert conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 600 - january
+
+        arch = sqlite3.connect(resolve_db_path().parent / "archive" / "2024-01.db")
+        try:
+            assert arch.execute("SELECT COUNT(*) FROM registrations").fetchone()[0] == january
+            assert arch.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == january
+        finally:
+            arch.close()
+
+        compacted = archive.compact_database(conn)
+        assert compacted.incremental and compacted.walCheckpointed
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        conn.close()
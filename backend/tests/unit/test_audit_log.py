@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from backend.src.services import audit
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.write_queue import WriteQueue
+
+
+def _register(conn, subject):
+    cur = conn.execute(
+        """
+        INSERT INTO registrations (category, issuer, referenceNumber, subject, protocolNumber,
+                                   entryDate, createdAt, deletedFlag)
+        VALUES ('common_incoming', 'Δήμος', 'R', ?, 1, '2025-01-10', '2025-01-10T09:00:00', 0)
+        """,
+        (subject,),
+    )
+    audit.record(conn, "create", cur.lastrowid, "2025-01-10T09:00:00", "tester")
+    if subject == "bad":
+        raise ValueError("rejected")
+    return cur.lastrowid
+
+
+def test_group_appends_audit_events_of_its_surviving_operations():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        writes = WriteQueue(get_connection, window_ms=0)
+        started, release = threading.Event(), threading.Event()
+        blocker = writes.submit(lambda conn: started.set() or release.wait(5))
+        assert started.wait(5)
+        futures = [writes.submit(_register, "bad" if i == 2 else f"Αίτηση {i}") for i in range(5)]
+        release.set()
+        blocker.result(5)
+        ids = [f.result(5) for i, f in enumerate(futures) if i != 2]
+        with pytest.raises(ValueError):
+            futures[2].result(5)
+        writes.close()
+
+        conn = get_connection()
+        logged = [r[0] for r in conn.execute("SELECT registrationId FROM audit_events ORDER BY id")]
+        assert logged == ids
+        conn.close()
+
+
+def test_audit_log_is_append_only():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        reg_id = _register(conn, "Αίτηση")
+        with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+            conn.execute("UPDATE audit_events SET username = 'someone else'")
+        with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+            conn.execute("DELETE FROM audit_events")
+        # Once the registration is gone (archived), its events may follow
+        conn.execute("DELETE FROM registrations WHERE id = ?", (reg_id,))
+        conn.execute("DELETE FROM audit_events WHERE registrationId = ?", (reg_id,))
+        conn.close()
+
+
+def test_list_events_pages_newest_first_through_the_indexes():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        audit.record_many(conn, [
+            ("create" if i % 3 else "delete", i, f"2025-01-{1 + i // 4:02d}T09:00:{i:02d}+00:00",
+             "maria" if i % 2 else "nikos")
+            for i in range(40)
+        ])
+        seen, position = [], None
+        while True:
+            page, position = audit.list_events(conn, start=date(2025, 1, 3), end=date(2025, 1, 6),
+                                               username="maria", limit=3, after=position)
+            seen += page
+            if position is None:
+                break
+        assert [e["registrationId"] for e in seen] == [23, 21, 19, 17, 15, 13, 11, 9]
+        assert {e["username"] for e in seen} == {"maria"}
+        events, _ = audit.list_events(conn, action="delete", limit=100)
+        assert len(events) == 14
+
+        for sql, index in (
+            ("SELECT id FROM audit_events WHERE timestamp >= ? AND (timestamp, id) < (?, ?) "
+             "ORDER BY timestamp DESC, id DESC LIMIT 10", "ix_audit_events_time"),
+            ("SELECT id FROM audit_events WHERE username = ? AND timestamp < ? "
+             "ORDER BY timestamp DESC, id DESC LIMIT 10", "ix_audit_events_user"),
+            ("SELECT id FROM audit_events WHERE registrationId = ? ORDER BY id",
+             "ix_audit_events_registration"),
+        ):
+            params = ["x"] * sql.count("?")
+            plan = " | ".join(r["detail"] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            assert index in plan and "TEMP B-TREE" not in plan, plan
+        conn.close()
+
+
+@pytest.fixture
+def athens_time(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Athens")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_list_events_days_are_local_days(athens_time):
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        # UTC timestamps around midnight in Athens (UTC+2 in early March)
+        audit.record_many(conn, [
+            ("create", 1, "2025-03-04T21:59:59+00:00", "maria"),  # 4 March, 23:59:59
+            ("create", 2, "2025-03-04T22:00:00+00:00", "maria"),  # 5 March, 00:00
+            ("create", 3, "2025-03-05T01:30:00+00:00", "maria"),  # 5 March, 03:30
+            ("create", 4, "2025-03-05T21:59:59+00:00", "maria"),  # 5 March, 23:59:59
+            ("create", 5, "2025-03-05T22:00:00+00:00", "maria"),  # 6 March, 00:00
+        ])
+        events, _ = audit.list_events(conn, start=date(2025, 3, 5), end=date(2025, 3, 5))
+        assert [e["registrationId"] for e in events] == [4, 3, 2]
+        events, _ = audit.list_events(conn, end=date(2025, 3, 4))
+        assert [e["registrationId"] for e in events] == [1]
+        conn.close()
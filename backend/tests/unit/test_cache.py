@@ -0,0 +1,56 @@
+import time
+
+from backend.src.services.cache import ResponseCache, etag_matches
+
+
+def test_lru_ttl_and_precise_invalidation():
+    cache = ResponseCache(max_entries=3, ttl=60)
+    for key, tag in (("a", ("2025-01", "common_incoming")), ("b", ("2025-01", None)),
+                     ("c", ("2025-01", "signals_incoming"))):
+        cache.put(key, key.encode(), tag, cache.version(tag))
+    assert cache.get("a").body == b"a"  # a is now the most recent
+    cache.put("d", b"d", ("2025-02", None), cache.version(("2025-02", None)))
+    assert cache.get("b") is None  # least recently used went first
+    assert cache.stats()["evictions"] == 1
+
+    # A category change drops that category and the month-wide entries only
+    cache = ResponseCache(max_entries=8, ttl=60)
+    for key, tag in (("a", ("2025-01", "common_incoming")), ("b", ("2025-01", None)),
+                     ("c", ("2025-01", "signals_incoming")), ("d", ("2025-02", None))):
+        cache.put(key, key.encode(), tag, cache.version(tag))
+    cache.invalidate("2025-01", "common_incoming")
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None and cache.get("d") is not None
+    # The archiver drops the whole month
+    cache.invalidate("2025-02")
+    assert cache.get("d") is None and cache.get("c") is not None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (3, 3, 2)
+
+    short = ResponseCache(ttl=0.01)
+    short.put("x", b"x", None, short.version(None))
+    time.sleep(0.02)
+    assert short.get("x") is None
+
+
+def test_body_rendered_across_a_write_is_not_stored():
+    cache = ResponseCache()
+    tag = ("2025-01", "common_incoming")
+    version = cache.version(tag)
+    cache.invalidate("2025-01", "common_incoming")  # a create commits mid-render
+    entry = cache.put("page", b"old", tag, version)
+    assert entry.etag and cache.get("page") is None
+
+    version = cache.version(tag)
+    cache.clear()
+    cache.put("page", b"old", tag, version)
+    assert cache.get("page") is None
+
+
+def test_if_none_match_parsing():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc", "def"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"def"', etag) and not etag_matches(None, etag)
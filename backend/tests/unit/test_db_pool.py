@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+from backend.src.services.db import ConnectionPool, DBExecutor, init_db, resolve_db_path
+
+
+def test_pool_reuses_configured_connections():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        pool = ConnectionPool(resolve_db_path(), max_size=2)
+        with pool.connection() as c1:
+            assert c1.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert c1.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+            assert c1.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with pool.connection() as c2:
+            assert c2 is c1
+        assert pool.stats()["size"] == 1
+        pool.close()
+
+
+def test_pool_rolls_back_dangling_transaction_and_bounds_size():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        pool = ConnectionPool(resolve_db_path(), max_size=2)
+        with pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO archive_batches (month, createdAt, itemsMoved) VALUES ('2025-01', 'x', 0)"
+            )
+            assert conn.in_transaction
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM archive_batches").fetchone()[0] == 0
+
+        seen = set()
+        barrier = threading.Barrier(4)
+
+        def worker():
+            barrier.wait()
+            for _ in range(20):
+                with pool.connection() as c:
+                    seen.add(id(c))
+                    c.execute("SELECT 1").fetchone()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert pool.stats()["size"] <= 2
+        pool.close()
+
+
+def test_executor_reads_do_not_wait_for_a_blocked_writer():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        executor = DBExecutor(resolve_db_path(), readers=2)
+        release = threading.Event()
+        threads = {"read": set(), "write": set()}
+
+        def slow_write(conn):
+            threads["write"].add(threading.current_thread().name)
+            conn.execute(
+                "INSERT INTO archive_batches (month, createdAt, itemsMoved) VALUES ('2025-01', 'x', 0)"
+            )
+            assert release.wait(5)
+
+        def count(conn):
+            threads["read"].add(threading.current_thread().name)
+            return conn.execute("SELECT COUNT(*) FROM archive_batches").fetchone()[0]
+
+        async def scenario():
+            write = asyncio.ensure_future(executor.write(slow_write))
+            await asyncio.sleep(0.05)
+            # The writer holds an open transaction; reads still run
+            assert await asyncio.wait_for(executor.read(count), 2) == 0
+            release.set()
+            await write
+            results = await asyncio.gather(*(executor.read(count) for _ in range(8)))
+            assert results == [1] * 8
+
+        asyncio.run(scenario())
+        assert len(threads["write"]) == 1
+        assert threads["read"].isdisjoint(threads["write"])
+        assert executor.stats()["connections"] <= 2
+        executor.close()
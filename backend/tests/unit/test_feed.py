@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+from backend.src.services import feed
+from backend.src.services.db import close_pool, get_connection, init_db
+
+
+def test_subscribers_get_their_categories_in_publish_order():
+    async def scenario():
+        hub = feed.Feed()
+        everything = hub.subscribe()
+        incoming = hub.subscribe(["common_incoming"])
+        for i, category in enumerate(("common_incoming", "common_outgoing", "common_incoming")):
+            hub.publish(feed.Change("created", category, i + 1))
+        seen = [(await everything.next(1)).id for _ in range(3)]
+        assert seen == [1, 2, 3]
+        assert [(await incoming.next(1)).id for _ in range(2)] == [1, 3]
+        assert await incoming.next(0.01) is None
+        hub.unsubscribe(incoming)
+        assert hub.stats()["subscribers"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_publish_from_another_thread_reaches_the_loop():
+    async def scenario():
+        hub = feed.Feed()
+        sub = hub.subscribe()
+        worker = threading.Thread(target=hub.publish, args=(feed.Change("deleted", "common_incoming", 7),))
+        worker.start()
+        worker.join()
+        assert (await sub.next(1)).id == 7
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_marked_lagging_instead_of_buffering():
+    async def scenario():
+        hub = feed.Feed(queue_size=4)
+        slow = hub.subscribe()
+        for i in range(10):
+            hub.publish(feed.Change("created", "common_incoming", i + 1))
+        assert slow.lagging
+        assert await slow.next(1) is feed.LAGGED
+        assert await slow.next(0.01) is None
+        assert hub.stats()["lagged"] == 1
+        hub.close()
+        assert await slow.next(1) is feed.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_changes_since_replays_creations_and_audited_deletions():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        try:
+            for i in range(1, 6):
+                category = "common_incoming" if i % 2 else "common_outgoing"
+                conn.execute(
+                    "INSERT INTO registrations (id, category, issuer, referenceNumber, subject, "
+                    "protocolNumber, entryDate, createdAt) VALUES (?, ?, 'I', 'R', 'S', ?, '2024-05-02', 't')",
+                    (i, category, i),
+                )
+                conn.execute("INSERT INTO audit_events (action, registrationId, timestamp, username) "
+                             "VALUES ('create', ?, 't', 'u')", (i,))
+            for gone in (1, 3, 4):
+                conn.execute("UPDATE registrations SET deletedFlag = 1 WHERE id = ?", (gone,))
+                conn.execute("INSERT INTO audit_events (action, registrationId, timestamp, username) "
+                             "VALUES ('delete', ?, 't', 'u')", (gone,))
+            conn.commit()
+
+            created, deleted, last_event = feed.changes_since(conn, 3, None)
+            assert [r["id"] for r in created] == [5]
+            assert [r["id"] for r in deleted] == [1, 3]
+            # Read up to the end of the log: a later call only sees new deletions
+            assert feed.changes_since(conn, 5, None, after_event=last_event) == ([], [], last_event)
+
+            created, deleted, _ = feed.changes_since(conn, 2, frozenset({"common_outgoing"}))
+            assert created == [] and [r["id"] for r in deleted] == []
+            assert feed.changes_since(conn, 0, None, limit=1) is None
+            assert feed.changes_since(conn, 99, None) is None
+        finally:
+            conn.close()
+            close_pool()
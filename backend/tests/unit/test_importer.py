@@ -0,0 +1,105 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from backend.src.services.archive import run_monthly_archive
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.importer import import_file
+from backend.src.services.numbering import next_protocol
+
+CSV = "\ufeff" + """issuer;referenceNumber;subject;offices;entryDate;protocolNumber;notes
+Δήμος Αθηναίων;Φ.1/1;Αίτηση;OFF-1;03/02/2019;40007;x
+Περιφέρεια;Φ.1/2;Έγγραφο;OFF-1, OFF-2;2019-02-04;40008;
+
+Υπουργείο;Φ.1/3;Χωρίς γραφείο;;2019-02-05;40009;
+Δήμος Πειραιά;Φ.1/4;Αναφορά;OFF-2;2019-02-06;40010;
+Δήμος Βόλου;Φ.1/5;Χωρίς αριθμό;OFF-2;2019-02-07;;
+"""
+
+
+def test_csv_import_keeps_numbers_and_resumes_after_interruption():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        path = Path(td) / "register.csv"
+        path.write_text(CSV, encoding="utf-8")
+        conn = get_connection()
+
+        def crash_after_first_chunk(report):
+            raise RuntimeError("power cut")
+
+        with pytest.raises(RuntimeError):
+            import_file(conn, path, "common_incoming", keep_numbers=True, chunk_size=2,
+                        progress=crash_after_first_chunk)
+        assert conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0] == 2
+
+        report = import_file(conn, path, "common_incoming", keep_numbers=True, chunk_size=2)
+        assert report.resumedFrom == 2
+        assert (report.rowsDone, report.inserted, report.rejected) == (5, 3, 2)
+        # Line numbers point into the file (header is line 1, line 4 is blank)
+        assert [(e.row, e.message.split(":")[0]) for e in report.errors] == [
+            (5, "offices required for incoming categories"), (7, "protocolNumber"),
+        ]
+        rows = conn.execute(
+            "SELECT protocolNumber, entryDate, offices FROM registrations ORDER BY id"
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [
+            (40007, "2019-02-03", "OFF-1"),
+            (40008, "2019-02-04", "OFF-1,OFF-2"),
+            (40010, "2019-02-06", "OFF-2"),
+        ]
+        # The sequence moved past the historical numbers
+        assert next_protocol(conn, "common_incoming", 2019) == 40011
+        conn.commit()
+
+        again = import_file(conn, path, "common_incoming", keep_numbers=True)
+        assert again.alreadyImported and again.inserted == 3
+        assert conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0] == 3
+
+        # Allocating numbers instead: the file's numbers are ignored
+        report = import_file(conn, path, "signals_incoming")
+        assert report.inserted == 4
+        numbers = [r[0] for r in conn.execute(
+            "SELECT protocolNumber FROM registrations WHERE category = 'signals_incoming' ORDER BY id"
+        )]
+        assert numbers == [1, 2, 3, 4]
+        conn.close()
+
+
+def test_kept_numbers_already_registered_or_repeated_are_rejected():
+    first = """issuer;referenceNumber;subject;recipient;entryDate;protocolNumber;draftNumber
+Δήμος;Φ.2/1;Απάντηση;Περιφέρεια;2020-03-02;5;11
+"""
+    second = """issuer;referenceNumber;subject;recipient;entryDate;protocolNumber;draftNumber
+Δήμος;Φ.2/2;Ίδιος αριθμός;Περιφέρεια;2020-03-03;5;12
+Δήμος;Φ.2/3;Νέος;Περιφέρεια;2020-03-04;6;13
+Δήμος;Φ.2/4;Διπλός στο αρχείο;Περιφέρεια;2020-03-05;6;14
+Δήμος;Φ.2/5;Άλλο έτος;Περιφέρεια;2021-01-04;5;15
+Δήμος;Φ.2/6;Ίδιο σχέδιο;Περιφέρεια;2021-01-05;7;11
+"""
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        for name, text in (("first.csv", first), ("second.csv", second)):
+            (Path(td) / name).write_text(text, encoding="utf-8")
+        assert import_file(conn, Path(td) / "first.csv", "signals_outgoing", keep_numbers=True).inserted == 1
+
+        report = import_file(conn, Path(td) / "second.csv", "signals_outgoing", keep_numbers=True)
+        assert (report.inserted, report.rejected) == (2, 3)
+        assert [(e.row, e.message) for e in report.errors] == [
+            (2, "protocolNumber: 5 of 2020 is already registered"),
+            (4, "protocolNumber: 6 of 2020 is already in this file"),
+            (6, "draftNumber: 11 is already registered"),
+        ]
+        rows = conn.execute("SELECT entryDate, protocolNumber, draftNumber FROM registrations ORDER BY id")
+        assert [tuple(r) for r in rows] == [("2020-03-02", 5, 11), ("2020-03-04", 6, 13), ("2021-01-04", 5, 15)]
+
+        # Archived registrations keep their numbers too
+        run_monthly_archive(conn, "2020-03", pause=0)
+        (Path(td) / "third.csv").write_text(second.replace("Φ.2/", "Φ.3/"), encoding="utf-8")
+        report = import_file(conn, Path(td) / "third.csv", "signals_outgoing", keep_numbers=True)
+        assert [e.row for e in report.errors] == [2, 3, 4, 5, 6] and report.inserted == 0
+        conn.close()
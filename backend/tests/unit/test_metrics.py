@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.src.api.metrics import MetricsMiddleware
+from backend.src.services import metrics
+from backend.src.services.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = Registry()
+    hist = registry.register(Histogram("t_seconds", "Latency", ("route",), buckets=(0.01, 0.1)))
+    count = registry.register(Counter("t_events_total", "Events", ("kind",)))
+    for value in (0.005, 0.05, 0.05, 3.0):
+        hist.observe(value, "/a")
+    count.inc('we"ird')
+    count.inc('we"ird', amount=2)
+
+    @registry.collector
+    def _extra():
+        yield metrics.gauge("t_idle", "Idle things", 4)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{route="/a",le="0.01"} 1' in lines
+    assert 't_seconds_bucket{route="/a",le="0.1"} 3' in lines
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 't_seconds_count{route="/a"} 4' in lines
+    assert 't_seconds_sum{route="/a"} 3.105' in lines
+    assert "# TYPE t_events_total counter" in lines
+    assert 't_events_total{kind="we\\"ird"} 3' in lines
+    assert "# TYPE t_idle gauge" in lines and "t_idle 4" in lines
+
+
+def test_switched_off_records_nothing():
+    hist = Histogram("t_off_seconds", "Off")
+    metrics.set_enabled(False)
+    try:
+        hist.observe(0.1)
+        with metrics.timed("list"):
+            pass
+    finally:
+        metrics.set_enabled(True)
+    assert hist.count() == 0
+
+
+def test_lock_wait_counts_contention_and_timeouts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lock.db")
+        holder = sqlite3.connect(path)
+        waiter = sqlite3.connect(path, timeout=0.05)
+        holder.execute("CREATE TABLE t (x)")
+        holder.commit()
+
+        waits = metrics.LOCK_WAIT_SECONDS.count("test")
+        with metrics.lock_wait("test"):
+            waiter.execute("BEGIN IMMEDIATE")
+        waiter.rollback()
+        assert metrics.LOCK_WAIT_SECONDS.count("test") == waits + 1
+
+        contended = metrics.LOCK_CONTENDED.value("test")
+        timeouts = metrics.LOCK_TIMEOUTS.value("test")
+        holder.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.OperationalError):
+            with metrics.lock_wait("test"):
+                waiter.execute("BEGIN IMMEDIATE")
+        holder.rollback()
+        # Gave up after busy_timeout: a timeout, not a (successful) contended wait
+        assert metrics.LOCK_TIMEOUTS.value("test") == timeouts + 1
+        assert metrics.LOCK_CONTENDED.value("test") == contended
+        holder.close()
+        waiter.close()
+
+
+def test_middleware_leaves_event_streams_out_of_the_latency_histogram():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/t-events")
+    async def events():
+        async def body():
+            yield "event: reset\ndata: {}\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    @app.get("/t-plain")
+    async def plain():
+        return PlainTextResponse("ok")
+
+    with TestClient(app) as client:
+        assert client.get("/t-events").text.startswith("event: reset")
+        assert client.get("/t-plain").text == "ok"
+    assert metrics.HTTP_SECONDS.count("GET", "/t-events", "200") == 0
+    assert metrics.HTTP_SECONDS.count("GET", "/t-plain", "200") == 1
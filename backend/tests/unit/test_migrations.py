@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+
+from backend.src.services import migrations
+from backend.src.services.archive import ARCHIVE_MIGRATIONS, upgrade_archives
+from backend.src.services.db import ensure_db, get_connection, init_db
+from backend.src.services.migrations import Backfill, Migration, MigrationError
+
+INSERT = (
+    "INSERT INTO registrations (category, issuer, referenceNumber, subject, offices, protocolNumber, "
+    "entryDate, createdAt) VALUES ('common_incoming', 'Δήμος', 'R', 'Αίτηση', ?, 1, '2024-05-02', 't')"
+)
+
+
+def test_split_statements_keeps_triggers_and_commented_semicolons_whole():
+    script = """
+        CREATE TABLE a (x TEXT); -- done; really
+        CREATE TRIGGER t AFTER INSERT ON a BEGIN
+            INSERT INTO a (x) SELECT 'b;c' WHERE 0; -- inner; comment
+        END;
+    """
+    statements = list(migrations.split_statements(script))
+    assert len(statements) == 2
+    assert statements[1].strip().startswith("-- done; really") and statements[1].rstrip().endswith("END;")
+    with pytest.raises(MigrationError):
+        list(migrations.split_statements("CREATE TRIGGER t AFTER INSERT ON a BEGIN SELECT 1;"))
+
+
+def test_a_failed_migration_leaves_the_previous_version():
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        conn.execute("SELECT * FROM missing_table")
+
+    steps = (
+        Migration(1, "first", lambda conn: conn.execute("CREATE TABLE first (x)")),
+        Migration(2, "broken", broken),
+    )
+    conn = sqlite3.connect(":memory:")
+    with pytest.raises(MigrationError, match="migration 2"):
+        migrations.apply_migrations(conn, steps)
+    assert migrations.schema_version(conn) == 1
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    assert "first" in tables and "half_done" not in tables
+
+    assert migrations.apply_migrations(conn, steps[:1]) == []
+    with pytest.raises(MigrationError, match="newer than this release"):
+        migrations.apply_migrations(conn, ())
+
+
+def test_an_interrupted_backfill_continues_where_it_stopped():
+    seen = []
+
+    def step(conn, lo, hi):
+        if (lo, hi) == (5, 6) and not seen.count((5, 6)):
+            seen.append((lo, hi))
+            raise RuntimeError("power cut")
+        seen.append((lo, hi))
+        conn.execute("UPDATE items SET done = done + 1 WHERE id BETWEEN ? AND ?", (lo, hi))
+
+    def create(conn):
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, done INTEGER NOT NULL DEFAULT 0)")
+        conn.executemany("INSERT INTO items (id) VALUES (?)", [(i,) for i in range(1, 10)])
+
+    steps = (Migration(1, "items", create, backfills=(Backfill("items_done", "items", step),)),)
+    conn = sqlite3.connect(":memory:")
+    migrations.apply_migrations(conn, steps)
+    assert migrations.pending_backfills(conn) == [
+        {"name": "items_done", "version": 1, "firstId": 1, "nextId": 1, "lastId": 9}
+    ]
+    with pytest.raises(RuntimeError):
+        migrations.run_backfills(conn, steps, chunk_size=2, pause=0)
+    assert migrations.pending_backfills(conn)[0]["nextId"] == 5
+
+    assert migrations.run_backfills(conn, steps, chunk_size=2, pause=0) == 3
+    assert seen == [(1, 2), (3, 4), (5, 6), (5, 6), (7, 8), (9, 9)]
+    # Every row handled once: the failed chunk rolled back with its position
+    assert conn.execute("SELECT MIN(done), MAX(done) FROM items").fetchone() == (1, 1)
+    assert migrations.pending_backfills(conn) == []
+
+
+def test_a_new_database_goes_through_every_migration_in_turn():
+    # Version 1 creates the tables as released, so a later column addition
+    # applies to a new file as it does to an old one
+    added = Migration(2, "a later column", lambda conn: conn.execute("ALTER TABLE registrations ADD COLUMN note TEXT"))
+    conn = sqlite3.connect(":memory:")
+    assert migrations.apply_migrations(conn, migrations.MIGRATIONS + (added,)) == [1, 2]
+    conn.execute(INSERT, ("OFF-1",))
+    assert conn.execute("SELECT entryMonth, note FROM registrations").fetchone() == ("2024-05", None)
+
+
+def test_offices_of_an_old_database_are_split_in_chunks():
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "old.db")
+        os.environ["REGISTRY_DB_PATH"] = path
+        init_db()
+        conn = get_connection()
+        for i in range(7):
+            conn.execute(INSERT, (f"OFF-1,OFF-{i + 2}",))
+        conn.executescript(
+            "DROP TABLE registration_offices; DROP TABLE offices;"
+            "DROP TRIGGER trg_registration_offices_insert; DROP TRIGGER trg_registration_offices_delete;"
+            "DROP TRIGGER trg_registration_offices_update; PRAGMA user_version = 0;"
+        )
+        conn.close()
+
+        assert migrations.upgrade_database(chunk_size=3, pause=0) == [1]
+        conn = get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM registration_offices").fetchone()[0] == 14
+        assert conn.execute("SELECT COUNT(*) FROM offices").fetchone()[0] == 8
+        assert tuple(conn.execute("SELECT nextId, finishedAt IS NOT NULL FROM schema_backfills").fetchone()) == (8, 1)
+        assert migrations.status(conn, migrations.MIGRATIONS)["pending"] == []
+        conn.close()
+
+
+def _matches(conn, term):
+    return [r[0] for r in conn.execute("SELECT rowid FROM registrations_fts WHERE registrations_fts MATCH ?", (term,))]
+
+
+class _StopAfter(threading.Event):
+    # Asked before every chunk: lets the given number of chunks run
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = chunks
+
+    def is_set(self):
+        self.chunks -= 1
+        return self.chunks < 0
+
+
+def test_search_index_and_counts_are_filled_in_chunks_around_live_writes():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "old.db")
+        init_db()
+        conn = get_connection()
+        for _ in range(8):
+            conn.execute(INSERT, ("OFF-1",))
+        # As a database from before the search index and the counters
+        conn.executescript(
+            "DROP TABLE registrations_fts; DROP TABLE registration_counts;"
+            "DROP TRIGGER trg_registrations_fts_insert; DROP TRIGGER trg_registrations_fts_delete;"
+            "DROP TRIGGER trg_registrations_fts_update; DROP TRIGGER trg_registration_counts_insert;"
+            "DROP TRIGGER trg_registration_counts_soft_delete; DROP TRIGGER trg_registration_counts_delete;"
+            "PRAGMA user_version = 0;"
+        )
+        conn.close()
+
+        # Startup creates both empty and leaves the filling to the background
+        ensure_db()
+        conn = get_connection()
+        assert [b["name"] for b in migrations.pending_backfills(conn)] == ["registration_counts", "registrations_fts"]
+        assert conn.execute("SELECT COUNT(*) FROM registration_counts").fetchone()[0] == 0
+        migrations.run_backfills(conn, migrations.MIGRATIONS, chunk_size=3, pause=0, stop=_StopAfter(1))
+        # Counted: 1-3. Indexed: nothing yet. Writes meanwhile touch both kinds of rows.
+        conn.execute("UPDATE registrations SET deletedFlag = 1 WHERE id IN (2, 5)")
+        conn.execute("DELETE FROM registrations WHERE id IN (1, 6)")
+        conn.execute("UPDATE registrations SET subject = 'Βεβαίωση' WHERE id = 7")
+        conn.execute(INSERT, ("OFF-2",))
+        conn.commit()
+
+        assert migrations.run_backfills(conn, migrations.MIGRATIONS, chunk_size=3, pause=0) == 5
+        conn.execute("INSERT INTO registrations_fts (registrations_fts) VALUES ('integrity-check')")
+        assert conn.execute("SELECT SUM(total) FROM registration_counts").fetchone()[0] == 5
+        assert _matches(conn, "βεβαιωση") == [7]
+        # Soft-deleted rows stay indexed, as with the triggers
+        assert _matches(conn, "αιτηση") == [2, 3, 4, 5, 8, 9]
+        # Done: the triggers maintain both again
+        conn.execute("DELETE FROM registrations WHERE id = 7")
+        conn.commit()
+        conn.execute("INSERT INTO registrations_fts (registrations_fts) VALUES ('integrity-check')")
+        assert conn.execute("SELECT SUM(total) FROM registration_counts").fetchone()[0] == 4
+        conn.close()
+
+
+def test_archive_files_are_upgraded_in_place():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "app.db")
+        directory = os.path.join(td, "archive")
+        os.mkdir(directory)
+        # Written before the audit index and versioning existed
+        old = sqlite3.connect(os.path.join(directory, "2023-01.db"))
+        old.execute("CREATE TABLE audit_events (id INTEGER PRIMARY KEY, action TEXT NOT NULL, "
+                    "registrationId INTEGER NOT NULL, timestamp TEXT NOT NULL, username TEXT NOT NULL)")
+        old.commit()
+        old.close()
+        newer = sqlite3.connect(os.path.join(directory, "2023-02.db"))
+        newer.execute(f"PRAGMA user_version = {ARCHIVE_MIGRATIONS[-1].version + 1}")
+        newer.close()
+
+        # The file from a newer release is logged and skipped
+        assert upgrade_archives() == 1
+        assert upgrade_archives() == 0
+        conn = sqlite3.connect(os.path.join(directory, "2023-01.db"))
+        assert migrations.schema_version(conn) == ARCHIVE_MIGRATIONS[-1].version
+        assert conn.execute("PRAGMA index_info(ix_audit_events_registration)").fetchall() != []
+        conn.close()
@@ -1,7 +1,9 @@
+import multiprocessing
 import os
 import tempfile
+import threading
 from backend.src.services.db import get_connection, init_db
-from backend.src.services.numbering import next_protocol, next_draft
+from backend.src.services.numbering import BlockAllocator, next_draft, next_protocol
 
 
 def test_protocol_start_values_and_yearly_reset():
@@ -41,3 +43,82 @@ def test_draft_never_resets_and_per_outgoing_category():
         dx1 = next_draft(conn, "confidential_outgoing")
         assert dx1 == 1
         conn.close()
+
+
+def test_concurrent_writers_get_gap_free_unique_numbers():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        issued = []
+        lock = threading.Lock()
+
+        def writer():
+            conn = get_connection()
+            for _ in range(25):
+                n = next_protocol(conn, "common_incoming", 2025)
+                conn.commit()
+                with lock:
+                    issued.append(n)
+            conn.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(issued) == list(range(40001, 40101))
+
+
+def _process_writer(db_path, count):
+    # Runs in a separate process, as a server worker would
+    os.environ["REGISTRY_DB_PATH"] = db_path
+    conn = get_connection()
+    issued = []
+    for _ in range(count):
+        issued.append(next_protocol(conn, "common_incoming", 2025))
+        conn.commit()
+    conn.close()
+    return issued
+
+
+def test_concurrent_processes_get_gap_free_unique_numbers():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        with multiprocessing.get_context("spawn").Pool(4) as pool:
+            results = pool.starmap(_process_writer, [(os.environ["REGISTRY_DB_PATH"], 25)] * 4)
+        issued = [n for numbers in results for n in numbers]
+        assert sorted(issued) == list(range(40001, 40101))
+
+
+def test_block_allocator_returns_unused_tail_and_rewinds_on_rollback():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        alloc = BlockAllocator(conn, block_size=10)
+        assert [alloc.next_protocol("signals_incoming", 2025) for _ in range(3)] == [1, 2, 3]
+        alloc.commit()
+        # Numbers handed out in a rolled-back transaction are served again
+        assert alloc.next_protocol("signals_incoming", 2025) == 4
+        alloc.rollback()
+        assert alloc.next_protocol("signals_incoming", 2025) == 4
+        assert alloc.next_draft("signals_outgoing") == 1
+        assert alloc.close() == []
+        # Unused tail went back to the sequence: the register stays gap-free
+        assert next_protocol(conn, "signals_incoming", 2025) == 5
+        assert next_draft(conn, "signals_outgoing") == 2
+        conn.commit()
+
+        alloc = BlockAllocator(conn, block_size=10)
+        assert alloc.next_protocol("signals_incoming", 2025) == 6
+        alloc.commit()
+        other = get_connection()
+        assert next_protocol(other, "signals_incoming", 2025) == 16
+        other.commit()
+        other.close()
+        # Someone allocated past the block, so its tail is recorded instead
+        assert alloc.close() == [(("protocol", "signals_incoming", 2025), 7, 15)]
+        row = conn.execute("SELECT fromNumber, toNumber FROM numbering_unused").fetchone()
+        assert tuple(row) == (7, 15)
+        conn.close()
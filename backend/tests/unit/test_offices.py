@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import tempfile
+
+from backend.src.services.db import ensure_db, get_connection, init_db
+from backend.src.services.migrations import upgrade_database
+from backend.src.services.offices import count_office, has_office, list_offices, save_office, split_offices
+
+INSERT = (
+    "INSERT INTO registrations (category, issuer, referenceNumber, subject, offices, protocolNumber, "
+    "entryDate, createdAt) VALUES (?, 'Δήμος', 'R', 'Αίτηση', ?, 1, ?, '2024-05-01T09:00:00')"
+)
+
+
+def _junction(conn):
+    rows = conn.execute("SELECT registrationId, office, entryMonth FROM registration_offices")
+    return sorted(tuple(r) for r in rows)
+
+
+def test_junction_follows_the_offices_column():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        conn.execute(INSERT, ("common_incoming", "OFF-1,OFF-2", "2024-05-02"))
+        conn.execute(INSERT, ("signals_incoming", " OFF-3 , ,OFF-1", "2024-05-03"))
+        conn.execute(INSERT, ("common_outgoing", None, "2024-05-04"))
+        assert _junction(conn) == [
+            (1, "OFF-1", "2024-05"), (1, "OFF-2", "2024-05"), (2, "OFF-1", "2024-05"), (2, "OFF-3", "2024-05"),
+        ]
+        assert count_office(conn, "OFF-1", "2024-05") == 2
+        assert count_office(conn, "OFF-1", "2024-05", "signals_incoming") == 1
+
+        # Soft delete drops the rows, an edit re-derives them, a hard delete removes them
+        conn.execute("UPDATE registrations SET deletedFlag = 1 WHERE id = 1")
+        conn.execute("UPDATE registrations SET offices = 'OFF-2', entryDate = '2024-06-01' WHERE id = 2")
+        assert _junction(conn) == [(2, "OFF-2", "2024-06")]
+        conn.execute("DELETE FROM registrations WHERE id = 2")
+        assert _junction(conn) == []
+
+        # Listing by office reads the junction range, not the registrations table
+        plan = " | ".join(r["detail"] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT r.* FROM registration_offices o CROSS JOIN registrations r "
+            "ON r.id = o.registrationId WHERE o.office = ? AND o.entryMonth = ? AND o.category = ? "
+            "ORDER BY o.registrationId LIMIT 50",
+            ("OFF-1", "2024-05", "common_incoming"),
+        ))
+        assert "SCAN" not in plan and "TEMP B-TREE" not in plan, plan
+        conn.close()
+
+
+def test_ensure_db_migrates_comma_joined_offices():
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "old.db")
+        os.environ["REGISTRY_DB_PATH"] = path
+        init_db()
+        conn = get_connection()
+        conn.execute(INSERT, ("common_incoming", "OFF-1,OFF-7", "2024-05-02"))
+        conn.execute(INSERT, ("common_incoming", "OFF-2", "2024-05-02"))
+        conn.execute("UPDATE registrations SET deletedFlag = 1 WHERE id = 2")
+        # As a database from before the junction table
+        conn.executescript(
+            "DROP TABLE registration_offices; DROP TABLE offices;"
+            "DROP TRIGGER trg_registration_offices_insert; DROP TRIGGER trg_registration_offices_delete;"
+            "DROP TRIGGER trg_registration_offices_update; PRAGMA user_version = 0;"
+        )
+        conn.close()
+
+        # Startup only schedules the split; it is done in the background (or
+        # by cli/migrate.py, as here)
+        ensure_db()
+        conn = get_connection()
+        assert _junction(conn) == []
+        conn.close()
+        upgrade_database(pause=0)
+        conn = get_connection()
+        assert _junction(conn) == [(1, "OFF-1", "2024-05"), (1, "OFF-7", "2024-05")]
+        # Codes already in use join the default offices
+        assert list_offices(conn) == [
+            {"code": "OFF-1", "label": "Office 1"}, {"code": "OFF-2", "label": "Office 2"},
+            {"code": "OFF-7", "label": "OFF-7"},
+        ]
+        save_office(conn, "OFF-7", "Γραφείο 7", active=False)
+        conn.commit()
+        conn.close()
+
+        # A second start leaves offices and junction alone
+        ensure_db()
+        conn = get_connection()
+        assert [o["code"] for o in list_offices(conn)] == ["OFF-1", "OFF-2"]
+        assert list_offices(conn, include_inactive=True)[-1] == {
+            "code": "OFF-7", "label": "Γραφείο 7", "active": False,
+        }
+        assert len(_junction(conn)) == 2
+        conn.close()
+
+
+def test_has_office_matches_whole_codes():
+    assert split_offices(" OFF-1,,OFF-12 ") == ["OFF-1", "OFF-12"]
+    assert split_offices(None) == []
+    assert has_office("OFF-12,OFF-2", "OFF-2")
+    assert not has_office("OFF-12", "OFF-1")
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("has_office", 2, has_office, deterministic=True)
+    row = conn.execute("SELECT has_office('OFF-1,OFF-2', 'OFF-1'), has_office(NULL, 'OFF-1')").fetchone()
+    assert row == (1, 0)
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import tempfile
+
+from backend.src.api.paging import encode_cursor
+from backend.src.api.registrations import _list_page
+from backend.src.services.db import ensure_db, get_connection, init_db
+from backend.src.services.migrations import SCHEMA_VERSION
+
+
+INSERT = (
+    "INSERT INTO registrations (category, issuer, referenceNumber, subject, offices, protocolNumber, "
+    "entryDate, createdAt) VALUES (?, 'Δήμος', 'R', 'Αίτηση', ?, 1, '2025-01-02', 't')"
+)
+
+LEGACY_REGISTRATIONS = """
+CREATE TABLE registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    issuer TEXT NOT NULL,
+    referenceNumber TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    recipient TEXT,
+    offices TEXT,
+    protocolNumber INTEGER NOT NULL,
+    draftNumber INTEGER,
+    entryDate TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    deletedFlag INTEGER NOT NULL DEFAULT 0,
+    deletedAt TEXT
+);
+"""
+
+
+def _plan(conn, sql):
+    return " | ".join(r["detail"] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def _statements(conn, fn, *args):
+    # The statements fn runs, with their bound values written in
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn(conn, *args)
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def test_month_listing_uses_indexes_not_scans():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        for i in range(5):
+            conn.execute(INSERT, ("common_incoming" if i % 2 else "common_outgoing", "OFF-1,OFF-2"))
+        conn.commit()
+        after = encode_cursor({"id": 2})
+        # Every variant of GET /registrations without archives:
+        # (category, page, after, office), each with its total
+        variants = [
+            (None, 1, None, None),
+            ("common_incoming", 1, None, None),
+            (None, 1, after, None),
+            ("common_incoming", 1, after, None),
+            ("common_incoming", 3, None, None),
+            (None, 1, None, "OFF-2"),
+            ("common_incoming", 1, None, "OFF-2"),
+            (None, 1, after, "OFF-2"),
+            ("common_incoming", 1, after, "OFF-2"),
+            (None, 2, None, "OFF-2"),
+        ]
+        for category, page, cursor, office in variants:
+            statements = _statements(conn, _list_page, "2025-01", category, page, 2, cursor, False, office)
+            assert len(statements) == 2, statements
+            for sql in statements:
+                plan = _plan(conn, sql)
+                assert "SCAN" not in plan, (sql, plan)
+                assert "TEMP B-TREE" not in plan, (sql, plan)
+            listing, total = (_plan(conn, sql) for sql in statements)
+            if office:
+                index = "COVERING INDEX ix_registration_offices_category" if category else "PRIMARY KEY"
+                assert f"SEARCH o USING {index} (office=? AND entryMonth=?" in listing, listing
+                assert "SEARCH r USING INTEGER PRIMARY KEY" in listing, listing
+            else:
+                index = "ix_registrations_month_category" if category else "ix_registrations_month"
+                assert f"SEARCH registrations USING INDEX {index} (" in listing, listing
+            if cursor:
+                # The keyset bound seeks into the index instead of filtering
+                assert ("registrationId>?)" if office else "rowid>?)") in listing, listing
+            assert "registration_offices" in total if office else "registration_counts" in total, total
+        conn.close()
+
+
+def test_ensure_db_migrates_legacy_database():
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "legacy.db")
+        os.environ["REGISTRY_DB_PATH"] = path
+        legacy = sqlite3.connect(path)
+        legacy.executescript(LEGACY_REGISTRATIONS)
+        legacy.execute(
+            "INSERT INTO registrations (category, issuer, referenceNumber, subject, protocolNumber, entryDate, createdAt) "
+            "VALUES ('common_incoming', 'I', 'R', 'S', 40001, '2024-11-03', '2024-11-03T09:00:00')"
+        )
+        legacy.commit()
+        legacy.close()
+
+        ensure_db()
+        conn = get_connection()
+        assert conn.execute("SELECT entryMonth FROM registrations").fetchone()[0] == "2024-11"
+        indexes = {r["name"] for r in conn.execute("PRAGMA index_list(registrations)")}
+        assert {"ix_registrations_month", "ix_registrations_month_category"} <= indexes
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        conn.close()
+
+
+def test_ensure_db_skips_a_current_schema():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        conn.execute("DROP INDEX ix_registrations_month")
+        conn.commit()
+        # At SCHEMA_VERSION: no DDL runs, so the index stays gone
+        ensure_db()
+        assert conn.execute("PRAGMA index_info(ix_registrations_month)").fetchall() == []
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+        ensure_db()
+        conn = get_connection()
+        assert conn.execute("PRAGMA index_info(ix_registrations_month)").fetchall() != []
+        conn.close()
@@ -0,0 +1,51 @@
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from backend.src.services.querylog import QueryLog, TracedConnection
+
+
+def _traced(tmp: str, threshold_ms: float) -> sqlite3.Connection:
+    conn = sqlite3.connect(Path(tmp) / "q.db", factory=TracedConnection)
+    conn.query_log = QueryLog(threshold_ms, Path(tmp) / "logs" / "slow.log")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.execute("CREATE INDEX ix_t_v ON t (v)")
+    return conn
+
+
+def test_statements_are_timed_until_their_rows_are_consumed():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = _traced(tmp, threshold_ms=10_000)
+        conn.executemany("INSERT INTO t (v) VALUES (?)", [("a",), ("b",), ("b",)])
+        conn.commit()
+        assert conn.execute("SELECT id FROM t WHERE v = ?", ("b",)).fetchall() == [(2,), (3,)]
+        rows = list(conn.execute("SELECT v FROM t"))
+        one = conn.execute("SELECT COUNT(*) FROM t").fetchone()
+        assert len(rows) == 3 and one == (3,)
+        conn.execute("UPDATE t SET v = 'c' WHERE v = 'b'")
+
+        stats = {s["sql"]: s for s in conn.query_log.summary(limit=50)}
+        assert stats["INSERT INTO t (v) VALUES (?)"]["rows"] == 3
+        assert stats["SELECT id FROM t WHERE v = ?"]["rows"] == 2
+        assert stats["SELECT v FROM t"]["rows"] == 3
+        assert stats["UPDATE t SET v = 'c' WHERE v = 'b'"]["rows"] == 2
+        assert stats["COMMIT"]["calls"] == 1
+        # fetchone() left that statement open; it was recorded when its cursor went away
+        assert stats["SELECT COUNT(*) FROM t"]["rows"] == 1
+        assert not (Path(tmp) / "logs").exists()  # nothing was slow
+        conn.close()
+
+
+def test_slow_statements_are_logged_with_their_plan():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = _traced(tmp, threshold_ms=0)
+        conn.execute("INSERT INTO t (v) VALUES (?)", ("secret",))
+        conn.execute("SELECT id FROM t WHERE v = ?", ("secret",)).fetchall()
+        conn.query_log.close()
+        entries = [json.loads(line) for line in (Path(tmp) / "logs" / "slow.log").read_text().splitlines()]
+        select = next(e for e in entries if e["sql"].startswith("SELECT"))
+        assert select["rows"] == 1 and select["ms"] >= 0
+        assert any("ix_t_v" in line for line in select["plan"])
+        assert all("secret" not in json.dumps(e) for e in entries)
+        conn.close()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.src.services.db import close_pool, get_connection, init_db
+from backend.src.services.scheduler import CronSchedule, Job, JobScheduler, job_lock, run_job
+
+
+def test_cron_schedule_next_run():
+    every_quarter = CronSchedule("*/15 * * * *")
+    assert every_quarter.next_after(datetime(2025, 3, 4, 10, 7, 30)) == datetime(2025, 3, 4, 10, 15)
+    assert every_quarter.next_after(datetime(2025, 3, 4, 10, 45)) == datetime(2025, 3, 4, 11, 0)
+
+    monthly = CronSchedule("30 2 1 * *")
+    assert monthly.next_after(datetime(2025, 1, 31, 23, 0)) == datetime(2025, 2, 1, 2, 30)
+    assert monthly.next_after(datetime(2025, 12, 1, 2, 30)) == datetime(2026, 1, 1, 2, 30)
+
+    sundays = CronSchedule("0 4 * * 0")
+    assert sundays.next_after(datetime(2025, 3, 4, 12, 0)) == datetime(2025, 3, 9, 4, 0)
+    # Both day fields restricted: either matches, as in cron
+    either = CronSchedule("0 0 13 * 5")
+    assert either.next_after(datetime(2025, 6, 1)) == datetime(2025, 6, 6)
+
+    weekdays = CronSchedule("0 8-18/2 * * 1-5")
+    assert weekdays.next_after(datetime(2025, 3, 7, 18, 0)) == datetime(2025, 3, 10, 8, 0)
+
+    for bad in ("* * * *", "60 * * * *", "0 0 31 2 *"):
+        with pytest.raises(ValueError):
+            CronSchedule(bad).next_after(datetime(2025, 1, 1))
+
+
+def test_each_scheduled_slot_runs_once_across_processes():
+    # Every server process wakes up for the same slot; one of them runs it
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        calls = []
+        job = Job(name="checkpoint", schedule=CronSchedule("*/15 * * * *"),
+                  run=lambda conn: calls.append(1) or "ok")
+        slot = datetime.now().replace(second=0, microsecond=0)
+        run_job(job, slot)
+        run_job(job, slot)
+        run_job(job)  # run by hand: always runs
+        assert len(calls) == 2
+        conn = get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM job_runs WHERE status = 'ok'").fetchone()[0] == 2
+        conn.close()
+        close_pool()
+
+
+def test_a_running_job_is_not_started_again():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        calls = []
+        job = Job(name="checkpoint", schedule=CronSchedule("*/15 * * * *"),
+                  run=lambda conn: calls.append(1) or "ok")
+        with job_lock("checkpoint"):
+            # A manual run (or another Job object for the same name) is in progress
+            assert job.running
+            assert run_job(job) is False
+
+            async def one_pass():
+                scheduler = JobScheduler([job])
+                scheduler.start()
+                job.next_run = datetime.now() - timedelta(minutes=1)
+                await asyncio.sleep(0.05)
+                await scheduler.stop()
+
+            asyncio.run(one_pass())
+            # The due slot was skipped, not queued behind the running job
+            assert job.next_run > datetime.now()
+        assert calls == [] and not job.running
+        assert run_job(job) is True and calls == [1]
+        close_pool()
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import stat
+import tempfile
+
+import pytest
+
+from backend.src.services import federation, sealed
+from backend.src.services.archive import archive_dir, upgrade_archive
+from backend.src.services.db import configure_connection, get_connection, init_db
+from backend.src.services.export import iter_month_rows
+
+
+def _row(rid, month, subject, category="common_incoming", deleted=0):
+    return (rid, category, "Δήμος", f"R-{rid}", subject, None, "OFF-1", 40000 + rid, None,
+            f"{month}-05", f"{month}-05T09:00:00", deleted, None)
+
+
+def _write_archive(month, rows):
+    arch_dir = archive_dir()
+    arch_dir.mkdir(parents=True, exist_ok=True)
+    upgrade_archive(arch_dir / f"{month}.db")
+    conn = sqlite3.connect(arch_dir / f"{month}.db")
+    conn.executemany("INSERT OR REPLACE INTO registrations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany(
+        "INSERT OR REPLACE INTO audit_events VALUES (?, 'create', ?, '2023-03-05T09:00:00', 'tester')",
+        [(r[0], r[0]) for r in rows],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_seal_month_round_trip_and_reads_in_place(monkeypatch):
+    monkeypatch.setattr(sealed, "BLOCK_ROWS", 4)
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        rows = [_row(i, "2023-03", f"Αίτηση {i}", deleted=int(i == 3)) for i in range(1, 11)]
+        _write_archive("2023-03", rows)
+        conn = get_connection()
+
+        result = sealed.seal_month(conn, "2023-03")
+        assert (result.rows, result.auditRows) == (10, 10)
+        assert not (archive_dir() / "2023-03.db").exists()
+        index_path = sealed.index_path_for("2023-03")
+        assert not os.stat(index_path).st_mode & stat.S_IWRITE
+        assert sealed.verify_sealed(index_path) == 20
+        assert conn.execute("SELECT rows FROM archive_seals WHERE month = '2023-03'").fetchone()[0] == 10
+
+        with sealed.SealedArchive(index_path) as archive:
+            assert len(archive.blocks()) == 3
+            assert [tuple(r) for r in archive.rows()] == rows
+            assert [r[0] for r in archive.rows(after_id=6, descending=True)] == [5, 4, 3, 2, 1]
+
+        # Federation and export read the sealed month like an archive DB
+        rows_out, _ = federation.federated_query(
+            conn, federation.FederatedQuery(terms=["αιτηση"], descending=True, limit=20)
+        )
+        assert [r["id"] for r in rows_out] == [10, 9, 8, 7, 6, 5, 4, 2, 1]
+        assert {r["source"] for r in rows_out} == {"2023-03"}
+        rows_out, _ = federation.federated_query(conn, federation.FederatedQuery(protocol_number=40007))
+        assert [r["id"] for r in rows_out] == [7]
+        assert [r[0] for r in iter_month_rows(conn, "2023-03")] == [1, 2, 4, 5, 6, 7, 8, 9, 10]
+
+        # A backdated entry archived after the seal is merged by the next seal
+        _write_archive("2023-03", [_row(11, "2023-03", "Αίτηση νέα"), _row(2, "2023-03", "Διόρθωση")])
+        federation.refresh_catalog(conn)  # written by hand, not by the archiver
+        assert [r[0] for r in iter_month_rows(conn, "2023-03")] == [1, 2, 4, 5, 6, 7, 8, 9, 10, 11]
+        result = sealed.seal_month(conn, "2023-03")
+        assert result.rows == 11
+        with sealed.SealedArchive(index_path) as archive:
+            # The archive DB and the previous data file are gone
+            assert sorted(p.name for p in archive_dir().iterdir()) == [archive.path.name, index_path.name]
+            assert [r[4] for r in archive.rows() if r[0] == 2] == ["Διόρθωση"]
+        conn.close()
+    federation.shutdown()
+
+
+def test_corrupted_block_fails_verification():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        _write_archive("2023-04", [_row(i, "2023-04", "Έκθεση ελέγχου") for i in range(1, 6)])
+        conn = get_connection()
+        sealed.seal_month(conn, "2023-04")
+        conn.close()
+
+        index_path = sealed.index_path_for("2023-04")
+        with sealed.SealedArchive(index_path) as archive:
+            data_path = archive.path
+            offset = archive.blocks()[0]["offset"] + 10
+        os.chmod(data_path, stat.S_IREAD | stat.S_IWRITE)
+        with open(data_path, "r+b") as f:
+            f.seek(offset)
+            byte = f.read(1)
+            f.seek(offset)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+        with pytest.raises(sealed.SealedArchiveError):
+            sealed.verify_sealed(index_path)
+        with sealed.SealedArchive(index_path) as archive, pytest.raises(sealed.SealedArchiveError):
+            list(archive.rows())
+
+
+def test_seal_keeps_an_archive_db_that_changed_while_it_was_read(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        _write_archive("2023-05", [_row(i, "2023-05", "Αίτηση") for i in range(1, 4)])
+        conn = get_connection()
+        federation.refresh_catalog(conn)
+        real_verify = sealed.verify_sealed
+        db_path = archive_dir() / "2023-05.db"
+
+        def archived_meanwhile(index_path):
+            # An archive run copies a late entry after the seal read the file
+            _write_archive("2023-05", [_row(4, "2023-05", "Αίτηση νέα")])
+            return real_verify(index_path)
+
+        monkeypatch.setattr(sealed, "verify_sealed", archived_meanwhile)
+        assert sealed.seal_month(conn, "2023-05").rows == 3
+        assert db_path.exists()
+        # The seal holds 1-3, and the DB counts only the late entry
+        assert federation.archived_total(conn, "2023-05", None) == 4
+        assert federation.archive_files_for(conn, "2023-05") == ["2023-05.db", "2023-05.sealed.idx"]
+
+        def claimed_meanwhile(index_path):
+            conn.execute("INSERT INTO archive_progress VALUES ('2023-05', 0, NULL, 't', 't')")
+            conn.commit()
+            return real_verify(index_path)
+
+        monkeypatch.setattr(sealed, "verify_sealed", claimed_meanwhile)
+        assert sealed.seal_month(conn, "2023-05").rows == 4
+        assert db_path.exists()
+
+        # Once nothing touches it, the next seal takes the file over
+        monkeypatch.setattr(sealed, "verify_sealed", real_verify)
+        conn.execute("DELETE FROM archive_progress")
+        conn.commit()
+        assert sealed.seal_month(conn, "2023-05").rows == 4
+        assert not db_path.exists()
+        assert [r[0] for r in iter_month_rows(conn, "2023-05")] == [1, 2, 3, 4]
+        conn.close()
+    federation.shutdown()
+
+
+def test_seal_counts_rows_once_when_the_archive_db_changed_meanwhile(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        rows = [_row(i, "2023-06", "Αίτηση") for i in range(1, 4)]
+        _write_archive("2023-06", rows)
+        conn = get_connection()
+        federation.refresh_catalog(conn)
+        assert federation.archived_total(conn, "2023-06", None) == 3
+        real_verify = sealed.verify_sealed
+
+        def recopied_meanwhile(index_path):
+            # A resumed archive run copies its last chunk again: new signature, same rows
+            _write_archive("2023-06", rows[-1:])
+            return real_verify(index_path)
+
+        monkeypatch.setattr(sealed, "verify_sealed", recopied_meanwhile)
+        assert sealed.seal_month(conn, "2023-06").rows == 3
+        assert (archive_dir() / "2023-06.db").exists()
+        assert federation.archived_total(conn, "2023-06", None) == 3
+        # Nothing left in the DB that the seal lacks: reads skip it
+        assert federation.archive_files_for(conn, "2023-06") == ["2023-06.sealed.idx"]
+        conn.close()
+    federation.shutdown()
+
+
+def test_a_failed_seal_commit_keeps_the_archive_db():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        _write_archive("2023-07", [_row(i, "2023-07", "Αίτηση") for i in range(1, 4)])
+
+        class LockedAtCommit(sqlite3.Connection):
+            def commit(self):
+                if self.in_transaction and self.execute("SELECT 1 FROM archive_seals").fetchone():
+                    raise sqlite3.OperationalError("database is locked")
+                super().commit()
+
+        conn = configure_connection(sqlite3.connect(os.environ["REGISTRY_DB_PATH"], factory=LockedAtCommit))
+        federation.refresh_catalog(conn)
+        with pytest.raises(sqlite3.OperationalError):
+            sealed.seal_month(conn, "2023-07")
+        # The catalogue rolled back to the DB, and the DB is where it points
+        assert federation.archive_files_for(conn, "2023-07") == ["2023-07.db"]
+        assert (archive_dir() / "2023-07.db").exists()
+        assert federation.archived_total(conn, "2023-07", None) == 3
+        conn.close()
+    federation.shutdown()
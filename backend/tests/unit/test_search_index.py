@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from backend.benchmarks.synthetic import INSERT_SQL
+from backend.src.services import search
+from backend.src.services.db import get_connection, init_db
+
+
+def test_paging_walks_every_ranked_window_once(monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_WINDOW", 3)
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        conn = get_connection()
+        for i in range(10):
+            subject = "Αίτηση " + ("αίτηση " * (i % 3)) + f"θέμα {i}"
+            month = "2024-01" if i < 5 else "2024-02"
+            conn.execute(
+                INSERT_SQL,
+                ("common_incoming", "Δήμος", f"R-{i}", subject, None, "OFF-1", 40001 + i, None,
+                 f"{month}-10", "2024-01-10T09:00:00"),
+            )
+        conn.commit()
+        match = search.build_match_query("ΑΙΤΗΣΗ")
+
+        seen, pos = [], None
+        while True:
+            rows, pos = search.search_registrations(conn, match, limit=2, after=pos)
+            seen += [r["id"] for r in rows]
+            if pos is None:
+                break
+        assert sorted(seen) == list(range(1, 11))
+        # Newest window first: its best match outranks everything older
+        assert seen[0] in (8, 9, 10)
+
+        rows, pos = search.search_registrations(conn, match, month="2024-01", limit=10)
+        assert sorted(r["id"] for r in rows) == [1, 2, 3, 4, 5] and pos is None
+        conn.close()
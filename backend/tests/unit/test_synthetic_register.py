@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+from backend.benchmarks.suite import compare
+from backend.benchmarks.synthetic import build_register
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.numbering import next_draft, next_protocol
+from backend.src.services.search import build_match_query, search_registrations
+
+
+def test_bulk_built_register_behaves_like_one_built_by_the_app():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(tmp, "synthetic.db")
+        init_db()
+        build_register(3000, days=90)
+        conn = get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0] == 3000
+        assert conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 3000
+        assert conn.execute("SELECT SUM(total) FROM registration_counts").fetchone()[0] == 3000
+        # Indexes and triggers dropped for the load are back
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+        assert {"ix_registrations_month_category", "trg_registrations_fts_insert",
+                "trg_registration_counts_insert", "trg_registration_offices_insert"} <= names
+        # The office junction table is filled in from the loaded rows
+        filed = conn.execute("SELECT COUNT(DISTINCT registrationId) FROM registration_offices").fetchone()[0]
+        assert filed == conn.execute("SELECT COUNT(*) FROM registrations WHERE offices IS NOT NULL").fetchone()[0]
+        # Search finds accented text through the folded index
+        rows, _ = search_registrations(conn, build_match_query("ΑΙΤΗΣΗ"), limit=5)
+        assert rows and all("αίτηση" in r["subject"] for r in rows)
+
+        # Numbering carries on after the loaded numbers
+        year, top = conn.execute(
+            "SELECT CAST(substr(entryDate, 1, 4) AS INTEGER), MAX(protocolNumber) FROM registrations "
+            "WHERE category = 'common_incoming' GROUP BY 1 ORDER BY 1 DESC LIMIT 1"
+        ).fetchone()
+        assert next_protocol(conn, "common_incoming", year) == top + 1
+        top_draft = conn.execute(
+            "SELECT MAX(draftNumber) FROM registrations WHERE category = 'signals_outgoing'"
+        ).fetchone()[0]
+        assert next_draft(conn, "signals_outgoing") == top_draft + 1
+        conn.rollback()
+        conn.close()
+
+
+def test_compare_flags_only_real_slowdowns():
+    def result(**p50):
+        return {"rows": 10, "scenarios": {name: {"p50Ms": ms} for name, ms in p50.items()}}
+
+    baseline = result(create=1.0, list_first_page=0.01, search=4.0)
+    current = result(create=1.5, list_first_page=0.04, search=4.4, delete=0.1)
+    # list_first_page quadrupled but stays under the noise floor; delete is new
+    assert compare(current, baseline, tolerance=0.25, floor_ms=0.05) == ["create"]
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+
+from backend.src.services import cache as response_cache
+from backend.src.services import feed
+from backend.src.services.db import close_pool, get_connection, init_db
+from backend.src.services.workers import ChangeWatcher
+
+
+def test_watcher_follows_commits_from_other_connections():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        other = get_connection()
+
+        async def scenario():
+            cache = response_cache.get_response_cache()
+            cache.put(("list", "2024-05"), b"[]", ("2024-05", None), cache.version(("2024-05", None)))
+            stream = feed.get_feed().subscribe(["common_incoming"])
+            watcher = ChangeWatcher(interval=0.01)
+            watcher.start()
+            try:
+                await asyncio.sleep(0.05)
+                assert await stream.next(0.01) is None
+                assert cache.get(("list", "2024-05")) is not None
+
+                # Another process (here: another connection) commits
+                other.execute("INSERT INTO offices (code, label, active) VALUES ('OFF-9', 'Office 9', 1)")
+                other.commit()
+                change = await stream.next(1)
+                assert change.kind == "changed" and change.category is None
+                assert cache.get(("list", "2024-05")) is None
+            finally:
+                await watcher.stop()
+                feed.get_feed().unsubscribe(stream)
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            other.close()
+            feed.reset()
+            close_pool()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+from backend.src.services.db import get_connection, init_db
+from backend.src.services.numbering import next_protocol
+from backend.src.services.write_queue import WriteQueue
+
+
+def _register(conn, subject):
+    number = next_protocol(conn, "common_incoming", 2025)
+    conn.execute(
+        """
+        INSERT INTO registrations (category, issuer, referenceNumber, subject, protocolNumber,
+                                   entryDate, createdAt, deletedFlag)
+        VALUES ('common_incoming', 'Δήμος', 'R', ?, ?, '2025-01-10', '2025-01-10T09:00:00', 0)
+        """,
+        (subject, number),
+    )
+    if subject == "bad":
+        raise ValueError("rejected")
+    return number
+
+
+def test_concurrent_writes_share_one_commit_with_per_request_results():
+    with tempfile.TemporaryDirectory() as td:
+        os.environ["REGISTRY_DB_PATH"] = os.path.join(td, "test.db")
+        init_db()
+        writes = WriteQueue(get_connection, durability="full", window_ms=0)
+        started, release = threading.Event(), threading.Event()
+        blocker = writes.submit(lambda conn: started.set() or release.wait(5))
+        assert started.wait(5)
+        # Queued while the writer is busy: committed together in the next group
+        futures = [writes.submit(_register, "bad" if i == 3 else f"Αίτηση {i}") for i in range(10)]
+        release.set()
+        assert blocker.result(5) is True
+
+        with pytest.raises(ValueError):
+            futures[3].result(5)
+        numbers = [f.result(5) for i, f in enumerate(futures) if i != 3]
+        # The failed request's number was rolled back with it and handed on
+        assert numbers == list(range(40001, 40010))
+        stats = writes.stats()
+        assert (stats["transactions"], stats["operations"], stats["failed"]) == (2, 11, 1)
+        assert stats["durability"] == "full"
+        writes.close()
+
+        conn = get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0] == 9
+        assert conn.execute("SELECT COUNT(*) FROM registrations WHERE subject = 'bad'").fetchone()[0] == 0
+        conn.close()
+
+
+def test_unknown_durability_is_rejected():
+    with pytest.raises(ValueError):
+        WriteQueue(get_connection, durability="sometimes")
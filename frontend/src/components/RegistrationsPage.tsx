@@ -4,7 +4,7 @@ import { Card } from "./ui/card";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "./ui/select";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "./ui/table";
 import { Badge } from "./ui/badge";
-import { listRegistrations, Registration } from "../services/api";
+import { listRegistrations, Registration, subscribeRegistrations } from "../services/api";
 
 interface RegistrationsPageProps {
   onNavigate: (screen: string) => void;
@@ -18,22 +18,51 @@ export function RegistrationsPage({ onNavigate }: RegistrationsPageProps) {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    const now = new Date();
+    const month = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}`;
+    let unsubscribe: (() => void) | null = null;
+    let cancelled = false;
+
     const fetchRegistrations = async () => {
       try {
         setLoading(true);
-        const now = new Date();
-        const month = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}`;
         const result = await listRegistrations(month);
-        setEntries(result.items || []);
+        const items = result.items || [];
+        if (!cancelled) setEntries(items);
+        return items;
       } catch (err) {
         const errorMessage = err instanceof Error ? err.message : 'Unknown error';
         setError(errorMessage);
+        return null;
       } finally {
         setLoading(false);
       }
     };
 
-    fetchRegistrations();
+    fetchRegistrations().then((items) => {
+      if (cancelled || items === null) return;
+      // From here on the server sends only the changes: no polling
+      unsubscribe = subscribeRegistrations(
+        {
+          created: (registration) => {
+            if (registration.entryDate.slice(0, 7) !== month) return;
+            setEntries((current) =>
+              current.some((e) => e.id === registration.id) ? current : [...current, registration],
+            );
+          },
+          deleted: ({ id }) => setEntries((current) => current.filter((e) => e.id !== id)),
+          reset: () => {
+            fetchRegistrations();
+          },
+        },
+        { lastEventId: items.length ? items.reduce((max, e) => Math.max(max, e.id), 0) : undefined },
+      );
+    });
+
+    return () => {
+      cancelled = true;
+      unsubscribe?.();
+    };
   }, []);
 
   // Map backend category to frontend type
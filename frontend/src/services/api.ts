@@ -63,18 +63,79 @@ export async function createRegistration(category: BackendCategory, payload: Reg
   return res.json();
 }
 
-export async function listRegistrations(month: string, category?: BackendCategory) {
+export interface RegistrationPage {
+  items: Registration[];
+  page: number;
+  pageSize: number;
+  total: number;
+  nextCursor: string | null;
+}
+
+export async function listRegistrationsPage(
+  month: string,
+  options: { category?: BackendCategory; after?: string | null; pageSize?: number } = {},
+): Promise<RegistrationPage> {
   const url = new URL(`${BASE_URL}/registrations`);
   url.searchParams.set("month", month);
-  url.searchParams.set("page", "1");
-  if (category) url.searchParams.set("category", category);
+  if (options.category) url.searchParams.set("category", options.category);
+  if (options.after) url.searchParams.set("after", options.after);
+  if (options.pageSize) url.searchParams.set("pageSize", String(options.pageSize));
   const res = await fetch(url.toString());
   if (!res.ok) throw new Error(`List failed: ${res.status}`);
   return res.json();
 }
 
+// Follows nextCursor until the month is exhausted, yielding one page at a time
+export async function* iterateRegistrations(
+  month: string,
+  category?: BackendCategory,
+  pageSize = 500,
+): AsyncGenerator<RegistrationPage> {
+  let after: string | null = null;
+  do {
+    const page: RegistrationPage = await listRegistrationsPage(month, { category, after, pageSize });
+    yield page;
+    after = page.nextCursor;
+  } while (after);
+}
+
+export async function listRegistrations(month: string, category?: BackendCategory) {
+  const items: Registration[] = [];
+  let total = 0;
+  for await (const page of iterateRegistrations(month, category)) {
+    items.push(...page.items);
+    total = page.total;
+  }
+  return { items, total };
+}
+
 export async function getOffices(): Promise<{ code: string; label: string }[]> {
   const res = await fetch(`${BASE_URL}/meta/offices`);
   if (!res.ok) throw new Error(`Offices failed: ${res.status}`);
   return res.json();
 }
+
+export interface RegistrationStreamHandlers {
+  created: (registration: Registration) => void;
+  deleted: (change: { id: number; category: BackendCategory; month: string }) => void;
+  // Too much changed to send one by one: reload the listing
+  reset: () => void;
+}
+
+// Live changes instead of polling. lastEventId is the highest id already
+// shown, so nothing committed after the listing was fetched is missed; the
+// browser reconnects on its own and the server replays what it missed.
+// Returns a function that closes the stream.
+export function subscribeRegistrations(
+  handlers: RegistrationStreamHandlers,
+  options: { categories?: BackendCategory[]; lastEventId?: number } = {},
+): () => void {
+  const url = new URL(`${BASE_URL}/registrations/stream`);
+  for (const category of options.categories ?? []) url.searchParams.append("category", category);
+  if (options.lastEventId !== undefined) url.searchParams.set("lastEventId", String(options.lastEventId));
+  const source = new EventSource(url.toString());
+  source.addEventListener("created", (e) => handlers.created(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener("deleted", (e) => handlers.deleted(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener("reset", () => handlers.reset());
+  return () => source.close();
+}